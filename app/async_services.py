@@ -0,0 +1,41 @@
+"""
+Async counterparts of the services for async mode (CRM_DB_ASYNC=true).
+
+Service logic runs on the AsyncSession's connection through run_sync, so
+lead resolution, distribution and load reservation are shared with the sync
+path, while database I/O is awaited on the event loop instead of holding a
+threadpool worker. run_sync executes the sync code in a greenlet, and each
+statement inside it is awaited on the aiosqlite/asyncpg connection, the same
+mechanism AsyncSession's own methods use. A port to explicit awaits would do
+the same I/O and duplicate the identity conflict retries, load reservation
+and backlog handling that must behave exactly like the sync path.
+
+Only the ingestion endpoints (app/routers/contacts_async.py) run in async
+mode, so only contact creation has async counterparts. Read endpoints stay
+sync: operators and sources are served from the response cache, and exports
+and NDJSON summaries are sync generators that Starlette iterates in a
+threadpool worker.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from app import models, schemas
+from app.services import ContactService
+
+
+class AsyncContactService:
+    """Async service for managing contacts"""
+
+    @staticmethod
+    async def create_contact(
+        db: AsyncSession,
+        contact_data: schemas.ContactCreate
+    ) -> models.Contact:
+        """Create a new contact with lead, source and operator loaded for the response"""
+        return await db.run_sync(ContactService.create_contact, contact_data)
+
+    @staticmethod
+    async def create_contacts_batch(
+        db: AsyncSession,
+        contacts_data: List[schemas.ContactCreate]
+    ) -> List[schemas.ContactBatchItemResult]:
+        return await db.run_sync(ContactService.create_contacts_batch, contacts_data)
@@ -0,0 +1,237 @@
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from app.database import engine, init_db, SessionLocal, to_db_datetime
+from app.identity import backfill_lead_identities
+from app import importer
+from app.rollups import rebuild_rollups
+from app.expiry import expire_contacts
+from app.migrations import apply_migrations, migration_status
+from app.query_plans import check_query_plans
+from app import schemas, simulator
+
+
+def backfill_identities(args) -> None:
+    db = SessionLocal()
+    try:
+        processed = backfill_lead_identities(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Lead identities backfilled for {processed} leads")
+
+
+def import_file(args) -> None:
+    format = args.format or ("ndjson" if os.path.splitext(args.path)[1] in (".ndjson", ".jsonl") else "csv")
+
+    def progress(summary) -> None:
+        print(
+            f"processed {summary.processed}, imported {summary.imported}, rejected {summary.rejected}",
+            file=sys.stderr
+        )
+
+    db = SessionLocal()
+    try:
+        with open(args.path, "rb") as file:
+            if args.kind == "leads":
+                summary = importer.import_leads(db, file, format, args.chunk_size, progress)
+            else:
+                summary = importer.import_contacts(
+                    db, file, format, args.chunk_size, args.assign_operators, progress
+                )
+    finally:
+        db.close()
+
+    for rejected in summary.rejected_rows[:args.show_rejected]:
+        print(f"line {rejected.line}: {rejected.error}")
+    print(f"Imported {summary.imported} {args.kind}, rejected {summary.rejected} of {summary.processed} rows")
+    if args.kind == "contacts" and args.assign_operators:
+        # Load counters of a running server don't see contacts assigned by this process
+        print("Run POST /operators/load/reconcile to refresh load counters of running servers")
+
+
+def rebuild_contact_rollups(args) -> None:
+    db = SessionLocal()
+    try:
+        processed = rebuild_rollups(db)
+    finally:
+        db.close()
+    print(f"Stats rollups rebuilt from {processed} contacts")
+
+
+def expire_stale_contacts(args) -> None:
+    expired = expire_contacts()
+    for source_id, count in sorted(expired.items()):
+        print(f"source {source_id}: {count}")
+    print(f"Expired {sum(expired.values())} contacts")
+    if expired:
+        # Load counters of a running server don't see contacts released by this process
+        print("Run POST /operators/load/reconcile to refresh load counters of running servers")
+
+
+def migrate(args) -> None:
+    if not args.status:
+        applied = apply_migrations(engine)
+        for migration in applied:
+            print(f"applied {migration.version:04d} {migration.name}")
+        print(f"Applied {len(applied)} migrations")
+    for migration, applied_at in migration_status(engine):
+        state = f"applied {applied_at:%Y-%m-%d %H:%M:%S}" if applied_at else "pending"
+        print(f"{migration.version:04d} {migration.name}: {state} - {migration.description}")
+
+
+def check_plans(args) -> None:
+    with engine.connect() as connection:
+        results = check_query_plans(connection)
+    for result in results:
+        if result.ok:
+            print(f"ok: {result.name}")
+        elif result.full_scans:
+            print(f"FULL SCAN: {result.name}")
+        else:
+            print(f"NO INDEX {result.missing_index}: {result.name}")
+        if args.verbose or not result.ok:
+            for detail in result.plan:
+                print(f"    {detail}")
+    failed = [result.name for result in results if not result.ok]
+    if failed:
+        print(f"{len(failed)} of {len(results)} hot queries don't use their indexes: {', '.join(failed)}")
+        sys.exit(1)
+    print(f"All {len(results)} hot queries use indexes")
+
+
+def parse_source_share(value: str):
+    source_id, share = value.split("=")
+    return int(source_id), float(share)
+
+
+def simulate(args) -> None:
+    db = SessionLocal()
+    try:
+        if args.dump_config:
+            print(simulator.load_config(db).model_dump_json(indent=2))
+            return
+        
+        if args.config:
+            with open(args.config) as file:
+                config = schemas.SimulationConfig.model_validate(json.load(file))
+        else:
+            config = simulator.load_config(db)
+        if args.replay_from:
+            end = to_db_datetime(args.replay_to) if args.replay_to else datetime.utcnow()
+            stream = simulator.recorded_stream(db, to_db_datetime(args.replay_from), end)
+        else:
+            stream = simulator.synthetic_stream(
+                config,
+                args.contacts,
+                args.arrival_rate,
+                args.mean_handle_time,
+                dict(args.source_share) if args.source_share else None,
+                args.seed
+            )
+    finally:
+        db.close()
+    
+    result = simulator.simulate(config, stream, args.tick, args.seed)
+    if args.json:
+        print(result.model_dump_json(indent=2))
+        return
+    
+    print(f"{'operator':>8} {'limit':>6} {'assigned':>10} {'share':>7} {'peak':>6} {'at limit':>9} {'first at limit':>15}")
+    for operator in result.operators:
+        first = f"{operator.first_saturated_at:.0f}s" if operator.first_saturated_at is not None else "-"
+        print(
+            f"{operator.operator_id:>8} {operator.load_limit:>6} {operator.assigned:>10} {operator.share:>7.1%} "
+            f"{operator.peak_load:>6} {operator.saturated_fraction:>9.1%} {first:>15}"
+            + ("" if operator.is_active else " (inactive)")
+        )
+    for source in result.sources:
+        wait = f", mean wait {source.mean_queue_wait:.0f}s" if source.mean_queue_wait is not None else ""
+        print(
+            f"source {source.source_id}: {source.contacts} contacts, {source.queued} queued on arrival, "
+            f"{source.queued_at_end} still queued{wait}"
+        )
+    print(
+        f"Simulated {result.contacts} contacts and {result.deactivations} deactivations over "
+        f"{result.duration:.0f}s in {result.elapsed:.1f}s: unassigned rate {result.unassigned_rate:.2%}, "
+        f"{result.queued_at_end} still queued"
+    )
+
+
+def main(argv=None) -> None:
+    """Maintenance commands: python -m app.cli <command>"""
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Mini-CRM maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backfill_parser = subparsers.add_parser(
+        "backfill-identities", help="Build lead identity index for existing leads"
+    )
+    backfill_parser.add_argument("--batch-size", type=int, default=1000)
+    backfill_parser.set_defaults(handler=backfill_identities)
+
+    import_parser = subparsers.add_parser("import", help="Import leads or contacts from a CSV/NDJSON file")
+    import_parser.add_argument("kind", choices=("leads", "contacts"))
+    import_parser.add_argument("path")
+    import_parser.add_argument(
+        "--format", choices=importer.IMPORT_FORMATS, help="Defaults to ndjson for .ndjson/.jsonl files, csv otherwise"
+    )
+    import_parser.add_argument("--chunk-size", type=int, default=importer.DEFAULT_CHUNK_SIZE, help="Rows per transaction")
+    import_parser.add_argument(
+        "--assign-operators", action="store_true",
+        help="Distribute contacts to operators as active contacts (default: inactive history)"
+    )
+    import_parser.add_argument("--show-rejected", type=int, default=20, help="Rejected rows to print")
+    import_parser.set_defaults(handler=import_file)
+
+    rollups_parser = subparsers.add_parser(
+        "rebuild-rollups", help="Recompute pre-aggregated stats from the contacts table"
+    )
+    rollups_parser.set_defaults(handler=rebuild_contact_rollups)
+
+    expire_parser = subparsers.add_parser(
+        "expire-contacts", help="Deactivate active contacts older than their source's TTL"
+    )
+    expire_parser.set_defaults(handler=expire_stale_contacts)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Apply pending schema migrations")
+    migrate_parser.add_argument("--status", action="store_true", help="Only list migrations and their state")
+    migrate_parser.set_defaults(handler=migrate)
+
+    plans_parser = subparsers.add_parser(
+        "check-query-plans", help="Fail if a hot query scans a large table in full or misses its index (SQLite)"
+    )
+    plans_parser.add_argument("--verbose", action="store_true", help="Print plans of all queries")
+    plans_parser.set_defaults(handler=check_plans)
+
+    simulate_parser = subparsers.add_parser(
+        "simulate", help="Simulate distribution of synthetic or recorded contacts"
+    )
+    simulate_parser.add_argument("--config", help="JSON config snapshot (default: live operators, sources and weights)")
+    simulate_parser.add_argument("--dump-config", action="store_true", help="Print the live config snapshot and exit")
+    simulate_parser.add_argument("--contacts", type=int, default=1_000_000, help="Synthetic arrivals")
+    simulate_parser.add_argument("--arrival-rate", type=float, default=10, help="Contacts per second")
+    simulate_parser.add_argument(
+        "--mean-handle-time", type=float, default=600, help="Mean seconds from assignment to deactivation"
+    )
+    simulate_parser.add_argument(
+        "--source-share", type=parse_source_share, action="append", metavar="SOURCE_ID=SHARE",
+        help="Share of arrivals from a source (default: all sources equally)"
+    )
+    simulate_parser.add_argument(
+        "--replay-from", type=datetime.fromisoformat, help="Replay contacts recorded since (UTC) instead"
+    )
+    simulate_parser.add_argument("--replay-to", type=datetime.fromisoformat, help="End of the replay (default: now)")
+    simulate_parser.add_argument("--tick", type=float, default=1, help="Seconds of simulated time per step")
+    simulate_parser.add_argument("--seed", type=int)
+    simulate_parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    simulate_parser.set_defaults(handler=simulate)
+
+    args = parser.parse_args(argv)
+    if args.handler is not migrate:
+        init_db()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
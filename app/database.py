@@ -1,17 +1,76 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from datetime import datetime, timezone
+from typing import List
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from app.config import settings
 
-# SQLite database file
-SQLALCHEMY_DATABASE_URL = "sqlite:///./crm.db"
+SQLALCHEMY_DATABASE_URL = settings.database_url
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+
+def _engine_options(url: str, is_async: bool = False) -> dict:
+    """create_engine() options for the database URL from settings"""
+    options = {"echo": settings.db_echo}
+    database_url = make_url(url)
+    
+    if database_url.get_backend_name() == "sqlite":
+        if not is_async:
+            options["connect_args"] = {"check_same_thread": False}
+        # In-memory SQLite and aiosqlite don't use a queue pool
+        if is_async or database_url.database in (None, "", ":memory:"):
+            return options
+    else:
+        options["pool_pre_ping"] = True
+    
+    options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_recycle=settings.db_pool_recycle,
+        pool_timeout=settings.db_pool_timeout
+    )
+    return options
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply performance pragmas to a new SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.sqlite_cache_size)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout)}")
+    cursor.close()
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_options(SQLALCHEMY_DATABASE_URL))
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _set_sqlite_pragmas)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
+def async_database_url(url: str) -> str:
+    """Same database URL with an asyncio driver"""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    if url.startswith(("postgresql:", "postgresql+psycopg2:")):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    return url
+
+
+# Async engine is created only in async mode (requires aiosqlite/asyncpg)
+async_engine = None
+AsyncSessionLocal = None
+if settings.db_async:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    ASYNC_DATABASE_URL = async_database_url(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL, is_async=True))
+    if async_engine.dialect.name == "sqlite":
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+
+
 def get_db():
     """Dependency for getting database session"""
     db = SessionLocal()
@@ -21,7 +80,44 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency for getting async database session (async mode only)"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
-    """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
+    """Create or upgrade the database schema by applying pending migrations (app/migrations)"""
+    from app.migrations import apply_migrations
+    apply_migrations(engine)
+
+
+def dialect_insert(db: Session, table):
+    """INSERT construct of the session's dialect (supports ON CONFLICT clauses)"""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+def insert_returning_ids(db: Session, model, rows: List[dict]) -> List[int]:
+    """
+    Insert rows with executemany (batched multi-row INSERTs) and return their
+    integer primary keys in the order of `rows`.
+    SQLAlchemy can't order RETURNING rows on SQLite and falls back to one INSERT
+    per row for sort_by_parameter_order. SQLite assigns new rowids in ascending
+    VALUES order under its single writer lock, so sorted ids match the rows.
+    """
+    if not rows:
+        return []
+    if db.get_bind().dialect.name == "sqlite":
+        return sorted(db.scalars(insert(model).returning(model.id), rows).all())
+    return db.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows).all()
+
 
+def to_db_datetime(value: datetime) -> datetime:
+    """Convert datetime to naive UTC, the way server_default=func.now() stores it"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
@@ -0,0 +1,62 @@
+"""
+Background expiry of stale contacts.
+
+Sources may set contact_ttl_seconds: their active contacts older than that are
+deactivated by ContactService.expire_contacts, which releases operator load
+and hands the freed capacity to the backlog. ContactExpiryScheduler runs it
+periodically on the event loop; the database work itself runs in the threadpool.
+"""
+import asyncio
+import logging
+from typing import Dict, Optional
+from fastapi.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import SessionLocal
+from app.services import ContactService
+
+logger = logging.getLogger(__name__)
+
+
+def expire_contacts() -> Dict[int, int]:
+    """Run one expiry pass with its own session; returns source_id -> expired contacts"""
+    db = SessionLocal()
+    try:
+        return ContactService.expire_contacts(db, batch_size=settings.contact_expiry_batch_size)
+    finally:
+        db.close()
+
+
+class ContactExpiryScheduler:
+    """Runs expire_contacts every `interval` seconds (starting right away) until stopped"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                expired = await run_in_threadpool(expire_contacts)
+                if expired:
+                    logger.info("Expired contacts by source: %s", expired)
+            except Exception:
+                # Keep the scheduler alive; the next pass retries
+                logger.exception("Contact expiry failed")
+            await asyncio.sleep(self.interval)
+
+
+expiry_scheduler = ContactExpiryScheduler(settings.contact_expiry_interval)
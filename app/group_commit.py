@@ -0,0 +1,170 @@
+"""
+Group-commit ingestion pipeline (CRM_CONTACT_GROUP_COMMIT=true).
+
+Request handlers don't write contacts themselves: they put them on a queue
+and await a future. A single writer task takes everything queued within a
+short window (CRM_CONTACT_GROUP_COMMIT_WINDOW_MS, at most
+CRM_CONTACT_GROUP_COMMIT_MAX_BATCH contacts), creates it with
+ContactService.create_contacts_batch - bulk lead resolution, in-memory
+assignment counting the whole group toward load limits, one commit - and
+resolves the futures. On SQLite this turns one fsync per request into one
+per group. Groups are written one after another, so every group sees the
+load left by the previous one.
+"""
+import asyncio
+from typing import List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from app import models, schemas
+from app.config import settings
+from app.database import SessionLocal
+from app.metrics import metrics, timer
+from app.services import IN_CHUNK_SIZE, ContactService
+
+# Contacts of one request with their results: (result, contact loaded for the response or None)
+ItemResult = Tuple[schemas.ContactBatchItemResult, Optional[models.Contact]]
+# (contacts of one request, load contacts for the response, future of the results)
+Entry = Tuple[List[schemas.ContactCreate], bool, asyncio.Future]
+
+
+def write_group(entries: List[Tuple[List[schemas.ContactCreate], bool]]) -> List[List[ItemResult]]:
+    """
+    Create contacts of several requests in one transaction.
+    Contacts of requests asking for them are then loaded with their
+    relations (one query per IN chunk) and returned detached.
+    """
+    contacts_data = [contact_data for request_contacts, _ in entries for contact_data in request_contacts]
+    db = SessionLocal()
+    try:
+        with timer("group_commit"):
+            results = ContactService.create_contacts_batch(db, contacts_data)
+
+        offsets = []
+        contact_ids = []
+        offset = 0
+        for request_contacts, load_contacts in entries:
+            offsets.append(offset)
+            if load_contacts:
+                contact_ids.extend(
+                    result.contact_id for result in results[offset:offset + len(request_contacts)]
+                    if result.contact_id is not None
+                )
+            offset += len(request_contacts)
+
+        contacts = {}
+        for i in range(0, len(contact_ids), IN_CHUNK_SIZE):
+            for contact in db.query(models.Contact).options(*ContactService.response_options()).filter(
+                models.Contact.id.in_(contact_ids[i:i + IN_CHUNK_SIZE])
+            ):
+                contacts[contact.id] = contact
+    finally:
+        db.close()
+
+    # Indexes of the group become indexes within each request
+    return [
+        [
+            (result.model_copy(update={"index": index}), contacts.get(result.contact_id))
+            for index, result in enumerate(results[offset:offset + len(request_contacts)])
+        ]
+        for (request_contacts, _), offset in zip(entries, offsets)
+    ]
+
+
+class ContactWriter:
+    """Single writer task committing queued contacts in groups"""
+
+    def __init__(self, window: float, max_batch: int):
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Write contacts queued so far and stop the writer"""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def create_contact(self, contact_data: schemas.ContactCreate) -> models.Contact:
+        """Create a contact in the next group; returns it with lead, source and operator loaded"""
+        result, contact = (await self._submit([contact_data], True))[0]
+        if result.error:
+            raise ValueError(result.error)
+        return contact
+
+    async def create_contacts_batch(
+        self,
+        contacts_data: List[schemas.ContactCreate]
+    ) -> List[schemas.ContactBatchItemResult]:
+        """Create a batch of contacts in the next group (never split across groups)"""
+        return [result for result, _ in await self._submit(contacts_data, False)]
+
+    async def _submit(self, contacts_data: List[schemas.ContactCreate], load_contacts: bool) -> List[ItemResult]:
+        if self._task is None:
+            raise RuntimeError("Contact writer is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((contacts_data, load_contacts, future))
+        return await future
+
+    async def _collect(self, first: Entry) -> Tuple[List[Entry], bool]:
+        """Take entries queued within the window; returns (group, stop requested)"""
+        group = [first]
+        size = len(first[0])
+        deadline = asyncio.get_running_loop().time() + self.window
+        while size < self.max_batch:
+            try:
+                entry = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if entry is None:
+                return group, True
+            group.append(entry)
+            size += len(entry[0])
+        return group, False
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            group, stopping = await self._collect(first)
+            metrics.group_commit_size.observe(sum(len(contacts_data) for contacts_data, _, _ in group))
+
+            try:
+                results = await run_in_threadpool(
+                    write_group, [(contacts_data, load_contacts) for contacts_data, load_contacts, _ in group]
+                )
+            except Exception as e:
+                # The whole group was rolled back; every request gets the error
+                for _, _, future in group:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, _, future), entry_results in zip(group, results):
+                # Client may have gone away (the contact is created anyway)
+                if not future.done():
+                    future.set_result(entry_results)
+
+
+contact_writer = ContactWriter(
+    settings.contact_group_commit_window_ms / 1000,
+    settings.contact_group_commit_max_batch
+)
@@ -0,0 +1,110 @@
+import re
+from typing import Optional, List, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import exists
+from app import models
+from app.database import dialect_insert
+
+# Identity kinds in lookup priority order
+KIND_EXTERNAL_ID = "external_id"
+KIND_PHONE = "phone"
+KIND_EMAIL = "email"
+IDENTITY_KINDS = (KIND_EXTERNAL_ID, KIND_PHONE, KIND_EMAIL)
+
+
+class LeadIdentityConflict(Exception):
+    """Lead identity was created by a concurrent transaction"""
+
+
+def normalize_external_id(external_id: Optional[str]) -> Optional[str]:
+    if external_id is None:
+        return None
+    return external_id.strip() or None
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """
+    Keep digits only; Russian numbers written with a leading 8
+    are converted to the +7 form ("8 900 ..." and "+7 900 ..." are the same)
+    """
+    if phone is None:
+        return None
+    digits = re.sub(r"\D", "", phone)
+    if len(digits) == 11 and digits.startswith("8"):
+        digits = "7" + digits[1:]
+    return digits or None
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    if email is None:
+        return None
+    return email.strip().lower() or None
+
+
+def lead_identities(
+    external_id: Optional[str] = None,
+    phone: Optional[str] = None,
+    email: Optional[str] = None
+) -> List[Tuple[str, str]]:
+    """Normalized (kind, value) identities of a lead in lookup priority order"""
+    identities = []
+    for kind, value in (
+        (KIND_EXTERNAL_ID, normalize_external_id(external_id)),
+        (KIND_PHONE, normalize_phone(phone)),
+        (KIND_EMAIL, normalize_email(email)),
+    ):
+        if value:
+            identities.append((kind, value))
+    return identities
+
+
+def insert_identities_ignoring_conflicts(db: Session, rows: List[dict]) -> int:
+    """
+    Insert identity rows, skipping (kind, value) pairs that already exist.
+    Returns number of inserted rows.
+    """
+    if not rows:
+        return 0
+    # executemany with RETURNING (batched by the dialect) reuses one compiled
+    # statement for any number of rows; skipped rows return nothing
+    statement = dialect_insert(db, models.LeadIdentity.__table__).on_conflict_do_nothing(
+        index_elements=["kind", "value"]
+    ).returning(models.LeadIdentity.id)
+    return len(db.execute(statement, rows).all())
+
+
+def backfill_lead_identities(db: Session, batch_size: int = 1000) -> int:
+    """
+    Create identities for existing leads that don't have any.
+    Leads are walked by id in batches, each batch is committed separately.
+    When several old leads share an identifier, the oldest one keeps it.
+    Returns number of processed leads.
+    """
+    last_id = 0
+    processed = 0
+    while True:
+        leads = db.query(
+            models.Lead.id,
+            models.Lead.external_id,
+            models.Lead.phone,
+            models.Lead.email
+        ).filter(
+            models.Lead.id > last_id,
+            ~exists().where(models.LeadIdentity.lead_id == models.Lead.id)
+        ).order_by(models.Lead.id).limit(batch_size).all()
+
+        if not leads:
+            break
+
+        rows = [
+            {"kind": kind, "value": value, "lead_id": lead_id}
+            for lead_id, external_id, phone, email in leads
+            for kind, value in lead_identities(external_id, phone, email)
+        ]
+        insert_identities_ignoring_conflicts(db, rows)
+        db.commit()
+
+        last_id = leads[-1].id
+        processed += len(leads)
+
+    return processed
@@ -0,0 +1,222 @@
+"""
+Bulk import of leads and contacts from CSV/NDJSON files.
+
+Files are parsed as a stream and imported in chunks; every chunk is one
+transaction. Leads are resolved with the same identity rules as
+POST /contacts/ (LeadService.find_or_create_lead_ids); new leads, their
+identities and contacts are each inserted with one executemany INSERT per
+chunk.
+
+Lead files have the columns external_id, phone, email, name. Contact files
+have the columns of ContactCreate (lead_external_id, lead_phone, lead_email,
+lead_name, source_id, message) plus optional created_at and operator_id.
+"""
+import csv
+import io
+import json
+from collections import Counter
+from datetime import datetime
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app import models, schemas
+from app.database import insert_returning_ids, to_db_datetime
+from app.identity import lead_identities
+from app.load_tracker import load_tracker
+from app.metrics import timer
+from app.rollups import record_created
+from app.services import BacklogService, DistributionService, LeadService
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Rows per transaction
+DEFAULT_CHUNK_SIZE = 1000
+
+# Rejected rows listed in the summary (all of them are counted)
+MAX_REJECTED_ROWS = 1000
+
+Progress = Callable[[schemas.ImportSummary], None]
+
+
+def read_records(file: BinaryIO, format: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Parse records one by one from a binary file.
+    Yields (line number, record, error); record is None for unparsable lines.
+    Empty CSV values are read as null.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        if format == "csv":
+            reader = csv.DictReader(text)
+            for record in reader:
+                yield reader.line_num, {
+                    key: (value.strip() or None) if isinstance(value, str) else value
+                    for key, value in record.items()
+                    if key is not None
+                }, None
+        else:
+            for line_number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield line_number, None, f"Invalid JSON: {e}"
+                    continue
+                if isinstance(record, dict):
+                    yield line_number, record, None
+                else:
+                    yield line_number, None, "Expected a JSON object"
+    finally:
+        # Leave the underlying file open for the caller
+        text.detach()
+
+
+def _validate(model, record: dict) -> Tuple[Optional[BaseModel], Optional[str]]:
+    try:
+        return model.model_validate(record), None
+    except ValidationError as e:
+        return None, "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+        )
+
+
+def _reject(summary: schemas.ImportSummary, line: int, error: str) -> None:
+    summary.rejected += 1
+    if len(summary.rejected_rows) < MAX_REJECTED_ROWS:
+        summary.rejected_rows.append(schemas.ImportRejectedRow(line=line, error=error))
+
+
+def _run_import(
+    file: BinaryIO,
+    format: str,
+    chunk_size: int,
+    parse: Callable[[dict], Tuple[Optional[BaseModel], Optional[str]]],
+    import_chunk: Callable[[List[Tuple[int, BaseModel]], schemas.ImportSummary], None],
+    progress: Optional[Progress]
+) -> schemas.ImportSummary:
+    """Parse records, collect valid rows into chunks and import chunk by chunk"""
+    summary = schemas.ImportSummary()
+    chunk = []
+    for line, record, error in read_records(file, format):
+        summary.processed += 1
+        row = None
+        if error is None:
+            row, error = parse(record)
+        if error is not None:
+            _reject(summary, line, error)
+            continue
+        
+        chunk.append((line, row))
+        if len(chunk) >= chunk_size:
+            with timer("import_chunk"):
+                import_chunk(chunk, summary)
+            chunk = []
+            if progress:
+                progress(summary)
+    
+    if chunk:
+        with timer("import_chunk"):
+            import_chunk(chunk, summary)
+    if progress:
+        progress(summary)
+    return summary
+
+
+def import_leads(
+    db: Session,
+    file: BinaryIO,
+    format: str = "csv",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[Progress] = None
+) -> schemas.ImportSummary:
+    """Import leads; rows matching an existing lead by any identifier are merged into it"""
+    def parse(record: dict):
+        row, error = _validate(schemas.LeadCreate, record)
+        if row is not None and not lead_identities(row.external_id, row.phone, row.email):
+            return None, "No lead identifiers (external_id, phone, email)"
+        return row, error
+    
+    def import_chunk(chunk, summary: schemas.ImportSummary) -> None:
+        LeadService.find_or_create_lead_ids(db, [
+            (row.external_id, row.phone, row.email, row.name) for _, row in chunk
+        ])
+        db.commit()
+        summary.imported += len(chunk)
+    
+    return _run_import(file, format, chunk_size, parse, import_chunk, progress)
+
+
+def import_contacts(
+    db: Session,
+    file: BinaryIO,
+    format: str = "csv",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    assign_operators: bool = False,
+    progress: Optional[Progress] = None
+) -> schemas.ImportSummary:
+    """
+    Import contacts, finding or creating their leads.
+    With assign_operators contacts are distributed like POST /contacts/batch
+    and count toward operator load (operator_id column is ignored). Otherwise
+    they are loaded as inactive historical contacts with the operator_id of
+    the file, and operator load is not touched.
+    """
+    source_ids = {source_id for (source_id,) in db.query(models.Source.id)}
+    operator_ids = {operator_id for (operator_id,) in db.query(models.Operator.id)}
+    
+    def parse(record: dict):
+        row, error = _validate(schemas.ContactImportRow, record)
+        if row is None:
+            return None, error
+        if row.source_id not in source_ids:
+            return None, f"Source with id {row.source_id} not found"
+        if not assign_operators and row.operator_id is not None and row.operator_id not in operator_ids:
+            return None, f"Operator with id {row.operator_id} not found"
+        return row, None
+    
+    def import_chunk(chunk, summary: schemas.ImportSummary) -> None:
+        rows = [row for _, row in chunk]
+        lead_ids = LeadService.find_or_create_lead_ids(db, [
+            (row.lead_external_id, row.lead_phone, row.lead_email, row.lead_name) for row in rows
+        ])
+        if assign_operators:
+            assigned = DistributionService.assign_operators_bulk(db, [row.source_id for row in rows])
+        else:
+            assigned = [row.operator_id for row in rows]
+        
+        now = datetime.utcnow()
+        contacts = [
+            {
+                "lead_id": lead_id,
+                "source_id": row.source_id,
+                "operator_id": operator_id,
+                "message": row.message,
+                "is_active": assign_operators,
+                "created_at": to_db_datetime(row.created_at) if row.created_at else now
+            }
+            for row, lead_id, operator_id in zip(rows, lead_ids, assigned)
+        ]
+        if assign_operators and None in assigned:
+            # Contacts left without operator wait in the backlog, which needs their ids
+            contact_ids = insert_returning_ids(db, models.Contact, contacts)
+            BacklogService.enqueue(db, [
+                (contact_id, contact["source_id"])
+                for contact_id, contact in zip(contact_ids, contacts)
+                if contact["operator_id"] is None
+            ], now)
+        else:
+            db.execute(insert(models.Contact), contacts)
+        record_created(db, [
+            (contact["created_at"], contact["source_id"], contact["operator_id"]) for contact in contacts
+        ])
+        db.commit()
+        summary.imported += len(rows)
+        
+        if assign_operators:
+            for operator_id, amount in Counter(assigned).items():
+                if operator_id is not None:
+                    load_tracker.increment(operator_id, amount)
+    
+    return _run_import(file, format, chunk_size, parse, import_chunk, progress)
@@ -0,0 +1,130 @@
+"""
+Operator load events for server-sent event streams (GET /operators/load/stream).
+
+The load tracker publishes every change of an operator's counter (contact
+assigned, deactivated or expired, backlog drain, import), the operators router
+publishes created and updated operators. Every open stream has a
+LoadSubscription that keeps pending events keyed by operator: a burst of
+assignments to one operator is sent as one event with the latest load, and a
+slow client holds at most one pending event per operator and kind.
+
+Like the tracker's counters, events are per process. Streams therefore also
+send a snapshot of all operators from operators.active_load every
+CRM_LOAD_STREAM_SNAPSHOT_INTERVAL seconds, which is authoritative with
+several workers and keeps idle connections alive.
+"""
+import asyncio
+import json
+import threading
+from typing import Any, Dict, List, Set, Tuple
+
+LOAD = "load"  # {"operator_id", "current_load"}
+OPERATOR = "operator"  # OperatorLoadInfo of a created or updated operator
+SNAPSHOT = "snapshot"  # OperatorLoadInfo of every operator
+
+
+def format_event(event: str, data: Any) -> str:
+    """One server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class LoadSubscription:
+    """Pending events of one stream; published from any thread, read on the event loop"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+        self._pending: Dict[Tuple[str, int], Any] = {}
+        self._resync = False
+        self._notified = False
+
+    def _wake(self) -> None:
+        # Called with the lock held; one wake-up per batch of pending events
+        if not self._notified:
+            self._notified = True
+            try:
+                self._loop.call_soon_threadsafe(self._ready.set)
+            except RuntimeError:
+                # Event loop closed: the stream is gone
+                pass
+
+    def push(self, event: str, operator_id: int, data: Any) -> None:
+        with self._lock:
+            # Re-insert so events stay in publishing order
+            self._pending.pop((event, operator_id), None)
+            self._pending[(event, operator_id)] = data
+            self._wake()
+
+    def request_resync(self) -> None:
+        """Counters were replaced: the stream sends a snapshot instead of pending events"""
+        with self._lock:
+            self._resync = True
+            self._pending.clear()
+            self._wake()
+
+    def discard_pending(self) -> None:
+        """Forget pending events (called before reading a snapshot, which contains them)"""
+        with self._lock:
+            self._pending.clear()
+            self._resync = False
+
+    async def next(self, timeout: float) -> Tuple[bool, List[Tuple[str, Any]]]:
+        """Wait up to `timeout` seconds for events; returns (snapshot requested, pending events)"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        with self._lock:
+            self._ready.clear()
+            self._notified = False
+            events = [(event, data) for (event, _), data in self._pending.items()]
+            self._pending = {}
+            resync, self._resync = self._resync, False
+        return resync, events
+
+
+class LoadEventBroker:
+    """Fans out operator load changes to the subscriptions of this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions: Set[LoadSubscription] = set()
+
+    def subscribe(self) -> LoadSubscription:
+        """New subscription delivering to the running event loop"""
+        subscription = LoadSubscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: LoadSubscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def _subscribers(self) -> List[LoadSubscription]:
+        with self._lock:
+            return list(self._subscriptions)
+
+    def load_changed(self, operator_id: int, current_load: int) -> None:
+        # Cheap check first: this runs on every assignment and deactivation
+        if not self._subscriptions:
+            return
+        data = {"operator_id": operator_id, "current_load": current_load}
+        for subscription in self._subscribers():
+            subscription.push(LOAD, operator_id, data)
+
+    def operator_changed(self, info: Dict[str, Any]) -> None:
+        """`info` is an OperatorLoadInfo dict of a created or updated operator"""
+        if not self._subscriptions:
+            return
+        for subscription in self._subscribers():
+            subscription.push(OPERATOR, info["operator_id"], info)
+
+    def resync(self) -> None:
+        """Ask every stream for a fresh snapshot (counters were reseeded or reconciled)"""
+        for subscription in self._subscribers():
+            subscription.request_resync()
+
+
+load_events = LoadEventBroker()
@@ -0,0 +1,147 @@
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import func, and_
+from app import models
+from app.load_events import load_events
+
+
+class OperatorLoadTracker:
+    """
+    In-memory counters of active contacts per operator.
+
+    Counters are seeded from the denormalized `operators.active_load`
+    column and then maintained incrementally on contact creation/deactivation,
+    so distribution doesn't need to query load for every operator on every
+    request. The column stays the source of truth: assignment reserves load
+    there with a conditional UPDATE. Counters of operators that look full
+    are re-read from it (refresh), since other workers' deactivations don't
+    reach this process. Every change is published to the load event streams
+    (app/load_events.py).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loads: Dict[int, int] = {}
+        self._seeded = False
+
+    @property
+    def seeded(self) -> bool:
+        return self._seeded
+
+    @staticmethod
+    def _count_active_contacts(db: Session) -> Dict[int, int]:
+        """Load counts of active contacts grouped by operator (single query)"""
+        rows = db.query(
+            models.Contact.operator_id,
+            func.count(models.Contact.id)
+        ).filter(
+            and_(
+                models.Contact.operator_id.isnot(None),
+                models.Contact.is_active == True
+            )
+        ).group_by(models.Contact.operator_id).all()
+        return {operator_id: count for operator_id, count in rows}
+
+    def seed(self, db: Session) -> None:
+        """Replace all counters with values of operators.active_load (single query)"""
+        loads = dict(db.query(models.Operator.id, models.Operator.active_load).all())
+        with self._lock:
+            self._loads = loads
+            self._seeded = True
+        load_events.resync()
+
+    def ensure_seeded(self, db: Session) -> None:
+        """Seed counters on first use (e.g. when startup hook didn't run)"""
+        if not self._seeded:
+            self.seed(db)
+
+    def reconcile(self, db: Session) -> Dict[int, Tuple[int, int]]:
+        """
+        Recount active contacts, fix operators.active_load and re-sync counters.
+        Returns drifted operators: operator_id -> (cached_load, actual_load)
+        """
+        actual = self._count_active_contacts(db)
+        stored = dict(db.query(models.Operator.id, models.Operator.active_load).all())
+
+        for operator_id, stored_load in stored.items():
+            if stored_load != actual.get(operator_id, 0):
+                db.query(models.Operator).filter(
+                    models.Operator.id == operator_id
+                ).update({"active_load": actual.get(operator_id, 0)}, synchronize_session=False)
+        db.commit()
+
+        with self._lock:
+            drift = {}
+            for operator_id in stored:
+                cached_load = self._loads.get(operator_id, 0)
+                actual_load = actual.get(operator_id, 0)
+                if cached_load != actual_load or stored[operator_id] != actual_load:
+                    drift[operator_id] = (cached_load, actual_load)
+            self._loads = {operator_id: actual.get(operator_id, 0) for operator_id in stored}
+            self._seeded = True
+        load_events.resync()
+        return drift
+
+    def refresh(
+        self,
+        db: Session,
+        operator_ids: Iterable[int],
+        uncommitted: Optional[Dict[int, int]] = None
+    ) -> bool:
+        """
+        Re-read operators.active_load of the given operators (single query).
+        Counters only follow this process's writes, so a deactivation handled by
+        another worker leaves them too high until refreshed. `uncommitted` is
+        load the caller reserved in its open transaction, which the query sees
+        but the counters must not include yet. Returns True if any counter went down.
+        """
+        operator_ids = list(operator_ids)
+        if not operator_ids:
+            return False
+        uncommitted = uncommitted or {}
+        loads = db.query(models.Operator.id, models.Operator.active_load).filter(
+            models.Operator.id.in_(operator_ids)
+        ).all()
+
+        freed = False
+        changed = {}
+        with self._lock:
+            for operator_id, active_load in loads:
+                load = max(active_load - uncommitted.get(operator_id, 0), 0)
+                current = self._loads.get(operator_id, 0)
+                if load != current:
+                    freed = freed or load < current
+                    self._loads[operator_id] = changed[operator_id] = load
+        for operator_id, load in changed.items():
+            load_events.load_changed(operator_id, load)
+        return freed
+
+    def get(self, operator_id: int) -> int:
+        """Current number of active contacts assigned to operator"""
+        return self._loads.get(operator_id, 0)
+
+    def increment(self, operator_id: int, amount: int = 1) -> None:
+        with self._lock:
+            load = self._loads[operator_id] = self._loads.get(operator_id, 0) + amount
+        load_events.load_changed(operator_id, load)
+
+    def decrement(self, operator_id: int, amount: int = 1) -> None:
+        with self._lock:
+            load = self._loads[operator_id] = max(self._loads.get(operator_id, 0) - amount, 0)
+        load_events.load_changed(operator_id, load)
+
+    def register_operator(self, operator_id: int) -> None:
+        """Start tracking a newly created operator"""
+        with self._lock:
+            self._loads.setdefault(operator_id, 0)
+
+    def reset(self) -> None:
+        """Drop all counters; they will be re-seeded on next use"""
+        with self._lock:
+            self._loads = {}
+            self._seeded = False
+        load_events.resync()
+
+
+load_tracker = OperatorLoadTracker()
@@ -1,6 +1,14 @@
 from fastapi import FastAPI
-from app.database import init_db
-from app.routers import operators, sources, contacts, leads, stats
+from app.config import settings
+from app.database import init_db, SessionLocal, engine, async_engine
+from app.metrics import MetricsMiddleware, instrument_engine
+from app.load_tracker import load_tracker
+from app.identity import backfill_lead_identities
+from app.rollups import ensure_rollups
+from app.services import BacklogService
+from app.expiry import expiry_scheduler
+from app.group_commit import contact_writer
+from app.routers import operators, sources, contacts, leads, stats, export, imports, metrics
 
 app = FastAPI(
     title="Mini-CRM Lead Distribution System",
@@ -8,18 +16,67 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Per-request SQL statement count, DB time and latency histograms
+instrument_engine(engine)
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine)
+app.add_middleware(MetricsMiddleware)
+
 # Initialize database on startup
 @app.on_event("startup")
 def startup_event():
     init_db()
+    
+    db = SessionLocal()
+    try:
+        # Index identifiers of leads created before the identity table existed
+        backfill_lead_identities(db)
+        # Build stats rollups for contacts created before they existed
+        ensure_rollups(db)
+        # Seed in-memory operator load counters with one grouped query
+        load_tracker.seed(db)
+        # Queue contacts left without operator before the backlog existed
+        # and hand out capacity freed while the app was down
+        BacklogService.enqueue_unassigned(db)
+        BacklogService.drain_all(db)
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    # Deactivate contacts older than their source's TTL in the background
+    expiry_scheduler.start()
+    if settings.contact_group_commit:
+        contact_writer.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    # Write contacts still queued for the group commit before exiting
+    await contact_writer.stop()
+    await expiry_scheduler.stop()
 
 
 # Include routers
 app.include_router(operators.router)
 app.include_router(sources.router)
+if settings.contact_group_commit:
+    # Group commit: ingested contacts are written by a single writer task
+    from app.routers import contacts_group
+    app.include_router(contacts_group.ingest_router)
+elif settings.db_async:
+    # Async mode: ingestion endpoints run on AsyncSession
+    from app.routers import contacts_async
+    app.include_router(contacts_async.ingest_router)
+else:
+    app.include_router(contacts.ingest_router)
 app.include_router(contacts.router)
 app.include_router(leads.router)
 app.include_router(stats.router)
+app.include_router(export.router)
+app.include_router(imports.router)
+app.include_router(metrics.router)
 
 
 @app.get("/")
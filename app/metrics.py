@@ -0,0 +1,264 @@
+"""
+Per-request SQL instrumentation and Prometheus metrics.
+
+SQLAlchemy cursor events count statements and DB time into the stats of the
+current request (a context variable set by MetricsMiddleware). The middleware
+exposes them as X-DB-Queries/Server-Timing headers and records per-route
+histograms, rendered in Prometheus text format by GET /metrics.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 250, 1000)
+GROUP_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+WAIT_BUCKETS = (1, 5, 15, 60, 300, 900, 1800, 3600, 4 * 3600, 12 * 3600, 86400, 7 * 86400)
+
+
+class RequestStats:
+    """Database usage of a single request"""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    """Prometheus histogram with labels"""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # labels -> (bucket counts, sum, count)
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+        for labels, (counts, total, count) in sorted(series.items()):
+            label_text = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+            prefix = label_text + "," if label_text else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            suffix = f"{{{label_text}}}" if label_text else ""
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+class Counter:
+    """Prometheus counter with labels"""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            label_text = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+            lines.append(f"{self.name}{{{label_text}}} {value}")
+        return lines
+
+
+class Gauge:
+    """Prometheus gauge whose values are collected on every scrape"""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Sequence[str],
+        collect: Callable[[], Dict[Tuple[str, ...], float]]
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.collect = collect
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        for labels, value in sorted(self.collect().items()):
+            label_text = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+            suffix = f"{{{label_text}}}" if label_text else ""
+            lines.append(f"{self.name}{suffix} {value}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.requests_total = Counter(
+            "crm_http_requests_total", "HTTP requests", ("method", "route", "status")
+        )
+        self.request_duration = Histogram(
+            "crm_http_request_duration_seconds", "Request handling time", ("method", "route"), LATENCY_BUCKETS
+        )
+        self.request_db_duration = Histogram(
+            "crm_http_request_db_seconds", "Database time per request", ("method", "route"), LATENCY_BUCKETS
+        )
+        self.request_db_queries = Histogram(
+            "crm_http_request_db_queries", "SQL statements per request", ("method", "route"), QUERY_COUNT_BUCKETS
+        )
+        self.operation_duration = Histogram(
+            "crm_operation_duration_seconds", "Duration of internal operations", ("operation",), LATENCY_BUCKETS
+        )
+        self.backlog_wait = Histogram(
+            "crm_backlog_wait_seconds", "Time contacts waited in the backlog for an operator", ("source_id",),
+            WAIT_BUCKETS
+        )
+        self.contacts_expired = Counter(
+            "crm_contacts_expired_total", "Contacts deactivated by their source's TTL", ("source_id",)
+        )
+        self.group_commit_size = Histogram(
+            "crm_group_commit_contacts", "Contacts written per group commit", (), GROUP_SIZE_BUCKETS
+        )
+        self.response_cache_requests = Counter(
+            "crm_response_cache_requests_total", "Cacheable GET requests by cache result (hit/miss) and response",
+            ("cache", "response")
+        )
+        self._collectors = [
+            self.requests_total,
+            self.request_duration,
+            self.request_db_duration,
+            self.request_db_queries,
+            self.operation_duration,
+            self.backlog_wait,
+            self.contacts_expired,
+            self.group_commit_size,
+            self.response_cache_requests,
+        ]
+
+    def register(self, collector):
+        """Add a collector (anything with render() -> lines) to /metrics output"""
+        self._collectors.append(collector)
+        return collector
+
+    def observe_request(
+        self, method: str, route: str, status: int, duration: float, stats: RequestStats
+    ) -> None:
+        self.requests_total.inc(method, route, str(status))
+        self.request_duration.observe(duration, method, route)
+        self.request_db_duration.observe(stats.db_time, method, route)
+        self.request_db_queries.observe(stats.queries, method, route)
+
+    def render(self) -> str:
+        lines = []
+        for collector in self._collectors:
+            lines.extend(collector.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+@contextmanager
+def timer(operation: str):
+    """Record duration of an internal operation (e.g. lead resolution)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.operation_duration.observe(time.perf_counter() - started, operation)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - started
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count statements and DB time of an engine into the current request stats"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording DB usage and latency of every HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_headers(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                handler_time = time.perf_counter() - started
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.queries).encode()))
+                headers.append((
+                    b"server-timing",
+                    f"db;dur={stats.db_time * 1000:.2f}, app;dur={handler_time * 1000:.2f}".encode()
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _request_stats.reset(token)
+            route = scope.get("route")
+            metrics.observe_request(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status,
+                time.perf_counter() - started,
+                stats
+            )
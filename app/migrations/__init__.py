@@ -0,0 +1,118 @@
+"""
+Versioned schema migrations.
+
+Migrations are modules of this package named m<version>_<name>.py with an
+upgrade(connection) function; the first docstring line describes them.
+Applied versions are recorded in the schema_migrations table. Pending
+migrations are applied in version order by init_db() at startup or by
+`python -m app.cli migrate`, in one transaction holding a database-wide
+lock, so workers starting at once apply them exactly once.
+
+m0001_baseline creates the schema frozen as it was before versioned
+migrations; every later change is made by the migration that introduces it,
+which must not read the current models or app code (they describe the
+final schema and behavior): helpers are copied into the migration.
+Migrations should be idempotent (IF NOT EXISTS, checkfirst, column checks).
+"""
+import importlib
+import pkgutil
+import re
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Optional, Tuple
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+from app.config import settings
+
+# Seconds a worker waits while another one applies migrations
+MIGRATION_LOCK_TIMEOUT = 600
+
+# Key of the PostgreSQL advisory lock held while migrating
+POSTGRES_LOCK_KEY = 7_301_520_021
+
+metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False)  # Naive UTC
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def load_migrations() -> List[Migration]:
+    """All migrations of the package in version order"""
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        match = re.fullmatch(r"m(\d+)_(\w+)", module_info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{__name__}.{module_info.name}")
+        description = (module.__doc__ or "").strip().split("\n")[0]
+        migrations.append(Migration(int(match.group(1)), match.group(2), description, module.upgrade))
+    
+    migrations.sort(key=lambda migration: migration.version)
+    for previous, migration in zip(migrations, migrations[1:]):
+        if previous.version == migration.version:
+            raise RuntimeError(f"Duplicate migration version {migration.version}")
+    return migrations
+
+
+@contextmanager
+def _locked_transaction(engine: Engine):
+    """Connection in a transaction that holds a database-wide write/advisory lock"""
+    with engine.connect() as connection:
+        if engine.dialect.name == "sqlite":
+            # pysqlite would begin the transaction lazily (and not before DDL),
+            # so the write lock is taken explicitly with BEGIN IMMEDIATE
+            connection.execution_options(isolation_level="AUTOCOMMIT")
+            connection.exec_driver_sql(f"PRAGMA busy_timeout = {MIGRATION_LOCK_TIMEOUT * 1000}")
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                yield connection
+                connection.exec_driver_sql("COMMIT")
+            except BaseException:
+                connection.exec_driver_sql("ROLLBACK")
+                raise
+            finally:
+                connection.exec_driver_sql(f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout)}")
+        else:
+            with connection.begin():
+                if engine.dialect.name == "postgresql":
+                    connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": POSTGRES_LOCK_KEY})
+                yield connection
+
+
+def apply_migrations(engine: Engine) -> List[Migration]:
+    """Apply pending migrations in version order, returns the applied ones"""
+    with _locked_transaction(engine) as connection:
+        schema_migrations.create(connection, checkfirst=True)
+        applied = set(connection.scalars(select(schema_migrations.c.version)))
+        pending = [migration for migration in load_migrations() if migration.version not in applied]
+        for migration in pending:
+            migration.upgrade(connection)
+            connection.execute(insert(schema_migrations).values(
+                version=migration.version,
+                name=migration.name,
+                applied_at=datetime.utcnow()
+            ))
+    return pending
+
+
+def migration_status(engine: Engine) -> List[Tuple[Migration, Optional[datetime]]]:
+    """Every migration with the time it was applied (None if pending)"""
+    with engine.connect() as connection:
+        schema_migrations.create(connection, checkfirst=True)
+        applied = dict(connection.execute(
+            select(schema_migrations.c.version, schema_migrations.c.applied_at)
+        ).all())
+        connection.commit()
+    return [(migration, applied.get(migration.version)) for migration in load_migrations()]
@@ -0,0 +1,140 @@
+"""
+Create missing tables and add columns introduced before versioned migrations.
+
+Replaces the create_all() + ALTER TABLE upgrade that init_db() used to run,
+so databases created by any earlier version end up with the same schema.
+The schema is frozen here as it was before versioned migrations: later
+model changes belong to the migrations that introduce them.
+"""
+from sqlalchemy import (
+    Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, MetaData, String, Table,
+    UniqueConstraint, inspect, text
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import func
+
+metadata = MetaData()
+
+Table(
+    "operators",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, nullable=False, index=True),
+    Column("is_active", Boolean, nullable=False),
+    Column("load_limit", Integer, nullable=False),
+    Column("active_load", Integer, server_default="0", nullable=False)
+)
+
+Table(
+    "sources",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, nullable=False, unique=True, index=True),
+    Column("description", String, nullable=True),
+    Column("contact_ttl_seconds", Integer, nullable=True),
+    Column("distribution_strategy", String, nullable=False, server_default="weighted_random")
+)
+
+Table(
+    "source_operator_weights",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("source_id", Integer, ForeignKey("sources.id"), nullable=False),
+    Column("operator_id", Integer, ForeignKey("operators.id"), nullable=False),
+    Column("weight", Float, nullable=False),
+    UniqueConstraint("source_id", "operator_id", name="uq_source_operator")
+)
+
+Table(
+    "leads",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("external_id", String, unique=True, nullable=True, index=True),
+    Column("phone", String, nullable=True, index=True),
+    Column("email", String, nullable=True, index=True),
+    Column("name", String, nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now(), index=True)
+)
+
+Table(
+    "lead_identities",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("kind", String, nullable=False),
+    Column("value", String, nullable=False),
+    Column("lead_id", Integer, ForeignKey("leads.id"), nullable=False, index=True),
+    UniqueConstraint("kind", "value", name="uq_lead_identity")
+)
+
+Table(
+    "contacts",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("lead_id", Integer, ForeignKey("leads.id"), nullable=False, index=True),
+    Column("source_id", Integer, ForeignKey("sources.id"), nullable=False, index=True),
+    Column("operator_id", Integer, ForeignKey("operators.id"), nullable=True, index=True),
+    Column("message", String, nullable=True),
+    Column("is_active", Boolean, nullable=False, index=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now(), index=True),
+    Column("deactivated_at", DateTime(timezone=True), nullable=True),
+    Index("ix_contacts_is_active_created_at", "is_active", "created_at")
+)
+
+Table(
+    "contact_rollups",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("granularity", String, nullable=False),
+    Column("bucket", DateTime, nullable=False),
+    Column("source_id", Integer, ForeignKey("sources.id"), nullable=False),
+    Column("operator_id", Integer, nullable=False),
+    Column("created", Integer, nullable=False),
+    Column("deactivated", Integer, nullable=False),
+    UniqueConstraint("granularity", "bucket", "source_id", "operator_id", name="uq_contact_rollup")
+)
+
+Table(
+    "backlog_entries",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("contact_id", Integer, ForeignKey("contacts.id"), nullable=False, unique=True),
+    Column("source_id", Integer, ForeignKey("sources.id"), nullable=False),
+    Column("enqueued_at", DateTime, nullable=False),
+    Index("ix_backlog_entries_source_id_id", "source_id", "id")
+)
+
+# (table, column, DDL) added to existing tables over time
+LEGACY_COLUMNS = [
+    ("contacts", "deactivated_at", "ALTER TABLE contacts ADD COLUMN deactivated_at TIMESTAMP"),
+    ("sources", "contact_ttl_seconds", "ALTER TABLE sources ADD COLUMN contact_ttl_seconds INTEGER"),
+    (
+        "sources", "distribution_strategy",
+        "ALTER TABLE sources ADD COLUMN distribution_strategy VARCHAR NOT NULL DEFAULT 'weighted_random'"
+    ),
+]
+
+
+def upgrade(connection: Connection) -> None:
+    metadata.create_all(bind=connection)
+
+    inspector = inspect(connection)
+    operator_columns = {column["name"] for column in inspector.get_columns("operators")}
+    if "active_load" not in operator_columns:
+        connection.execute(text(
+            "ALTER TABLE operators ADD COLUMN active_load INTEGER NOT NULL DEFAULT 0"
+        ))
+        connection.execute(text(
+            "UPDATE operators SET active_load = ("
+            "SELECT COUNT(*) FROM contacts "
+            "WHERE contacts.operator_id = operators.id AND contacts.is_active"
+            ")"
+        ))
+
+    for table, column, ddl in LEGACY_COLUMNS:
+        if column not in {existing["name"] for existing in inspector.get_columns(table)}:
+            connection.execute(text(ddl))
+
+    # Indexes added to tables that create_all() found already existing
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=connection, checkfirst=True)
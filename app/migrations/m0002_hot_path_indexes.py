@@ -0,0 +1,41 @@
+"""
+Replace single-column contact indexes with composite indexes of the hot queries.
+
+(operator_id, is_active), (source_id, operator_id) and (is_active, created_at)
+serve the load counts, distribution stats, listing filters and backlog
+queries; a partial index on active contacts by (source_id, created_at) serves
+expiry. Single-column indexes on operator_id, source_id and is_active are
+prefixes of the composite ones and are dropped to save write cost.
+"""
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, MetaData, Table, text
+from sqlalchemy.engine import Connection
+
+REDUNDANT_INDEXES = ("ix_contacts_operator_id", "ix_contacts_source_id", "ix_contacts_is_active")
+
+# Columns of contacts the indexes are defined on
+contacts = Table(
+    "contacts",
+    MetaData(),
+    Column("operator_id", Integer),
+    Column("source_id", Integer),
+    Column("is_active", Boolean),
+    Column("created_at", DateTime(timezone=True))
+)
+
+HOT_PATH_INDEXES = (
+    Index("ix_contacts_operator_id_is_active", contacts.c.operator_id, contacts.c.is_active),
+    Index("ix_contacts_source_id_operator_id", contacts.c.source_id, contacts.c.operator_id),
+    Index("ix_contacts_is_active_created_at", contacts.c.is_active, contacts.c.created_at),
+    Index(
+        "ix_contacts_active_source_id_created_at", contacts.c.source_id, contacts.c.created_at,
+        sqlite_where=contacts.c.is_active == True,
+        postgresql_where=contacts.c.is_active == True
+    ),
+)
+
+
+def upgrade(connection: Connection) -> None:
+    for index in HOT_PATH_INDEXES:
+        index.create(bind=connection, checkfirst=True)
+    for name in REDUNDANT_INDEXES:
+        connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
@@ -0,0 +1,65 @@
+"""
+Add the full-text lead search index (SQLite FTS5 trigram table leads_fts).
+
+leads_fts indexes name, phone, email and external_id of every lead, matching
+any substring of 3+ characters case-insensitively; phones are indexed with
+common separators removed (0004 switches to identity.normalize_phone). The
+table is contentless (rowid = leads.id, no copy of the values) and is kept
+in sync by triggers, so ORM writes, bulk inserts and imports are all
+indexed. Other databases keep LIKE-based search (app/search.py).
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+# Digits of a phone column (common separators removed)
+PHONE_DIGITS = (
+    "replace(replace(replace(replace(replace(replace({column}, "
+    "'+', ''), ' ', ''), '-', ''), '(', ''), ')', ''), '.', '')"
+)
+
+
+def _normalized_phone(column: str) -> str:
+    """Phone without common separators, a leading 8 of 11 digits becomes 7"""
+    digits = PHONE_DIGITS.format(column=column)
+    return (
+        f"CASE WHEN length({digits}) = 11 AND substr({digits}, 1, 1) = '8' "
+        f"THEN '7' || substr({digits}, 2) ELSE {digits} END"
+    )
+
+
+def _values(row: str) -> str:
+    return ", ".join((
+        f"{row}.id",
+        f"{row}.name",
+        _normalized_phone(f"{row}.phone"),
+        f"{row}.email",
+        f"{row}.external_id"
+    ))
+
+
+def upgrade(connection: Connection) -> None:
+    if connection.dialect.name != "sqlite":
+        return
+
+    exists = connection.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'leads_fts'"
+    )).first()
+    if exists:
+        return
+
+    connection.execute(text(
+        "CREATE VIRTUAL TABLE leads_fts USING fts5("
+        "name, phone, email, external_id, content='', tokenize='trigram'"
+        ")"
+    ))
+    columns = "rowid, name, phone, email, external_id"
+    # A contentless table forgets a row by 'delete' with the values it was indexed with
+    insert = f"INSERT INTO leads_fts({columns}) VALUES ({_values('new')});"
+    delete = f"INSERT INTO leads_fts(leads_fts, {columns}) VALUES ('delete', {_values('old')});"
+    connection.execute(text(f"CREATE TRIGGER leads_fts_insert AFTER INSERT ON leads BEGIN {insert} END"))
+    connection.execute(text(f"CREATE TRIGGER leads_fts_delete AFTER DELETE ON leads BEGIN {delete} END"))
+    connection.execute(text(
+        "CREATE TRIGGER leads_fts_update AFTER UPDATE OF name, phone, email, external_id ON leads "
+        f"BEGIN {delete} {insert} END"
+    ))
+    connection.execute(text(f"INSERT INTO leads_fts({columns}) SELECT {_values('leads')} FROM leads"))
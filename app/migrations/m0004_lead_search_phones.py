@@ -0,0 +1,85 @@
+"""
+Index lead phones in leads_fts the way identity.normalize_phone writes them.
+
+0003 normalized phones in SQL by removing common separators only, so a phone
+with any other character ("8 900 123/45/67") was indexed differently from
+how search terms and lead identities are normalized. SQLite can't remove
+every non-digit in SQL, so the application now stores normalize_phone(phone)
+in leads.normalized_phone on insert; this migration backfills it from Python
+and the triggers index it. Triggers stay plain SQL, so any SQLite client can
+write leads: rows written without normalized_phone fall back to the 0003 rule.
+"""
+import re
+from typing import Optional
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from app.migrations.m0003_lead_search import _normalized_phone
+
+TRIGGERS = ("leads_fts_insert", "leads_fts_delete", "leads_fts_update")
+
+# Leads backfilled per UPDATE executemany
+BACKFILL_BATCH_SIZE = 10000
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """identity.normalize_phone as of this migration: digits only, a leading 8 of 11 digits becomes 7"""
+    if phone is None:
+        return None
+    digits = re.sub(r"\D", "", phone)
+    if len(digits) == 11 and digits.startswith("8"):
+        digits = "7" + digits[1:]
+    return digits or None
+
+
+def _values(row: str) -> str:
+    phone = f"coalesce({row}.normalized_phone, {_normalized_phone(f'{row}.phone')})"
+    return f"{row}.id, {row}.name, {phone}, {row}.email, {row}.external_id"
+
+
+def _backfill(connection: Connection) -> None:
+    last_id = 0
+    while True:
+        rows = connection.execute(text(
+            "SELECT id, phone FROM leads "
+            "WHERE id > :last_id AND phone IS NOT NULL AND normalized_phone IS NULL "
+            "ORDER BY id LIMIT :limit"
+        ), {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE}).all()
+        if not rows:
+            return
+        connection.execute(
+            text("UPDATE leads SET normalized_phone = :normalized_phone WHERE id = :id"),
+            [{"id": lead_id, "normalized_phone": normalize_phone(phone)} for lead_id, phone in rows]
+        )
+        last_id = rows[-1].id
+
+
+def upgrade(connection: Connection) -> None:
+    columns = {column["name"] for column in inspect(connection).get_columns("leads")}
+    if "normalized_phone" not in columns:
+        connection.execute(text("ALTER TABLE leads ADD COLUMN normalized_phone VARCHAR"))
+    _backfill(connection)
+
+    if connection.dialect.name != "sqlite":
+        return
+    exists = connection.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'leads_fts'"
+    )).first()
+    if not exists:
+        return
+
+    for name in TRIGGERS:
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+    columns = "rowid, name, phone, email, external_id"
+    # A contentless table forgets a row by 'delete' with the values it was indexed with
+    insert = f"INSERT INTO leads_fts({columns}) VALUES ({_values('new')});"
+    delete = f"INSERT INTO leads_fts(leads_fts, {columns}) VALUES ('delete', {_values('old')});"
+    connection.execute(text(f"CREATE TRIGGER leads_fts_insert AFTER INSERT ON leads BEGIN {insert} END"))
+    connection.execute(text(f"CREATE TRIGGER leads_fts_delete AFTER DELETE ON leads BEGIN {delete} END"))
+    connection.execute(text(
+        "CREATE TRIGGER leads_fts_update "
+        "AFTER UPDATE OF name, phone, normalized_phone, email, external_id ON leads "
+        f"BEGIN {delete} {insert} END"
+    ))
+    # Rows indexed by 0003 can't be deleted with the new values: rebuild the whole index
+    connection.execute(text("INSERT INTO leads_fts(leads_fts) VALUES ('delete-all')"))
+    connection.execute(text(f"INSERT INTO leads_fts({columns}) SELECT {_values('leads')} FROM leads"))
@@ -0,0 +1,49 @@
+"""
+Add leads.normalized_name for exact name matches of lead search.
+
+Lead search ranks only the newest matches of the FTS index, so an older lead
+whose name equals the query would never be found for a common name. The
+indexed case-folded name (search.normalize_name) lets search look such leads
+up directly; it is backfilled from Python.
+"""
+from typing import Optional
+from sqlalchemy import Column, Index, MetaData, String, Table, inspect, text
+from sqlalchemy.engine import Connection
+
+# Leads backfilled per UPDATE executemany
+BACKFILL_BATCH_SIZE = 10000
+
+leads = Table("leads", MetaData(), Column("normalized_name", String))
+
+# Created after the column is added and backfilled
+NORMALIZED_NAME_INDEX = Index("ix_leads_normalized_name", leads.c.normalized_name)
+
+
+def normalize_name(name: Optional[str]) -> Optional[str]:
+    """search.normalize_name as of this migration: case-folded, whitespace collapsed"""
+    if name is None:
+        return None
+    return " ".join(name.split()).casefold() or None
+
+
+def upgrade(connection: Connection) -> None:
+    columns = {column["name"] for column in inspect(connection).get_columns("leads")}
+    if "normalized_name" not in columns:
+        connection.execute(text("ALTER TABLE leads ADD COLUMN normalized_name VARCHAR"))
+    
+    last_id = 0
+    while True:
+        rows = connection.execute(text(
+            "SELECT id, name FROM leads "
+            "WHERE id > :last_id AND name IS NOT NULL AND normalized_name IS NULL "
+            "ORDER BY id LIMIT :limit"
+        ), {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE}).all()
+        if not rows:
+            break
+        connection.execute(
+            text("UPDATE leads SET normalized_name = :normalized_name WHERE id = :id"),
+            [{"id": lead_id, "normalized_name": normalize_name(name)} for lead_id, name in rows]
+        )
+        last_id = rows[-1].id
+    
+    NORMALIZED_NAME_INDEX.create(bind=connection, checkfirst=True)
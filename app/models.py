@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Float, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Float, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -12,6 +12,7 @@ class Operator(Base):
     name = Column(String, nullable=False, index=True)
     is_active = Column(Boolean, default=True, nullable=False)
     load_limit = Column(Integer, default=10, nullable=False)  # Maximum active contacts
+    active_load = Column(Integer, default=0, server_default="0", nullable=False)  # Current active contacts (denormalized)
     
     # Relationships
     source_weights = relationship("SourceOperatorWeight", back_populates="operator", cascade="all, delete-orphan")
@@ -25,6 +26,10 @@ class Source(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, unique=True, index=True)
     description = Column(String, nullable=True)
+    contact_ttl_seconds = Column(Integer, nullable=True)  # Active contacts older than this expire (None - never)
+    distribution_strategy = Column(
+        String, nullable=False, default="weighted_random", server_default="weighted_random"
+    )  # Operator selection strategy, see app/strategies.py
     
     # Relationships
     operator_weights = relationship("SourceOperatorWeight", back_populates="source", cascade="all, delete-orphan")
@@ -57,12 +62,33 @@ class Lead(Base):
     id = Column(Integer, primary_key=True, index=True)
     external_id = Column(String, unique=True, nullable=True, index=True)  # External identifier (phone, email, etc.)
     phone = Column(String, nullable=True, index=True)
+    normalized_phone = Column(String, nullable=True)  # normalize_phone(phone), indexed by lead search
     email = Column(String, nullable=True, index=True)
     name = Column(String, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    normalized_name = Column(String, nullable=True, index=True)  # search.normalize_name(name), exact matches
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     
     # Relationships
     contacts = relationship("Contact", back_populates="lead", cascade="all, delete-orphan")
+    identities = relationship("LeadIdentity", back_populates="lead", cascade="all, delete-orphan")
+
+
+class LeadIdentity(Base):
+    """Normalized lead identifier (external_id, phone or email) pointing to a lead"""
+    __tablename__ = "lead_identities"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # external_id / phone / email
+    value = Column(String, nullable=False)  # Normalized value
+    lead_id = Column(Integer, ForeignKey("leads.id"), nullable=False, index=True)
+    
+    # Relationships
+    lead = relationship("Lead", back_populates="identities")
+    
+    # Unique constraint: one identifier belongs to one lead
+    __table_args__ = (
+        UniqueConstraint('kind', 'value', name='uq_lead_identity'),
+    )
 
 
 class Contact(Base):
@@ -70,15 +96,64 @@ class Contact(Base):
     __tablename__ = "contacts"
 
     id = Column(Integer, primary_key=True, index=True)
-    lead_id = Column(Integer, ForeignKey("leads.id"), nullable=False)
+    lead_id = Column(Integer, ForeignKey("leads.id"), nullable=False, index=True)
     source_id = Column(Integer, ForeignKey("sources.id"), nullable=False)
     operator_id = Column(Integer, ForeignKey("operators.id"), nullable=True)  # Nullable if no operator available
     message = Column(String, nullable=True)  # Optional message/context
     is_active = Column(Boolean, default=True, nullable=False)  # Active contact (counts toward load)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    deactivated_at = Column(DateTime(timezone=True), nullable=True)
     
     # Relationships
     lead = relationship("Lead", back_populates="contacts")
     source = relationship("Source", back_populates="contacts")
     operator = relationship("Operator", back_populates="contacts")
+    
+    # Composite indexes of the hot queries (see app/query_plans.py); they also
+    # serve lookups by their first column, so operator_id, source_id and
+    # is_active have no single-column indexes
+    __table_args__ = (
+        # Load counts and listing by operator, unassigned contacts
+        Index('ix_contacts_operator_id_is_active', 'operator_id', 'is_active'),
+        # Distribution stats grouped by source and operator
+        Index('ix_contacts_source_id_operator_id', 'source_id', 'operator_id'),
+        # Active contacts in creation order
+        Index('ix_contacts_is_active_created_at', 'is_active', 'created_at'),
+        # Expiry per source; partial, so it holds active contacts only
+        Index(
+            'ix_contacts_active_source_id_created_at', 'source_id', 'created_at',
+            sqlite_where=is_active == True,
+            postgresql_where=is_active == True
+        ),
+    )
+
 
+class ContactRollup(Base):
+    """Pre-aggregated contact counts per time bucket, source and operator"""
+    __tablename__ = "contact_rollups"
+
+    id = Column(Integer, primary_key=True)
+    granularity = Column(String, nullable=False)  # minute, hour or day
+    bucket = Column(DateTime, nullable=False)  # Bucket start, naive UTC
+    source_id = Column(Integer, ForeignKey("sources.id"), nullable=False)
+    operator_id = Column(Integer, nullable=False)  # 0 for contacts without operator
+    created = Column(Integer, default=0, nullable=False)
+    deactivated = Column(Integer, default=0, nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint('granularity', 'bucket', 'source_id', 'operator_id', name='uq_contact_rollup'),
+    )
+
+
+class BacklogEntry(Base):
+    """Active contact waiting for an operator; FIFO per source in id order"""
+    __tablename__ = "backlog_entries"
+
+    id = Column(Integer, primary_key=True)
+    contact_id = Column(Integer, ForeignKey("contacts.id"), nullable=False, unique=True)
+    source_id = Column(Integer, ForeignKey("sources.id"), nullable=False)
+    enqueued_at = Column(DateTime, nullable=False)  # Naive UTC
+    
+    __table_args__ = (
+        Index('ix_backlog_entries_source_id_id', 'source_id', 'id'),
+    )
@@ -0,0 +1,45 @@
+from typing import Optional, List
+from fastapi import Query, Response
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Response header with the cursor of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """Keyset pagination query parameters: `cursor` is the last id of the previous page"""
+
+    def __init__(
+        self,
+        cursor: Optional[int] = Query(None, description="Return items with id greater than cursor"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+
+def keyset_page(query, id_column, cursor: Optional[int], limit: int):
+    """
+    Fetch one page of `query` ordered by `id_column`.
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    if cursor is not None:
+        query = query.filter(id_column > cursor)
+
+    # One extra row tells whether there is a next page
+    items = query.order_by(id_column).limit(limit + 1).all()
+    if len(items) <= limit:
+        return items, None
+
+    items = items[:limit]
+    return items, getattr(items[-1], id_column.key)
+
+
+def paginate(query, id_column, page: PageParams, response: Response) -> List:
+    """Fetch a page and expose the next cursor in the response header"""
+    items, next_cursor = keyset_page(query, id_column, page.cursor, page.limit)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = str(next_cursor)
+    return items
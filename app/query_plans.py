@@ -0,0 +1,147 @@
+"""
+Query plan checks of the hot queries (SQLite).
+
+HOT_QUERIES are built the way the application runs them. check_query_plans
+runs EXPLAIN QUERY PLAN for each one and fails queries that read a whole
+large table ("SCAN contacts" without an index) or don't use the index they
+were designed for (EXPECTED_INDEXES): without it SQLite usually falls back
+to a less selective index, e.g. all active contacts by is_active. Run with
+`python -m app.cli check-query-plans`.
+"""
+import re
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import and_, func, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Select
+from app import models, search
+
+# Tables that grow with traffic; small ones (sources, operators) may be scanned
+LARGE_TABLES = {"contacts", "leads", "lead_identities", "backlog_entries", "contact_rollups"}
+
+# "SCAN contacts" reads the whole table ("SCAN contacts USING [COVERING] INDEX" doesn't);
+# so does building an automatic index for a join, which SQLite does when no index fits
+FULL_SCAN = re.compile(r"^(?:SCAN (\w+)(?: AS \w+)?|SEARCH (\w+)(?: AS \w+)? USING AUTOMATIC .*)$")
+
+
+def _since(days: int) -> datetime:
+    return datetime.utcnow() - timedelta(days=days)
+
+
+# (name, statement) of the queries on the ingestion, listing, stats and maintenance paths
+HOT_QUERIES: List[Tuple[str, Callable[[], Select]]] = [
+    ("operator load counts", lambda: select(
+        models.Contact.operator_id, func.count(models.Contact.id)
+    ).where(
+        models.Contact.operator_id.isnot(None),
+        models.Contact.is_active == True
+    ).group_by(models.Contact.operator_id)),
+    ("contacts by operator", lambda: select(models.Contact.id).where(
+        models.Contact.operator_id == 1,
+        models.Contact.is_active == True
+    ).order_by(models.Contact.id).limit(50)),
+    ("contacts by source", lambda: select(models.Contact.id).where(
+        models.Contact.source_id == 1
+    ).order_by(models.Contact.id).limit(50)),
+    ("contacts of lead", lambda: select(models.Contact.id).where(
+        models.Contact.lead_id == 1
+    )),
+    ("distribution stats", lambda: select(
+        models.Source.id, models.Contact.operator_id, func.count(models.Contact.id)
+    ).outerjoin(
+        models.Contact, and_(
+            models.Contact.source_id == models.Source.id,
+            models.Contact.created_at >= _since(1)
+        )
+    ).group_by(models.Source.id, models.Contact.operator_id)),
+    ("expiry batch", lambda: select(models.Contact.id).where(
+        models.Contact.is_active == True,
+        models.Contact.source_id == 1,
+        models.Contact.created_at < _since(1)
+    ).order_by(models.Contact.created_at).limit(1000)),
+    ("unassigned contacts", lambda: select(models.Contact.id).where(
+        models.Contact.operator_id.is_(None),
+        models.Contact.is_active == True,
+        ~select(models.BacklogEntry.id).where(
+            models.BacklogEntry.contact_id == models.Contact.id
+        ).exists()
+    ).order_by(models.Contact.id)),
+    ("backlog drain", lambda: select(models.BacklogEntry.id).where(
+        models.BacklogEntry.source_id == 1
+    ).order_by(models.BacklogEntry.id).limit(100)),
+    ("lead identity lookup", lambda: select(models.LeadIdentity.lead_id).where(
+        models.LeadIdentity.kind == "email",
+        models.LeadIdentity.value.in_(["a@example.com", "b@example.com"])
+    )),
+    ("stats timeseries", lambda: select(
+        models.ContactRollup.bucket, func.sum(models.ContactRollup.created)
+    ).where(
+        models.ContactRollup.granularity == "hour",
+        models.ContactRollup.bucket >= _since(7),
+        models.ContactRollup.bucket < datetime.utcnow()
+    ).group_by(models.ContactRollup.bucket).order_by(models.ContactRollup.bucket)),
+    ("lead search", lambda: search.candidate_query(["ivan"], "sqlite")),
+    ("lead exact match", lambda: search.exact_match_query(["ivan"])),
+]
+
+
+# Indexes a hot query may use, any one of them (queries on small tables or FTS are not listed)
+EXPECTED_INDEXES: Dict[str, Tuple[str, ...]] = {
+    "contacts by operator": ("ix_contacts_operator_id_is_active",),
+    "contacts by source": ("ix_contacts_source_id_operator_id",),
+    "contacts of lead": ("ix_contacts_lead_id",),
+    "distribution stats": ("ix_contacts_source_id_operator_id",),
+    # Without statistics SQLite costs both the same and picks by index order
+    "expiry batch": ("ix_contacts_active_source_id_created_at", "ix_contacts_is_active_created_at"),
+    "unassigned contacts": ("ix_contacts_operator_id_is_active",),
+    "backlog drain": ("ix_backlog_entries_source_id_id",),
+    "lead identity lookup": ("sqlite_autoindex_lead_identities_1",),  # UNIQUE (kind, value)
+    "stats timeseries": ("sqlite_autoindex_contact_rollups_1",),  # UNIQUE (granularity, bucket, ...)
+    "lead exact match": ("ix_leads_normalized_name",),
+}
+
+
+class QueryPlan(NamedTuple):
+    name: str
+    plan: List[str]
+    full_scans: List[str]  # Large tables read in full
+    missing_index: Optional[str] = None  # Expected indexes, none of which the plan uses
+
+    @property
+    def ok(self) -> bool:
+        return not self.full_scans and self.missing_index is None
+
+
+def explain(connection: Connection, statement: Select) -> List[str]:
+    """EXPLAIN QUERY PLAN details of a statement, indented by depth"""
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+    parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + compiled.string, parameters).all()
+    
+    depths = {0: -1}
+    plan = []
+    for node_id, parent_id, _, detail in rows:
+        depths[node_id] = depths.get(parent_id, -1) + 1
+        plan.append("  " * depths[node_id] + detail)
+    return plan
+
+
+def check_query_plans(connection: Connection) -> List[QueryPlan]:
+    """Plans of all hot queries; a query fails if it scans a large table in full or misses its index"""
+    if connection.dialect.name != "sqlite":
+        raise RuntimeError("Query plan checks support SQLite only")
+    
+    results = []
+    for name, build in HOT_QUERIES:
+        plan = explain(connection, build())
+        full_scans = []
+        for detail in plan:
+            match = FULL_SCAN.match(detail.strip())
+            table = match and (match.group(1) or match.group(2))
+            if table in LARGE_TABLES:
+                full_scans.append(table)
+        indexes = EXPECTED_INDEXES.get(name, ())
+        used = set(re.findall(r"\bINDEX (\w+)", "\n".join(plan)))
+        missing_index = None if not indexes or used & set(indexes) else " or ".join(indexes)
+        results.append(QueryPlan(name, plan, full_scans, missing_index))
+    return results
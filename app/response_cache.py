@@ -0,0 +1,126 @@
+"""
+In-process cache of serialized GET responses with ETags.
+
+Cached responses belong to namespaces ("operators", "sources"), each with a
+version that write endpoints bump through invalidate(). An entry is stored
+with the versions it was built at and is never served once one of them
+changed. Entries also expire after CRM_RESPONSE_CACHE_TTL seconds: versions
+are per process, so the TTL bounds how long another worker's writes go unseen.
+
+ETags are strong hashes of the body, so they are the same in every worker and
+survive rebuilds of unchanged content. A request whose If-None-Match matches
+gets 304 Not Modified; a cache hit runs no queries and no serialization.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional, Sequence, Tuple
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from app.config import settings
+from app.metrics import metrics
+
+OPERATORS = "operators"
+SOURCES = "sources"  # Sources and their operator weights
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    headers: Dict[str, str]
+    expires_at: float
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for it)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+class ResponseCache:
+    """LRU of serialized responses keyed by request path and query, validated by namespace versions"""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, ...], CachedResponse]]" = OrderedDict()
+
+    def invalidate(self, *namespaces: str) -> None:
+        """Make responses of the namespaces stale (call after the write is committed)"""
+        with self._lock:
+            for namespace in namespaces:
+                self._versions[namespace] = self._versions.get(namespace, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def respond(
+        self,
+        request: Request,
+        namespaces: Sequence[str],
+        adapter: TypeAdapter,
+        build: Callable[[Response], Any]
+    ) -> Response:
+        """
+        Cached response for the request, or one built by build(response):
+        it returns the content to serialize with `adapter` and may set headers
+        on `response` (e.g. the next page cursor), which are cached too.
+        """
+        key = request.url.path + "?" + "&".join(
+            f"{name}={value}" for name, value in sorted(request.query_params.multi_items())
+        )
+        with self._lock:
+            versions = tuple(self._versions.get(namespace, 0) for namespace in namespaces)
+            cached = self._entries.get(key)
+            if cached is not None:
+                if cached[0] == versions and cached[1].expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                else:
+                    del self._entries[key]
+                    cached = None
+
+        if cached is not None:
+            entry = cached[1]
+            result = "hit"
+        else:
+            response = Response()
+            body = adapter.dump_json(adapter.validate_python(build(response), from_attributes=True))
+            headers = {
+                name: value for name, value in response.headers.items()
+                if name not in ("content-length", "content-type")
+            }
+            entry = CachedResponse(body, make_etag(body), headers, time.monotonic() + self.ttl)
+            result = "miss"
+            if self.ttl > 0:
+                with self._lock:
+                    # Don't cache a response built from data that changed meanwhile
+                    if versions == tuple(self._versions.get(namespace, 0) for namespace in namespaces):
+                        self._entries[key] = (versions, entry)
+                        self._entries.move_to_end(key)
+                        while len(self._entries) > self.max_entries:
+                            self._entries.popitem(last=False)
+
+        # Clients may reuse the response but must revalidate it
+        headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            metrics.response_cache_requests.inc(result, "not_modified")
+            return Response(status_code=304, headers=headers)
+        metrics.response_cache_requests.inc(result, "ok")
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+response_cache = ResponseCache(settings.response_cache_ttl, settings.response_cache_max_entries)
@@ -0,0 +1,142 @@
+"""
+Pre-aggregated contact counts for time series statistics.
+
+contact_rollups holds created/deactivated counters per (granularity, bucket,
+source_id, operator_id). Counters are upserted in the transaction that
+creates or deactivates contacts, or assigns a queued contact (its created
+count moves to the operator), so /stats/timeseries never scans contacts.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from app import models
+from app.database import dialect_insert, to_db_datetime
+
+GRANULARITIES = ("minute", "hour", "day")
+
+# operator_id of contacts created without an operator
+UNASSIGNED_OPERATOR_ID = 0
+
+# Contacts read per round trip when rebuilding
+REBUILD_BATCH_SIZE = 10000
+
+# (timestamp, source_id, operator_id) of a created or deactivated contact
+ContactEvent = Tuple[datetime, int, Optional[int]]
+# (granularity, bucket, source_id, operator_id) -> [created, deactivated]
+RollupCounts = Dict[Tuple[str, datetime, int, int], list]
+
+
+def bucket_start(value: datetime, granularity: str) -> datetime:
+    """Start of the minute/hour/day bucket containing value (naive UTC)"""
+    return _buckets(value)[GRANULARITIES.index(granularity)]
+
+
+def _buckets(value: datetime) -> Tuple[datetime, datetime, datetime]:
+    minute = to_db_datetime(value).replace(second=0, microsecond=0)
+    hour = minute.replace(minute=0)
+    return minute, hour, hour.replace(hour=0)
+
+
+def _add_events(counts: RollupCounts, events: Iterable[ContactEvent], column: int) -> None:
+    for timestamp, source_id, operator_id in events:
+        operator_id = operator_id or UNASSIGNED_OPERATOR_ID
+        for granularity, bucket in zip(GRANULARITIES, _buckets(timestamp)):
+            counts.setdefault((granularity, bucket, source_id, operator_id), [0, 0])[column] += 1
+
+
+def _upsert(db: Session, counts: RollupCounts) -> None:
+    """Add counts to existing rollup rows, creating missing ones (one executemany)"""
+    if not counts:
+        return
+    table = models.ContactRollup.__table__
+    statement = dialect_insert(db, table)
+    statement = statement.on_conflict_do_update(
+        index_elements=["granularity", "bucket", "source_id", "operator_id"],
+        set_={
+            "created": table.c.created + statement.excluded.created,
+            "deactivated": table.c.deactivated + statement.excluded.deactivated
+        }
+    )
+    db.execute(statement, [
+        {
+            "granularity": granularity,
+            "bucket": bucket,
+            "source_id": source_id,
+            "operator_id": operator_id,
+            "created": created,
+            "deactivated": deactivated
+        }
+        for (granularity, bucket, source_id, operator_id), (created, deactivated) in counts.items()
+    ])
+
+
+def record_created(db: Session, events: Iterable[ContactEvent]) -> None:
+    """Count created contacts in the current transaction (the caller commits)"""
+    counts: RollupCounts = {}
+    _add_events(counts, events, 0)
+    _upsert(db, counts)
+
+
+def record_deactivated(db: Session, events: Iterable[ContactEvent]) -> None:
+    """Count deactivated contacts in the current transaction (the caller commits)"""
+    counts: RollupCounts = {}
+    _add_events(counts, events, 1)
+    _upsert(db, counts)
+
+
+def record_assigned(db: Session, events: Iterable[ContactEvent]) -> None:
+    """
+    Move created counts of queued contacts that got an operator from the
+    unassigned operator to theirs; events are (created_at, source_id,
+    operator_id). Runs in the current transaction (the caller commits).
+    """
+    counts: RollupCounts = {}
+    for created_at, source_id, operator_id in events:
+        for granularity, bucket in zip(GRANULARITIES, _buckets(created_at)):
+            counts.setdefault((granularity, bucket, source_id, UNASSIGNED_OPERATOR_ID), [0, 0])[0] -= 1
+            counts.setdefault((granularity, bucket, source_id, operator_id), [0, 0])[0] += 1
+    _upsert(db, counts)
+
+
+def rebuild_rollups(db: Session) -> int:
+    """
+    Recompute all rollups from the contacts table in one transaction.
+    Inactive contacts without deactivated_at (deactivated before it was
+    recorded, or imported as history) count as created only.
+    Returns number of processed contacts.
+    """
+    counts: RollupCounts = {}
+    processed = 0
+    result = db.execute(
+        select(
+            models.Contact.created_at,
+            models.Contact.deactivated_at,
+            models.Contact.source_id,
+            models.Contact.operator_id
+        ).execution_options(yield_per=REBUILD_BATCH_SIZE)
+    )
+    for rows in result.partitions():
+        _add_events(counts, (
+            (created_at, source_id, operator_id) for created_at, _, source_id, operator_id in rows
+        ), 0)
+        _add_events(counts, (
+            (deactivated_at, source_id, operator_id)
+            for _, deactivated_at, source_id, operator_id in rows
+            if deactivated_at is not None
+        ), 1)
+        processed += len(rows)
+    
+    db.execute(delete(models.ContactRollup))
+    _upsert(db, counts)
+    db.commit()
+    return processed
+
+
+def ensure_rollups(db: Session) -> int:
+    """Build rollups for a database whose contacts predate them"""
+    if db.query(models.ContactRollup.id).first() is not None:
+        return 0
+    if db.query(models.Contact.id).first() is None:
+        return 0
+    return rebuild_rollups(db)
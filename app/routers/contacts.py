@@ -1,14 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional, Union
+from datetime import datetime
+from app.database import get_db, to_db_datetime
 from app import models, schemas
+from app.pagination import NEXT_CURSOR_HEADER, PageParams, keyset_page, paginate
 from app.services import ContactService
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
+# Sync ingestion endpoints; replaced by app.routers.contacts_async in async mode
+ingest_router = APIRouter(prefix="/contacts", tags=["contacts"])
 
+# `view` query parameter: full ContactResponse or ContactSlimResponse without nested objects
+CONTACT_VIEW_PATTERN = "^(full|slim)$"
 
-@router.post("/", response_model=schemas.ContactResponse)
+_slim_contacts = TypeAdapter(List[schemas.ContactSlimResponse])
+
+# Response model of endpoints with the `view` parameter (documents both views)
+ContactListResponse = Union[List[schemas.ContactResponse], List[schemas.ContactSlimResponse]]
+
+# Columns of ContactSlimResponse, selected without loading ORM objects
+SLIM_CONTACT_COLUMNS = (
+    models.Contact.id,
+    models.Contact.lead_id,
+    models.Contact.source_id,
+    models.Contact.operator_id,
+    models.Contact.is_active,
+    models.Contact.created_at
+)
+
+
+def slim_contacts_response(rows, next_cursor: Optional[int] = None) -> Response:
+    """Serialize contact rows as a list of ContactSlimResponse"""
+    headers = {NEXT_CURSOR_HEADER: str(next_cursor)} if next_cursor is not None else None
+    return Response(
+        content=_slim_contacts.dump_json(_slim_contacts.validate_python(rows, from_attributes=True)),
+        media_type="application/json",
+        headers=headers
+    )
+
+
+@ingest_router.post("/", response_model=schemas.ContactResponse)
 def create_contact(contact: schemas.ContactCreate, db: Session = Depends(get_db)):
     """
     Register a new contact/appeal from a lead.
@@ -20,25 +53,94 @@ def create_contact(contact: schemas.ContactCreate, db: Session = Depends(get_db)
     If no suitable operator is available, contact is created without operator (operator_id = null).
     """
     try:
-        db_contact = ContactService.create_contact(db, contact)
-        
-        # Load relationships for response
-        db.refresh(db_contact)
-        return db_contact
+        return ContactService.create_contact(db, contact)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/", response_model=List[schemas.ContactResponse])
-def list_contacts(db: Session = Depends(get_db)):
-    """Get list of all contacts"""
-    return db.query(models.Contact).all()
+@ingest_router.post("/batch", response_model=schemas.ContactBatchResponse)
+def create_contacts_batch(batch: schemas.ContactBatchCreate, db: Session = Depends(get_db)):
+    """
+    Register a batch of contacts in one transaction.
+    Leads are resolved in bulk and operators are assigned respecting load limits
+    within the batch. Returns a result for each item; items with an unknown
+    source are reported with an error and not created.
+    """
+    results = ContactService.create_contacts_batch(db, batch.contacts)
+    failed = sum(1 for result in results if result.error)
+    return schemas.ContactBatchResponse(
+        created=len(results) - failed,
+        failed=failed,
+        results=results
+    )
+
+
+@router.get("/", response_model=ContactListResponse)
+def list_contacts(
+    response: Response,
+    page: PageParams = Depends(),
+    operator_id: Optional[int] = None,
+    source_id: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    view: str = Query("full", pattern=CONTACT_VIEW_PATTERN),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a page of contacts ordered by id (next cursor in the X-Next-Cursor header).
+    Optionally filtered by operator, source, activity and creation time window.
+    view=slim returns contacts without nested lead, source and operator.
+    """
+    if view == "slim":
+        query = db.query(*SLIM_CONTACT_COLUMNS)
+    else:
+        query = db.query(models.Contact).options(*ContactService.response_options())
+    if operator_id is not None:
+        query = query.filter(models.Contact.operator_id == operator_id)
+    if source_id is not None:
+        query = query.filter(models.Contact.source_id == source_id)
+    if is_active is not None:
+        query = query.filter(models.Contact.is_active == is_active)
+    if created_from is not None:
+        query = query.filter(models.Contact.created_at >= to_db_datetime(created_from))
+    if created_to is not None:
+        query = query.filter(models.Contact.created_at < to_db_datetime(created_to))
+    
+    if view == "slim":
+        return slim_contacts_response(*keyset_page(query, models.Contact.id, page.cursor, page.limit))
+    return paginate(query, models.Contact.id, page, response)
+
+
+@router.post("/deactivate", response_model=schemas.ContactDeactivateResponse)
+def deactivate_contacts(request: schemas.ContactDeactivateRequest, db: Session = Depends(get_db)):
+    """
+    Deactivate active contacts by id list and/or filters (all given criteria must match).
+    Contacts are deactivated in batches, each committed together with the operator
+    load it releases; freed capacity is then offered to the backlog.
+    """
+    conditions = []
+    if request.source_id is not None:
+        conditions.append(models.Contact.source_id == request.source_id)
+    if request.operator_id is not None:
+        conditions.append(models.Contact.operator_id == request.operator_id)
+    if request.lead_id is not None:
+        conditions.append(models.Contact.lead_id == request.lead_id)
+    if request.created_before is not None:
+        conditions.append(models.Contact.created_at < to_db_datetime(request.created_before))
+    if request.contact_ids is None and not conditions:
+        raise HTTPException(status_code=400, detail="Specify contact_ids or at least one filter")
+    
+    deactivated = ContactService.deactivate_contacts(db, request.contact_ids, conditions)
+    return schemas.ContactDeactivateResponse(deactivated=deactivated)
 
 
 @router.get("/{contact_id}", response_model=schemas.ContactResponse)
 def get_contact(contact_id: int, db: Session = Depends(get_db)):
     """Get contact by ID"""
-    contact = db.query(models.Contact).filter(models.Contact.id == contact_id).first()
+    contact = db.query(models.Contact).options(
+        *ContactService.response_options(joinedload)
+    ).filter(models.Contact.id == contact_id).first()
     if not contact:
         raise HTTPException(status_code=404, detail="Contact not found")
     return contact
@@ -51,7 +153,6 @@ def deactivate_contact(contact_id: int, db: Session = Depends(get_db)):
     if not contact:
         raise HTTPException(status_code=404, detail="Contact not found")
     
-    contact.is_active = False
-    db.commit()
+    ContactService.deactivate_contact(db, contact)
     return {"message": "Contact deactivated", "contact_id": contact_id}
 
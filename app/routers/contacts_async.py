@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app import schemas
+from app.async_services import AsyncContactService
+
+# Async ingestion endpoints, used instead of contacts.ingest_router in async mode
+ingest_router = APIRouter(prefix="/contacts", tags=["contacts"])
+
+
+@ingest_router.post("/", response_model=schemas.ContactResponse)
+async def create_contact(contact: schemas.ContactCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Register a new contact/appeal from a lead.
+    System will:
+    1. Find or create lead based on provided identifiers
+    2. Assign operator based on source, weights, and load limits
+    3. Create contact record
+    
+    If no suitable operator is available, contact is created without operator (operator_id = null).
+    """
+    try:
+        return await AsyncContactService.create_contact(db, contact)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@ingest_router.post("/batch", response_model=schemas.ContactBatchResponse)
+async def create_contacts_batch(batch: schemas.ContactBatchCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Register a batch of contacts in one transaction.
+    Leads are resolved in bulk and operators are assigned respecting load limits
+    within the batch. Returns a result for each item; items with an unknown
+    source are reported with an error and not created.
+    """
+    results = await AsyncContactService.create_contacts_batch(db, batch.contacts)
+    failed = sum(1 for result in results if result.error)
+    return schemas.ContactBatchResponse(
+        created=len(results) - failed,
+        failed=failed,
+        results=results
+    )
@@ -0,0 +1,152 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from typing import Optional
+from app.database import get_db, to_db_datetime
+from app import models
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+# Rows fetched from the cursor and written to the response at once
+EXPORT_BATCH_SIZE = 1000
+
+# Response header with the upper bound of the exported window;
+# pass it as created_from of the next incremental export
+WATERMARK_HEADER = "X-Export-Watermark"
+
+# Default watermark trails the clock: rows stamped by the database just now
+# (second precision) may still be uncommitted and would be missed otherwise
+WATERMARK_LAG = timedelta(seconds=5)
+
+EXPORT_FORMAT_PATTERN = "^(csv|ndjson)$"
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def _export_window(created_column, created_from: Optional[datetime], created_to: Optional[datetime]):
+    """
+    Filter for the half-open window [created_from, created_to).
+    created_to defaults to (almost) now, so consecutive exports using the
+    returned watermark as created_from neither skip nor repeat rows.
+    """
+    if created_to is None:
+        created_to = datetime.now(timezone.utc).replace(microsecond=0) - WATERMARK_LAG
+    conditions = [created_column < to_db_datetime(created_to)]
+    if created_from is not None:
+        conditions.append(created_column >= to_db_datetime(created_from))
+    return conditions, created_to
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _stream_rows(db: Session, statement, format: str):
+    """
+    Encode result rows batch by batch. Core row tuples are fetched with
+    yield_per, so neither ORM objects nor the whole result are kept in memory.
+    """
+    result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    columns = list(result.keys())
+    
+    if format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for rows in result.partitions():
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        # Header of an empty export
+        if buffer.tell():
+            yield buffer.getvalue()
+    else:
+        for rows in result.partitions():
+            yield "".join(
+                json.dumps({column: _json_value(value) for column, value in zip(columns, row)}) + "\n"
+                for row in rows
+            )
+
+
+def _export_response(db: Session, statement, format: str, name: str, watermark: datetime) -> StreamingResponse:
+    return StreamingResponse(
+        _stream_rows(db, statement, format),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.{format}"',
+            WATERMARK_HEADER: watermark.isoformat()
+        }
+    )
+
+
+@router.get("/contacts")
+def export_contacts(
+    format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Stream all contacts with lead, source and operator names as CSV or NDJSON.
+    Contacts created in [created_from, created_to) are exported; the upper bound
+    (a few seconds ago by default) is returned in the X-Export-Watermark header.
+    """
+    conditions, watermark = _export_window(models.Contact.created_at, created_from, created_to)
+    statement = select(
+        models.Contact.id.label("contact_id"),
+        models.Contact.created_at,
+        models.Contact.is_active,
+        models.Contact.message,
+        models.Contact.lead_id,
+        models.Lead.external_id.label("lead_external_id"),
+        models.Lead.phone.label("lead_phone"),
+        models.Lead.email.label("lead_email"),
+        models.Lead.name.label("lead_name"),
+        models.Contact.source_id,
+        models.Source.name.label("source_name"),
+        models.Contact.operator_id,
+        models.Operator.name.label("operator_name")
+    ).join(
+        models.Lead, models.Lead.id == models.Contact.lead_id
+    ).join(
+        models.Source, models.Source.id == models.Contact.source_id
+    ).outerjoin(
+        models.Operator, models.Operator.id == models.Contact.operator_id
+    ).where(*conditions).order_by(models.Contact.created_at, models.Contact.id)
+    
+    return _export_response(db, statement, format, "contacts", watermark)
+
+
+@router.get("/leads")
+def export_leads(
+    format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Stream all leads with their number of contacts as CSV or NDJSON.
+    Leads created in [created_from, created_to) are exported; the upper bound
+    (a few seconds ago by default) is returned in the X-Export-Watermark header.
+    """
+    conditions, watermark = _export_window(models.Lead.created_at, created_from, created_to)
+    contacts_count = select(
+        func.count(models.Contact.id)
+    ).where(models.Contact.lead_id == models.Lead.id).scalar_subquery()
+    statement = select(
+        models.Lead.id.label("lead_id"),
+        models.Lead.created_at,
+        models.Lead.external_id,
+        models.Lead.phone,
+        models.Lead.email,
+        models.Lead.name,
+        contacts_count.label("total_contacts")
+    ).where(*conditions).order_by(models.Lead.created_at, models.Lead.id)
+    
+    return _export_response(db, statement, format, "leads", watermark)
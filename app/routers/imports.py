@@ -0,0 +1,66 @@
+import tempfile
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app import schemas
+from app import importer
+
+router = APIRouter(prefix="/import", tags=["import"])
+
+# Request bodies larger than this are spooled to a temporary file on disk
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+MAX_CHUNK_SIZE = 10000
+
+IMPORT_FORMAT_PATTERN = "^(csv|ndjson)$"
+
+
+async def _spool_body(request: Request):
+    """Copy the raw request body into a temporary file without holding it in memory"""
+    file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    async for chunk in request.stream():
+        file.write(chunk)
+    file.seek(0)
+    return file
+
+
+@router.post("/leads", response_model=schemas.ImportSummary)
+async def import_leads(
+    request: Request,
+    format: str = Query("csv", pattern=IMPORT_FORMAT_PATTERN),
+    chunk_size: int = Query(importer.DEFAULT_CHUNK_SIZE, ge=1, le=MAX_CHUNK_SIZE),
+    db: Session = Depends(get_db)
+):
+    """
+    Import leads from a CSV/NDJSON request body (columns: external_id, phone, email, name).
+    Rows are committed in chunks of chunk_size; rejected rows are listed in the summary.
+    """
+    file = await _spool_body(request)
+    try:
+        return await run_in_threadpool(importer.import_leads, db, file, format, chunk_size)
+    finally:
+        file.close()
+
+
+@router.post("/contacts", response_model=schemas.ImportSummary)
+async def import_contacts(
+    request: Request,
+    format: str = Query("csv", pattern=IMPORT_FORMAT_PATTERN),
+    chunk_size: int = Query(importer.DEFAULT_CHUNK_SIZE, ge=1, le=MAX_CHUNK_SIZE),
+    assign_operators: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Import contacts from a CSV/NDJSON request body (ContactCreate columns plus
+    optional created_at and operator_id).
+    By default contacts are loaded as inactive history without touching operator
+    load; with assign_operators=true they are distributed as new active contacts.
+    """
+    file = await _spool_body(request)
+    try:
+        return await run_in_threadpool(
+            importer.import_contacts, db, file, format, chunk_size, assign_operators
+        )
+    finally:
+        file.close()
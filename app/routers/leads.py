@@ -1,16 +1,76 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select
+from typing import List, Optional
 from app.database import get_db
-from app import models, schemas
+from app import models, schemas, search
+from app.identity import KIND_EMAIL, KIND_PHONE, normalize_email, normalize_phone
+from app.pagination import NEXT_CURSOR_HEADER, PageParams, paginate
+from app.routers.contacts import (
+    CONTACT_VIEW_PATTERN, SLIM_CONTACT_COLUMNS, ContactListResponse, slim_contacts_response
+)
+from app.services import ContactService
 
 router = APIRouter(prefix="/leads", tags=["leads"])
 
 
+def _identity_lead_ids(kind: str, value: Optional[str]):
+    """Ids of leads owning a normalized identity (uses the unique (kind, value) index)"""
+    return select(models.LeadIdentity.lead_id).where(
+        models.LeadIdentity.kind == kind,
+        models.LeadIdentity.value == value
+    )
+
+
 @router.get("/", response_model=List[schemas.LeadResponse])
-def list_leads(db: Session = Depends(get_db)):
-    """Get list of all leads"""
-    return db.query(models.Lead).all()
+def list_leads(
+    response: Response,
+    page: PageParams = Depends(),
+    phone: Optional[str] = None,
+    email: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Get a page of leads ordered by id (next cursor in the X-Next-Cursor header).
+    Phone and email filters match normalized identifiers,
+    e.g. "8 (900) 123-45-67" finds a lead registered with "+79001234567".
+    """
+    query = db.query(models.Lead)
+    if phone is not None:
+        query = query.filter(models.Lead.id.in_(_identity_lead_ids(KIND_PHONE, normalize_phone(phone))))
+    if email is not None:
+        query = query.filter(models.Lead.id.in_(_identity_lead_ids(KIND_EMAIL, normalize_email(email))))
+    
+    return paginate(query, models.Lead.id, page, response)
+
+
+@router.get("/search", response_model=List[schemas.LeadResponse])
+def search_leads(
+    response: Response,
+    q: str = Query(..., min_length=search.MIN_TERM_LENGTH, description="Name, phone, email or external_id fragments"),
+    cursor: Optional[int] = Query(None, ge=0, description="Position in the ranking to continue from"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Search leads by fragments of name, phone, email and external_id, best matches first.
+    Every term must match, e.g. "ivan gmail" or "900 123-45"; terms need 3+ characters.
+    The next page cursor is in the X-Next-Cursor header.
+    """
+    terms = search.search_terms(q)
+    if not terms:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Search terms need at least {search.MIN_TERM_LENGTH} characters"
+        )
+    
+    offset = cursor or 0
+    # One extra row tells whether there is a next page
+    leads = search.search_leads(db, terms, offset, limit + 1)
+    if len(leads) > limit:
+        leads = leads[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = str(offset + limit)
+    return leads
 
 
 @router.get("/{lead_id}", response_model=schemas.LeadResponse)
@@ -22,12 +82,27 @@ def get_lead(lead_id: int, db: Session = Depends(get_db)):
     return lead
 
 
-@router.get("/{lead_id}/contacts", response_model=List[schemas.ContactResponse])
-def get_lead_contacts(lead_id: int, db: Session = Depends(get_db)):
-    """Get all contacts for a specific lead"""
+@router.get("/{lead_id}/contacts", response_model=ContactListResponse)
+def get_lead_contacts(
+    lead_id: int,
+    view: str = Query("full", pattern=CONTACT_VIEW_PATTERN),
+    db: Session = Depends(get_db)
+):
+    """
+    Get all contacts for a specific lead.
+    view=slim returns contacts without nested lead, source and operator.
+    """
     lead = db.query(models.Lead).filter(models.Lead.id == lead_id).first()
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
     
-    return lead.contacts
+    if view == "slim":
+        rows = db.query(*SLIM_CONTACT_COLUMNS).filter(
+            models.Contact.lead_id == lead_id
+        ).order_by(models.Contact.id).all()
+        return slim_contacts_response(rows)
+    
+    return db.query(models.Contact).options(
+        *ContactService.response_options()
+    ).filter(models.Contact.lead_id == lead_id).order_by(models.Contact.id).all()
 
@@ -0,0 +1,37 @@
+from datetime import datetime
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.database import SessionLocal
+from app.metrics import Gauge, metrics
+from app.services import BacklogService
+
+router = APIRouter(tags=["metrics"])
+
+
+def _backlog_gauge(value):
+    """Collect a per-source backlog value with a short-lived session on every scrape"""
+    def collect():
+        db = SessionLocal()
+        try:
+            depths = BacklogService.depth_by_source(db)
+        finally:
+            db.close()
+        now = datetime.utcnow()
+        return {(str(source_id),): value(depth, oldest, now) for source_id, (depth, oldest) in depths.items()}
+    return collect
+
+
+metrics.register(Gauge(
+    "crm_backlog_depth", "Contacts waiting in the backlog for an operator", ("source_id",),
+    _backlog_gauge(lambda depth, oldest, now: depth)
+))
+metrics.register(Gauge(
+    "crm_backlog_oldest_wait_seconds", "Wait time of the oldest contact in the backlog", ("source_id",),
+    _backlog_gauge(lambda depth, oldest, now: (now - oldest).total_seconds())
+))
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Request latency, SQL statements, internal timers and backlog gauges in Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
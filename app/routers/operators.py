@@ -1,36 +1,163 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from typing import List, Optional
+from app.config import settings
+from app.database import get_db, SessionLocal
 from app import models, schemas
-from app.services import DistributionService
+from app.load_events import SNAPSHOT, format_event, load_events
+from app.load_tracker import load_tracker
+from app.pagination import PageParams, paginate
+from app.response_cache import OPERATORS, response_cache
+from app.routing import routing_tables
+from app.services import BacklogService
 
 router = APIRouter(prefix="/operators", tags=["operators"])
 
+_operators = TypeAdapter(List[schemas.OperatorResponse])
+_operator = TypeAdapter(schemas.OperatorResponse)
+
+
+def _load_info(operator: models.Operator, current_load: int) -> schemas.OperatorLoadInfo:
+    return schemas.OperatorLoadInfo(
+        operator_id=operator.id,
+        operator_name=operator.name,
+        current_load=current_load,
+        load_limit=operator.load_limit,
+        is_active=operator.is_active
+    )
+
+
+def _load_snapshot(db: Session) -> List[schemas.OperatorLoadInfo]:
+    """Load of every operator from operators.active_load (single query)"""
+    rows = db.query(
+        models.Operator.id,
+        models.Operator.name,
+        models.Operator.active_load,
+        models.Operator.load_limit,
+        models.Operator.is_active
+    ).order_by(models.Operator.id).all()
+    return [
+        schemas.OperatorLoadInfo(
+            operator_id=operator_id,
+            operator_name=name,
+            current_load=active_load,
+            load_limit=load_limit,
+            is_active=is_active
+        )
+        for operator_id, name, active_load, load_limit, is_active in rows
+    ]
+
+
+def _load_snapshot_event() -> str:
+    db = SessionLocal()
+    try:
+        return format_event(SNAPSHOT, [info.model_dump() for info in _load_snapshot(db)])
+    finally:
+        db.close()
+
 
 @router.post("/", response_model=schemas.OperatorResponse)
 def create_operator(operator: schemas.OperatorCreate, db: Session = Depends(get_db)):
     """Create a new operator"""
-    db_operator = models.Operator(**operator.dict())
+    db_operator = models.Operator(**operator.model_dump())
     db.add(db_operator)
     db.commit()
     db.refresh(db_operator)
+    load_tracker.register_operator(db_operator.id)
+    response_cache.invalidate(OPERATORS)
+    load_events.operator_changed(_load_info(db_operator, 0).model_dump())
     return db_operator
 
 
 @router.get("/", response_model=List[schemas.OperatorResponse])
-def list_operators(db: Session = Depends(get_db)):
-    """Get list of all operators"""
-    return db.query(models.Operator).all()
+def list_operators(
+    request: Request,
+    page: PageParams = Depends(),
+    is_active: Optional[bool] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Get a page of operators ordered by id (next cursor in the X-Next-Cursor header).
+    Served from the response cache with an ETag (304 for a matching If-None-Match).
+    """
+    def build(response: Response):
+        query = db.query(models.Operator)
+        if is_active is not None:
+            query = query.filter(models.Operator.is_active == is_active)
+        return paginate(query, models.Operator.id, page, response)
+    
+    return response_cache.respond(request, (OPERATORS,), _operators, build)
+
+
+@router.post("/load/reconcile")
+def reconcile_operator_loads(db: Session = Depends(get_db)):
+    """Re-sync in-memory operator load counters against the database"""
+    drift = load_tracker.reconcile(db)
+    return {
+        "message": "Operator loads reconciled",
+        "corrected": {
+            operator_id: {"cached_load": cached_load, "actual_load": actual_load}
+            for operator_id, (cached_load, actual_load) in drift.items()
+        }
+    }
+
+
+@router.get("/load", response_model=List[schemas.OperatorLoadInfo])
+def get_operator_loads(db: Session = Depends(get_db)):
+    """Current load, limit and state of every operator in one query (instead of polling /{id}/load)"""
+    return _load_snapshot(db)
+
+
+@router.get("/load/stream")
+async def stream_operator_loads():
+    """
+    Server-sent events of operator load. The stream starts with a `snapshot`
+    event (every operator, as GET /operators/load) and then sends `load`
+    events ({operator_id, current_load}) when contacts are assigned or
+    deactivated and `operator` events when an operator is created or updated.
+    A fresh snapshot follows every CRM_LOAD_STREAM_SNAPSHOT_INTERVAL seconds.
+    """
+    async def stream():
+        loop = asyncio.get_running_loop()
+        interval = settings.load_stream_snapshot_interval
+        subscription = load_events.subscribe()
+        try:
+            snapshot_due = True
+            while True:
+                if snapshot_due:
+                    # Pending events are older than the snapshot
+                    subscription.discard_pending()
+                    yield await run_in_threadpool(_load_snapshot_event)
+                    next_snapshot = loop.time() + interval
+                resync, events = await subscription.next(max(next_snapshot - loop.time(), 0))
+                snapshot_due = resync or loop.time() >= next_snapshot
+                if not snapshot_due:
+                    for event, data in events:
+                        yield format_event(event, data)
+        finally:
+            load_events.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/{operator_id}", response_model=schemas.OperatorResponse)
-def get_operator(operator_id: int, db: Session = Depends(get_db)):
-    """Get operator by ID"""
-    operator = db.query(models.Operator).filter(models.Operator.id == operator_id).first()
-    if not operator:
-        raise HTTPException(status_code=404, detail="Operator not found")
-    return operator
+def get_operator(operator_id: int, request: Request, db: Session = Depends(get_db)):
+    """Get operator by ID (cached, with ETag)"""
+    def build(response: Response):
+        operator = db.query(models.Operator).filter(models.Operator.id == operator_id).first()
+        if not operator:
+            raise HTTPException(status_code=404, detail="Operator not found")
+        return operator
+    
+    return response_cache.respond(request, (OPERATORS,), _operator, build)
 
 
 @router.patch("/{operator_id}", response_model=schemas.OperatorResponse)
@@ -39,40 +166,37 @@ def update_operator(
     operator_update: schemas.OperatorUpdate,
     db: Session = Depends(get_db)
 ):
-    """Update operator (name, is_active, load_limit)"""
+    """
+    Update operator (name, is_active, load_limit).
+    A raised load limit or reactivation drains the backlog of the operator's sources.
+    """
     operator = db.query(models.Operator).filter(models.Operator.id == operator_id).first()
     if not operator:
         raise HTTPException(status_code=404, detail="Operator not found")
     
-    update_data = operator_update.dict(exclude_unset=True)
+    update_data = operator_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(operator, field, value)
     
     db.commit()
+    routing_tables.invalidate_operator(operator.id)
+    response_cache.invalidate(OPERATORS)
+    if operator.is_active and ("load_limit" in update_data or "is_active" in update_data):
+        BacklogService.drain_operator(db, operator.id)
     db.refresh(operator)
+    load_events.operator_changed(_load_info(operator, operator.active_load).model_dump())
     return operator
 
 
 @router.get("/{operator_id}/load", response_model=schemas.OperatorLoadInfo)
 def get_operator_load(operator_id: int, db: Session = Depends(get_db)):
-    """Get operator's current load information"""
+    """
+    Get operator's current load information from operators.active_load,
+    like GET /operators/load (the same for every worker)
+    """
     operator = db.query(models.Operator).filter(models.Operator.id == operator_id).first()
     if not operator:
         raise HTTPException(status_code=404, detail="Operator not found")
     
-    from sqlalchemy import func, and_
-    current_load = db.query(func.count(models.Contact.id)).filter(
-        and_(
-            models.Contact.operator_id == operator.id,
-            models.Contact.is_active == True
-        )
-    ).scalar()
-    
-    return schemas.OperatorLoadInfo(
-        operator_id=operator.id,
-        operator_name=operator.name,
-        current_load=current_load,
-        load_limit=operator.load_limit,
-        is_active=operator.is_active
-    )
+    return _load_info(operator, operator.active_load)
 
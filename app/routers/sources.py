@@ -1,34 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List
 from app.database import get_db
 from app import models, schemas
+from app.pagination import PageParams, paginate
+from app.response_cache import OPERATORS, SOURCES, response_cache
+from app.routing import routing_tables
+from app.services import BacklogService
 
 router = APIRouter(prefix="/sources", tags=["sources"])
 
+_sources = TypeAdapter(List[schemas.SourceResponse])
+_source = TypeAdapter(schemas.SourceResponse)
+_source_operators = TypeAdapter(List[schemas.SourceOperatorWeightResponse])
+
 
 @router.post("/", response_model=schemas.SourceResponse)
 def create_source(source: schemas.SourceCreate, db: Session = Depends(get_db)):
     """Create a new source/bot"""
-    db_source = models.Source(**source.dict())
+    db_source = models.Source(**source.model_dump())
     db.add(db_source)
     db.commit()
     db.refresh(db_source)
+    response_cache.invalidate(SOURCES)
     return db_source
 
 
 @router.get("/", response_model=List[schemas.SourceResponse])
-def list_sources(db: Session = Depends(get_db)):
-    """Get list of all sources"""
-    return db.query(models.Source).all()
+def list_sources(request: Request, page: PageParams = Depends(), db: Session = Depends(get_db)):
+    """
+    Get a page of sources ordered by id (next cursor in the X-Next-Cursor header).
+    Served from the response cache with an ETag (304 for a matching If-None-Match).
+    """
+    def build(response: Response):
+        return paginate(db.query(models.Source), models.Source.id, page, response)
+    
+    return response_cache.respond(request, (SOURCES,), _sources, build)
 
 
 @router.get("/{source_id}", response_model=schemas.SourceResponse)
-def get_source(source_id: int, db: Session = Depends(get_db)):
-    """Get source by ID"""
+def get_source(source_id: int, request: Request, db: Session = Depends(get_db)):
+    """Get source by ID (cached, with ETag)"""
+    def build(response: Response):
+        source = db.query(models.Source).filter(models.Source.id == source_id).first()
+        if not source:
+            raise HTTPException(status_code=404, detail="Source not found")
+        return source
+    
+    return response_cache.respond(request, (SOURCES,), _source, build)
+
+
+@router.patch("/{source_id}", response_model=schemas.SourceResponse)
+def update_source(source_id: int, source_update: schemas.SourceUpdate, db: Session = Depends(get_db)):
+    """Update source (name, description, contact_ttl_seconds, distribution_strategy; null TTL disables expiry)"""
     source = db.query(models.Source).filter(models.Source.id == source_id).first()
     if not source:
         raise HTTPException(status_code=404, detail="Source not found")
+    
+    for field, value in source_update.model_dump(exclude_unset=True).items():
+        # Only the TTL can be cleared
+        if value is not None or field == "contact_ttl_seconds":
+            setattr(source, field, value)
+    
+    db.commit()
+    routing_tables.invalidate_source(source_id)
+    response_cache.invalidate(SOURCES)
+    db.refresh(source)
     return source
 
 
@@ -38,7 +76,10 @@ def add_operator_to_source(
     weight_data: schemas.SourceOperatorWeightCreate,
     db: Session = Depends(get_db)
 ):
-    """Add operator to source with weight, or update existing weight"""
+    """
+    Add operator to source with weight, or update existing weight.
+    Contacts of the source waiting in the backlog are offered to the operator.
+    """
     # Verify source exists
     source = db.query(models.Source).filter(models.Source.id == source_id).first()
     if not source:
@@ -59,6 +100,9 @@ def add_operator_to_source(
         # Update existing weight
         existing_weight.weight = weight_data.weight
         db.commit()
+        routing_tables.invalidate_source(source_id)
+        response_cache.invalidate(SOURCES)
+        BacklogService.drain_source(db, source_id)
         db.refresh(existing_weight)
         result = schemas.SourceOperatorWeightResponse(
             id=existing_weight.id,
@@ -77,6 +121,9 @@ def add_operator_to_source(
     )
     db.add(db_weight)
     db.commit()
+    routing_tables.invalidate_source(source_id)
+    response_cache.invalidate(SOURCES)
+    BacklogService.drain_source(db, source_id)
     db.refresh(db_weight)
     
     result = schemas.SourceOperatorWeightResponse(
@@ -90,27 +137,32 @@ def add_operator_to_source(
 
 
 @router.get("/{source_id}/operators", response_model=List[schemas.SourceOperatorWeightResponse])
-def get_source_operators(source_id: int, db: Session = Depends(get_db)):
-    """Get all operators configured for a source with their weights"""
-    source = db.query(models.Source).filter(models.Source.id == source_id).first()
-    if not source:
-        raise HTTPException(status_code=404, detail="Source not found")
+def get_source_operators(source_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    Get all operators configured for a source with their weights
+    (cached, with ETag; operator names are read with one joined query).
+    """
+    def build(response: Response):
+        source = db.query(models.Source.id).filter(models.Source.id == source_id).first()
+        if not source:
+            raise HTTPException(status_code=404, detail="Source not found")
+        
+        rows = db.query(
+            models.SourceOperatorWeight.id,
+            models.SourceOperatorWeight.source_id,
+            models.SourceOperatorWeight.operator_id,
+            models.SourceOperatorWeight.weight,
+            models.Operator.name.label("operator_name")
+        ).join(
+            models.Operator,
+            models.Operator.id == models.SourceOperatorWeight.operator_id
+        ).filter(
+            models.SourceOperatorWeight.source_id == source_id
+        ).order_by(models.SourceOperatorWeight.id).all()
+        return [row._asdict() for row in rows]
     
-    weights = db.query(models.SourceOperatorWeight).filter(
-        models.SourceOperatorWeight.source_id == source_id
-    ).all()
-    
-    result = []
-    for weight in weights:
-        result.append(schemas.SourceOperatorWeightResponse(
-            id=weight.id,
-            source_id=weight.source_id,
-            operator_id=weight.operator_id,
-            weight=weight.weight,
-            operator_name=weight.operator.name
-        ))
-    
-    return result
+    # Operator names are part of the response
+    return response_cache.respond(request, (SOURCES, OPERATORS), _source_operators, build)
 
 
 @router.delete("/{source_id}/operators/{operator_id}")
@@ -130,5 +182,7 @@ def remove_operator_from_source(
     
     db.delete(weight)
     db.commit()
+    routing_tables.invalidate_source(source_id)
+    response_cache.invalidate(SOURCES)
     return {"message": "Operator removed from source"}
 
@@ -1,86 +1,219 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import func, and_
-from typing import List, Dict
-from app.database import get_db
-from app import models, schemas
+from typing import List, Dict, Optional
+from datetime import datetime, timedelta
+from app.database import get_db, to_db_datetime
+from app import models, schemas, simulator
+from app.pagination import PageParams, keyset_page, paginate
+from app.rollups import bucket_start
 
 router = APIRouter(prefix="/stats", tags=["statistics"])
 
+# Time range of /stats/timeseries when start is not given
+DEFAULT_TIMESERIES_WINDOWS = {
+    "minute": timedelta(days=1),
+    "hour": timedelta(days=7),
+    "day": timedelta(days=90)
+}
 
-@router.get("/distribution")
-def get_distribution_stats(db: Session = Depends(get_db)):
+
+@router.get("/distribution", response_model=List[schemas.DistributionStats])
+def get_distribution_stats(
+    source_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
     """
     Get distribution statistics showing how contacts are distributed
-    across operators and sources
+    across operators and sources.
+    Optionally filtered by source and contact creation time window.
+    Computed with a single aggregate query regardless of the number
+    of sources and operators.
     """
-    sources = db.query(models.Source).all()
+    # Time window goes into the join condition, so sources without
+    # contacts in the window are still reported with zero counts
+    contact_filter = [models.Contact.source_id == models.Source.id]
+    if created_from is not None:
+        contact_filter.append(models.Contact.created_at >= to_db_datetime(created_from))
+    if created_to is not None:
+        contact_filter.append(models.Contact.created_at < to_db_datetime(created_to))
     
-    result = []
-    for source in sources:
-        # Count total contacts for this source
-        total_contacts = db.query(func.count(models.Contact.id)).filter(
-            models.Contact.source_id == source.id
-        ).scalar()
-        
-        # Count contacts by operator
-        contacts_by_operator = {}
-        operator_contacts = db.query(
-            models.Contact.operator_id,
-            func.count(models.Contact.id).label('count')
-        ).filter(
-            models.Contact.source_id == source.id
-        ).group_by(models.Contact.operator_id).all()
-        
-        for operator_id, count in operator_contacts:
-            if operator_id:
-                operator = db.query(models.Operator).filter(models.Operator.id == operator_id).first()
-                if operator:
-                    contacts_by_operator[operator_id] = {
-                        "operator_name": operator.name,
-                        "count": count
-                    }
-        
-        result.append({
-            "source_id": source.id,
-            "source_name": source.name,
-            "total_contacts": total_contacts,
-            "contacts_by_operator": contacts_by_operator
+    query = db.query(
+        models.Source.id,
+        models.Source.name,
+        models.Contact.operator_id,
+        models.Operator.name,
+        func.count(models.Contact.id)
+    ).outerjoin(
+        models.Contact, and_(*contact_filter)
+    ).outerjoin(
+        models.Operator, models.Operator.id == models.Contact.operator_id
+    )
+    if source_id is not None:
+        query = query.filter(models.Source.id == source_id)
+    
+    rows = query.group_by(
+        models.Source.id,
+        models.Source.name,
+        models.Contact.operator_id,
+        models.Operator.name
+    ).order_by(models.Source.id).all()
+    
+    # Pivot (source, operator) groups into per-source stats
+    stats: Dict[int, dict] = {}
+    for row_source_id, source_name, operator_id, operator_name, count in rows:
+        source_stats = stats.setdefault(row_source_id, {
+            "source_id": row_source_id,
+            "source_name": source_name,
+            "total_contacts": 0,
+            "contacts_by_operator": {}
         })
+        source_stats["total_contacts"] += count
+        if operator_id and operator_name is not None:
+            source_stats["contacts_by_operator"][operator_id] = {
+                "operator_name": operator_name,
+                "count": count
+            }
     
-    return result
+    return list(stats.values())
+
+
+def _lead_summary(lead: models.Lead) -> dict:
+    contacts_info = []
+    for contact in lead.contacts:
+        contacts_info.append({
+            "contact_id": contact.id,
+            "source_id": contact.source_id,
+            "source_name": contact.source.name if contact.source else None,
+            "operator_id": contact.operator_id,
+            "operator_name": contact.operator.name if contact.operator else None,
+            "created_at": contact.created_at.isoformat()
+        })
+    
+    return {
+        "lead_id": lead.id,
+        "lead_external_id": lead.external_id,
+        "lead_phone": lead.phone,
+        "lead_email": lead.email,
+        "lead_name": lead.name,
+        "total_contacts": len(lead.contacts),
+        "contacts": contacts_info
+    }
+
+
+def _leads_summary_query(db: Session):
+    """Leads with contacts, their sources and operators loaded in a constant number of queries"""
+    return db.query(models.Lead).options(
+        selectinload(models.Lead.contacts).selectinload(models.Contact.source),
+        selectinload(models.Lead.contacts).selectinload(models.Contact.operator)
+    )
 
 
 @router.get("/leads-summary")
-def get_leads_summary(db: Session = Depends(get_db)):
+def get_leads_summary(
+    response: Response,
+    page: PageParams = Depends(),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: Session = Depends(get_db)
+):
     """
     Get summary of leads showing that one lead can have multiple contacts
-    from different sources
+    from different sources.
+    JSON mode returns one page (keyset pagination by lead id, next cursor
+    in the X-Next-Cursor header). NDJSON mode streams all leads page by page
+    starting from the cursor, one lead per line.
     """
-    leads = db.query(models.Lead).all()
-    
-    result = []
-    for lead in leads:
-        contacts_info = []
-        for contact in lead.contacts:
-            contacts_info.append({
-                "contact_id": contact.id,
-                "source_id": contact.source_id,
-                "source_name": contact.source.name if contact.source else None,
-                "operator_id": contact.operator_id,
-                "operator_name": contact.operator.name if contact.operator else None,
-                "created_at": contact.created_at.isoformat()
-            })
+    if format == "ndjson":
+        def stream():
+            cursor = page.cursor
+            while True:
+                leads, cursor = keyset_page(
+                    _leads_summary_query(db), models.Lead.id, cursor, page.limit
+                )
+                for lead in leads:
+                    yield json.dumps(_lead_summary(lead)) + "\n"
+                # Keep memory bounded: forget loaded objects of the page
+                db.expunge_all()
+                if cursor is None:
+                    break
         
-        result.append({
-            "lead_id": lead.id,
-            "lead_external_id": lead.external_id,
-            "lead_phone": lead.phone,
-            "lead_email": lead.email,
-            "lead_name": lead.name,
-            "total_contacts": len(lead.contacts),
-            "contacts": contacts_info
-        })
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+    
+    leads = paginate(_leads_summary_query(db), models.Lead.id, page, response)
+    return [_lead_summary(lead) for lead in leads]
+
+
+@router.get("/timeseries", response_model=List[schemas.TimeseriesPoint])
+def get_timeseries(
+    granularity: str = Query("hour", pattern="^(minute|hour|day)$"),
+    source_id: Optional[int] = None,
+    operator_id: Optional[int] = Query(None, description="0 selects contacts without operator"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Get numbers of created and deactivated contacts per minute, hour or day
+    in [start, end), optionally for one source and/or operator.
+    Read from pre-aggregated rollups only; buckets without contacts are omitted.
+    By default ends now and covers 1 day of minutes, 7 days of hours or 90 days.
+    """
+    end = to_db_datetime(end) if end is not None else datetime.utcnow()
+    start = to_db_datetime(start) if start is not None else end - DEFAULT_TIMESERIES_WINDOWS[granularity]
     
-    return result
+    query = db.query(
+        models.ContactRollup.bucket,
+        func.sum(models.ContactRollup.created),
+        func.sum(models.ContactRollup.deactivated)
+    ).filter(
+        models.ContactRollup.granularity == granularity,
+        models.ContactRollup.bucket >= bucket_start(start, granularity),
+        models.ContactRollup.bucket < end
+    )
+    if source_id is not None:
+        query = query.filter(models.ContactRollup.source_id == source_id)
+    if operator_id is not None:
+        query = query.filter(models.ContactRollup.operator_id == operator_id)
+    
+    rows = query.group_by(models.ContactRollup.bucket).order_by(models.ContactRollup.bucket).all()
+    return [
+        schemas.TimeseriesPoint(bucket=bucket, created=created, deactivated=deactivated)
+        for bucket, created, deactivated in rows
+    ]
+
+
+@router.get("/simulate/config", response_model=schemas.SimulationConfig)
+def get_simulation_config(db: Session = Depends(get_db)):
+    """Live operators, sources and weights in the format of the simulation config"""
+    return simulator.load_config(db)
 
+
+@router.post("/simulate", response_model=schemas.SimulationResult)
+def simulate_distribution(request: schemas.SimulationRequest, db: Session = Depends(get_db)):
+    """
+    Simulate distribution of synthetic contacts, or of the contacts recorded in
+    [replay_from, replay_to), against the live config or the given one.
+    Reports per-operator shares and time at the load limit, queued contacts
+    and the unassigned rate; no data is changed.
+    """
+    config = request.config or simulator.load_config(db)
+    if request.replay_from is not None:
+        end = to_db_datetime(request.replay_to) if request.replay_to is not None else datetime.utcnow()
+        stream = simulator.recorded_stream(db, to_db_datetime(request.replay_from), end)
+    else:
+        try:
+            stream = simulator.synthetic_stream(
+                config,
+                request.contacts,
+                request.arrival_rate,
+                request.mean_handle_time,
+                request.source_shares,
+                request.seed
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return simulator.simulate(config, stream, request.tick, request.seed)
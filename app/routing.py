@@ -0,0 +1,150 @@
+import random
+import threading
+import time
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Callable, Dict, List, Optional
+from sqlalchemy.orm import Session
+from app import models
+from app.config import settings
+from app.strategies import DEFAULT_STRATEGY, create_strategy
+
+
+def _no_load(operator_id: int) -> int:
+    return 0
+
+
+class RoutingTable:
+    """
+    Compiled distribution config of a source.
+
+    Holds active operators with their weights and load limits plus a
+    prefix-sum array, so weighted selection is a bisect instead of a
+    per-operator query and cumulative scan. Operators are picked by the
+    source's distribution strategy (app/strategies.py).
+    """
+
+    def __init__(
+        self,
+        source_id: int,
+        version: int,
+        rows: List[tuple],
+        strategy: str = DEFAULT_STRATEGY
+    ):
+        self.source_id = source_id
+        self.version = version
+        self.rows = tuple(rows)
+        self.strategy_name = strategy
+        self.expires_at = time.monotonic() + settings.routing_table_ttl
+        # All operators configured for the source (including inactive ones)
+        self.member_ids = frozenset(operator_id for operator_id, _, _, _ in rows)
+        active_rows = [row for row in rows if row[3]]
+        self.operator_ids = [operator_id for operator_id, _, _, _ in active_rows]
+        self.weights = [weight for _, weight, _, _ in active_rows]
+        self.load_limits = [load_limit for _, _, load_limit, _ in active_rows]
+        self.cumulative = list(accumulate(self.weights))
+        self.total_weight = self.cumulative[-1] if self.cumulative else 0
+        self.strategy = create_strategy(strategy, self)
+
+    def __len__(self) -> int:
+        return len(self.operator_ids)
+
+    def available_indexes(self, is_available: Callable[[int, int], bool]) -> List[int]:
+        return [
+            i for i, operator_id in enumerate(self.operator_ids)
+            if is_available(operator_id, self.load_limits[i])
+        ]
+
+    def draw(self) -> int:
+        """Random operator index with probability weight / total weight (uniform if all weights are 0)"""
+        if self.total_weight <= 0:
+            return random.randrange(len(self.operator_ids))
+        i = bisect_right(self.cumulative, random.random() * self.total_weight)
+        return min(i, len(self.operator_ids) - 1)
+
+    def select(
+        self,
+        is_available: Callable[[int, int], bool],
+        load: Optional[Callable[[int], int]] = None
+    ) -> Optional[int]:
+        """
+        Select an operator id with the source's distribution strategy.
+        `is_available(operator_id, load_limit)` tells if operator can take a contact;
+        operators at their limit are skipped without rebuilding the table.
+        `load(operator_id)` is the current load, read by load-aware strategies.
+        """
+        return self.strategy.select(is_available, load or _no_load)
+
+
+class RoutingTableCache:
+    """
+    Per-source routing tables built once and reused until the source
+    configuration changes (weights, strategy, operator activity or load limit).
+    Writes invalidate tables of this process only, so tables also expire after
+    CRM_ROUTING_TABLE_TTL seconds, which bounds how long another worker's
+    changes go unseen. An expired table whose configuration didn't change is
+    kept, with its strategy state.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables: Dict[int, RoutingTable] = {}
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def get(self, db: Session, source_id: int) -> RoutingTable:
+        """Get compiled routing table for a source, building it on a miss"""
+        cached = self._tables.get(source_id)
+        if cached is not None and cached.expires_at > time.monotonic():
+            return cached
+
+        version = self._version
+        strategy = db.query(models.Source.distribution_strategy).filter(
+            models.Source.id == source_id
+        ).scalar()
+        rows = db.query(
+            models.SourceOperatorWeight.operator_id,
+            models.SourceOperatorWeight.weight,
+            models.Operator.load_limit,
+            models.Operator.is_active
+        ).join(
+            models.Operator,
+            models.Operator.id == models.SourceOperatorWeight.operator_id
+        ).filter(
+            models.SourceOperatorWeight.source_id == source_id
+        ).order_by(models.SourceOperatorWeight.id).all()
+        rows = [tuple(row) for row in rows]
+        if cached is not None and cached.rows == tuple(rows) and cached.strategy_name == strategy:
+            cached.expires_at = time.monotonic() + settings.routing_table_ttl
+            return cached
+        table = RoutingTable(source_id, version, rows, strategy)
+
+        with self._lock:
+            # Don't cache a table built from config that changed meanwhile
+            if self._version == version:
+                self._tables[source_id] = table
+        return table
+
+    def invalidate_source(self, source_id: int) -> None:
+        with self._lock:
+            self._version += 1
+            self._tables.pop(source_id, None)
+
+    def invalidate_operator(self, operator_id: int) -> None:
+        """Drop tables of all sources the operator is configured for"""
+        with self._lock:
+            self._version += 1
+            for source_id, table in list(self._tables.items()):
+                if operator_id in table.member_ids:
+                    del self._tables[source_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._tables = {}
+
+
+routing_tables = RoutingTableCache()
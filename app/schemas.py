@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field
+from typing import Dict, Optional, List
 from datetime import datetime
+from app.strategies import DEFAULT_STRATEGY, DISTRIBUTION_STRATEGY_PATTERN
 
 
 # Operator schemas
@@ -31,12 +32,21 @@ class OperatorResponse(OperatorBase):
 class SourceBase(BaseModel):
     name: str
     description: Optional[str] = None
+    contact_ttl_seconds: Optional[int] = Field(None, gt=0)  # Active contacts expire after this
+    distribution_strategy: str = Field(DEFAULT_STRATEGY, pattern=DISTRIBUTION_STRATEGY_PATTERN)
 
 
 class SourceCreate(SourceBase):
     pass
 
 
+class SourceUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    contact_ttl_seconds: Optional[int] = Field(None, gt=0)  # null disables expiry
+    distribution_strategy: Optional[str] = Field(None, pattern=DISTRIBUTION_STRATEGY_PATTERN)
+
+
 class SourceResponse(SourceBase):
     id: int
     
@@ -118,6 +128,72 @@ class ContactResponse(ContactBase):
         from_attributes = True
 
 
+class ContactSlimResponse(BaseModel):
+    """Contact without nested lead, source and operator"""
+    id: int
+    lead_id: int
+    source_id: int
+    operator_id: Optional[int] = None
+    is_active: bool
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class ContactBatchCreate(BaseModel):
+    """Batch of contacts delivered at once"""
+    contacts: List[ContactCreate] = Field(..., min_length=1, max_length=5000)
+
+
+class ContactBatchItemResult(BaseModel):
+    """Result for a single item of a batch"""
+    index: int
+    contact_id: Optional[int] = None
+    lead_id: Optional[int] = None
+    operator_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class ContactBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[ContactBatchItemResult]
+
+
+class ContactDeactivateRequest(BaseModel):
+    """Active contacts matching all given criteria are deactivated (at least one is required)"""
+    contact_ids: Optional[List[int]] = Field(None, min_length=1, max_length=10000)
+    source_id: Optional[int] = None
+    operator_id: Optional[int] = None
+    lead_id: Optional[int] = None
+    created_before: Optional[datetime] = None
+
+
+class ContactDeactivateResponse(BaseModel):
+    deactivated: int
+
+
+# Import schemas
+class ContactImportRow(ContactCreate):
+    """Contact row of an import file"""
+    created_at: Optional[datetime] = None
+    operator_id: Optional[int] = None  # Kept when operators are not assigned by the import
+
+
+class ImportRejectedRow(BaseModel):
+    line: int
+    error: str
+
+
+class ImportSummary(BaseModel):
+    """Result of an import; rejected_rows lists the first rejected rows"""
+    processed: int = 0
+    imported: int = 0
+    rejected: int = 0
+    rejected_rows: List[ImportRejectedRow] = []
+
+
 # Statistics/View schemas
 class OperatorLoadInfo(BaseModel):
     """Information about operator's current load"""
@@ -128,10 +204,95 @@ class OperatorLoadInfo(BaseModel):
     is_active: bool
 
 
+class OperatorContactsCount(BaseModel):
+    """Number of contacts assigned to an operator"""
+    operator_name: str
+    count: int
+
+
 class DistributionStats(BaseModel):
     """Statistics about distribution"""
     source_id: int
     source_name: str
     total_contacts: int
-    contacts_by_operator: dict[int, int]  # operator_id -> count
+    contacts_by_operator: dict[int, OperatorContactsCount]  # operator_id -> count
+
+
+class TimeseriesPoint(BaseModel):
+    """Contacts created and deactivated within a time bucket"""
+    bucket: datetime
+    created: int
+    deactivated: int
+
+
+# Simulation schemas (app/simulator.py)
+class SimulationOperator(BaseModel):
+    id: int
+    load_limit: int = Field(ge=0)
+    is_active: bool = True
+
+
+class SimulationWeight(BaseModel):
+    operator_id: int
+    weight: float = Field(ge=0)
 
+
+class SimulationSource(BaseModel):
+    id: int
+    distribution_strategy: str = Field(DEFAULT_STRATEGY, pattern=DISTRIBUTION_STRATEGY_PATTERN)
+    operators: List[SimulationWeight] = []
+
+
+class SimulationConfig(BaseModel):
+    """Operators, sources and weights to simulate (a snapshot of the live config by default)"""
+    operators: List[SimulationOperator]
+    sources: List[SimulationSource]
+
+
+class SimulationRequest(BaseModel):
+    """
+    Simulation of `contacts` synthetic arrivals (Poisson at `arrival_rate` per second,
+    exponential handling times), or of contacts recorded in [replay_from, replay_to)
+    """
+    config: Optional[SimulationConfig] = None
+    contacts: int = Field(100_000, ge=1, le=5_000_000)
+    arrival_rate: float = Field(10, gt=0)  # Contacts per second
+    mean_handle_time: float = Field(600, gt=0)  # Seconds from assignment to deactivation
+    source_shares: Optional[Dict[int, float]] = None  # source_id -> share of arrivals (equal by default)
+    replay_from: Optional[datetime] = None
+    replay_to: Optional[datetime] = None  # Now by default
+    tick: float = Field(1, gt=0)  # Seconds of simulated time per step
+    seed: Optional[int] = None
+
+
+class SimulationOperatorResult(BaseModel):
+    operator_id: int
+    load_limit: int
+    is_active: bool
+    assigned: int
+    share: float  # Of all assigned contacts
+    peak_load: int
+    final_load: int
+    saturated_seconds: float  # Time spent at the load limit
+    saturated_fraction: float
+    first_saturated_at: Optional[float] = None  # Seconds from the start
+
+
+class SimulationSourceResult(BaseModel):
+    source_id: int
+    contacts: int
+    queued: int  # Found no operator on arrival
+    queued_at_end: int
+    mean_queue_wait: Optional[float] = None  # Seconds queued contacts waited for an operator
+
+
+class SimulationResult(BaseModel):
+    contacts: int
+    deactivations: int
+    duration: float  # Simulated seconds
+    tick: float
+    unassigned_rate: float  # Share of contacts that found no operator on arrival
+    queued_at_end: int
+    operators: List[SimulationOperatorResult]
+    sources: List[SimulationSourceResult]
+    elapsed: float  # Wall-clock seconds
@@ -0,0 +1,149 @@
+"""
+Lead search by fragments of name, phone, email and external_id.
+
+Every whitespace-separated term of 3+ characters must occur somewhere in the
+lead, case-insensitively ("ivan gmail.com"). A query that looks like a phone
+("8 (900) 123-45") is one term, normalized like identity.normalize_phone.
+
+On SQLite candidates come from leads_fts (migration 0003), a trigram FTS5
+index, so any substring is found without scanning leads; other databases fall
+back to LIKE. Only the newest MAX_CANDIDATES matches are read, together with
+leads whose name, phone, email or external_id equals a term, found by indexed
+lookups (leads.normalized_name, lead_identities) however old they are. They
+are ranked: a term equal to a whole value beats a prefix of a value, which
+beats a prefix of a word, which beats any other substring; ties go to newer
+leads. FTS5's bm25 is not used because it counts every lead containing each
+term, which takes hundreds of milliseconds for common terms on millions of
+leads.
+"""
+import re
+from typing import List, Optional, Sequence
+from sqlalchemy import and_, column, or_, select, table
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from app import models
+from app.identity import IDENTITY_KINDS, normalize_phone
+
+MIN_TERM_LENGTH = 3
+
+# Newest matches ranked per query; older matches of a broad query are not returned
+MAX_CANDIDATES = 1000
+
+PHONE_QUERY = re.compile(r"^\+?[\d\s().-]+$")
+
+# Characters after which a new word starts in a name, email or external id
+WORD_BOUNDARY = re.compile(r"[\s@._-]")
+
+leads_fts = table("leads_fts", column("rowid"), column("leads_fts"))
+
+
+def normalize_name(name: Optional[str]) -> Optional[str]:
+    """Case-folded name with collapsed whitespace, as stored in leads.normalized_name"""
+    if name is None:
+        return None
+    return " ".join(name.split()).casefold() or None
+
+
+def search_terms(q: str) -> List[str]:
+    """Case-folded terms of a search query; terms shorter than MIN_TERM_LENGTH are dropped"""
+    q = q.strip()
+    if PHONE_QUERY.match(q):
+        terms = [normalize_phone(q) or ""]
+    else:
+        terms = q.casefold().split()
+    return [term for term in terms if len(term) >= MIN_TERM_LENGTH]
+
+
+def fts_query(terms: Sequence[str]) -> str:
+    """FTS5 MATCH expression: all terms, each as a quoted phrase (no query syntax)"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def term_score(term: str, value: Optional[str]) -> int:
+    """3 - whole value, 2 - prefix of the value, 1 - prefix of a word, 0 - elsewhere or no match"""
+    if not value:
+        return 0
+    value = value.casefold()
+    if value == term:
+        return 3
+    if value.startswith(term):
+        return 2
+    position = value.find(term)
+    while position > 0:
+        if WORD_BOUNDARY.match(value[position - 1]):
+            return 1
+        position = value.find(term, position + 1)
+    return 0
+
+
+def matches_all(terms: Sequence[str], values: Sequence[Optional[str]]) -> bool:
+    """Every term occurs in one of the values (case-insensitively)"""
+    folded = [value.casefold() for value in values if value]
+    return all(any(term in value for value in folded) for term in terms)
+
+
+def exact_match_query(terms: Sequence[str]) -> Select:
+    """
+    (id, name, phone, email, external_id) of leads with a value equal to a
+    term, or a name equal to the whole query, by index lookups; only the
+    newest MAX_CANDIDATES leads of a common name are read
+    """
+    values = list(terms)
+    if len(terms) > 1:
+        values.append(" ".join(terms))
+    columns = (models.Lead.name, models.Lead.phone, models.Lead.email, models.Lead.external_id)
+    return select(models.Lead.id, *columns).where(or_(
+        models.Lead.id.in_(
+            select(models.LeadIdentity.lead_id).where(
+                models.LeadIdentity.kind.in_(IDENTITY_KINDS),
+                models.LeadIdentity.value.in_(values)
+            )
+        ),
+        models.Lead.id.in_(
+            select(models.Lead.id).where(
+                models.Lead.normalized_name.in_(values)
+            ).order_by(models.Lead.id.desc()).limit(MAX_CANDIDATES)
+        )
+    ))
+
+
+def candidate_query(terms: Sequence[str], dialect_name: str) -> Select:
+    """(id, name, phone, email, external_id) of the newest leads matching all terms"""
+    columns = (models.Lead.name, models.Lead.phone, models.Lead.email, models.Lead.external_id)
+    query = select(models.Lead.id, *columns)
+    if dialect_name == "sqlite":
+        return query.where(models.Lead.id.in_(
+            select(leads_fts.c.rowid).where(
+                leads_fts.c.leads_fts.op("MATCH")(fts_query(terms))
+            ).order_by(leads_fts.c.rowid.desc()).limit(MAX_CANDIDATES)
+        ))
+    return query.where(and_(*(
+        or_(*(lead_column.ilike(f"%{term}%") for lead_column in columns))
+        for term in terms
+    ))).order_by(models.Lead.id.desc()).limit(MAX_CANDIDATES)
+
+
+def search_leads(db: Session, terms: Sequence[str], offset: int, limit: int) -> List[models.Lead]:
+    """Leads matching all terms, best first, from position `offset` of the ranking"""
+    candidates = {}
+    for lead_id, name, phone, email, external_id in db.execute(exact_match_query(terms)):
+        values = (name, normalize_phone(phone), email, external_id)
+        # An exact match of one term must still contain the others
+        if matches_all(terms, values):
+            candidates[lead_id] = values
+    for lead_id, name, phone, email, external_id in db.execute(
+        candidate_query(terms, db.get_bind().dialect.name)
+    ):
+        candidates[lead_id] = (name, normalize_phone(phone), email, external_id)
+    
+    ranked = []
+    for lead_id, values in candidates.items():
+        score = sum(max(term_score(term, value) for value in values) for term in terms)
+        ranked.append((-score, -lead_id))
+    ranked.sort()
+
+    page_ids = [-lead_id for _, lead_id in ranked[offset:offset + limit]]
+    if not page_ids:
+        return []
+    leads = {lead.id: lead for lead in db.query(models.Lead).filter(models.Lead.id.in_(page_ids))}
+    return [leads[lead_id] for lead_id in page_ids]
@@ -1,13 +1,86 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from typing import Optional, List
-import random
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import tuple_, update, case, and_, select, delete, insert, func
+from sqlalchemy.exc import IntegrityError
+from typing import Optional, List, Tuple, Dict, Iterable
+from collections import Counter
+from datetime import datetime, timedelta
 from app import models, schemas
+from app.database import insert_returning_ids
+from app.identity import (
+    LeadIdentityConflict, lead_identities, insert_identities_ignoring_conflicts, normalize_external_id,
+    normalize_phone
+)
+from app.load_tracker import load_tracker
+from app.search import normalize_name
+from app.routing import routing_tables
+from app.rollups import record_assigned, record_created, record_deactivated
+from app.metrics import metrics, timer
+
+# Max number of values in a single IN (...) clause
+IN_CHUNK_SIZE = 500
+
+# Attempts to create a lead when the same lead is being created concurrently
+LEAD_CREATE_ATTEMPTS = 3
+
+# Backlog entries assigned per transaction when draining
+BACKLOG_DRAIN_BATCH_SIZE = 500
+
+# Contacts deactivated per transaction by bulk deactivation
+DEACTIVATE_BATCH_SIZE = 1000
 
 
 class LeadService:
     """Service for managing leads"""
     
+    @staticmethod
+    def _find_lead(
+        db: Session,
+        identities: List[Tuple[str, str]]
+    ) -> Optional[models.Lead]:
+        """Find lead by any of its identities with one query, respecting identity priority"""
+        if not identities:
+            return None
+        
+        rows = db.query(models.LeadIdentity.kind, models.Lead).join(
+            models.Lead, models.Lead.id == models.LeadIdentity.lead_id
+        ).filter(
+            tuple_(models.LeadIdentity.kind, models.LeadIdentity.value).in_(identities)
+        ).all()
+        
+        leads_by_kind = {kind: lead for kind, lead in rows}
+        for kind, _ in identities:
+            if kind in leads_by_kind:
+                return leads_by_kind[kind]
+        return None
+    
+    @staticmethod
+    def _find_lead_ids(
+        db: Session,
+        identities: Iterable[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], int]:
+        """Map (kind, value) identities to lead ids with chunked IN (...) queries"""
+        found = {}
+        identities = list(identities)
+        for i in range(0, len(identities), IN_CHUNK_SIZE):
+            rows = db.query(
+                models.LeadIdentity.kind,
+                models.LeadIdentity.value,
+                models.LeadIdentity.lead_id
+            ).filter(
+                tuple_(models.LeadIdentity.kind, models.LeadIdentity.value).in_(
+                    identities[i:i + IN_CHUNK_SIZE]
+                )
+            ).all()
+            for kind, value, lead_id in rows:
+                found[(kind, value)] = lead_id
+        return found
+    
+    @staticmethod
+    def _insert_identities(db: Session, rows: List[dict]) -> None:
+        """Insert identities of new leads; raise if some were taken concurrently"""
+        if insert_identities_ignoring_conflicts(db, rows) < len(rows):
+            raise LeadIdentityConflict("Lead identity was created by a concurrent transaction")
+    
     @staticmethod
     def find_or_create_lead(
         db: Session,
@@ -17,162 +90,462 @@ class LeadService:
         name: Optional[str] = None
     ) -> models.Lead:
         """
-        Find existing lead by external_id, phone, or email.
+        Find existing lead by external_id, phone, or email (normalized).
         If not found, create a new lead.
+        If the same lead is created concurrently, the session is rolled back
+        and the lead created by the other transaction is returned.
         """
-        # Try to find by external_id first
-        if external_id:
-            lead = db.query(models.Lead).filter(models.Lead.external_id == external_id).first()
-            if lead:
-                return lead
+        identities = lead_identities(external_id, phone, email)
         
-        # Try to find by phone
-        if phone:
-            lead = db.query(models.Lead).filter(models.Lead.phone == phone).first()
+        for attempt in range(LEAD_CREATE_ATTEMPTS):
+            lead = LeadService._find_lead(db, identities)
             if lead:
                 return lead
-        
-        # Try to find by email
-        if email:
-            lead = db.query(models.Lead).filter(models.Lead.email == email).first()
-            if lead:
+            
+            # Create new lead; the unique external_id column holds the lookup key
+            lead = models.Lead(
+                external_id=normalize_external_id(external_id),
+                phone=phone,
+                normalized_phone=normalize_phone(phone),
+                email=email,
+                name=name,
+                normalized_name=normalize_name(name)
+            )
+            try:
+                db.add(lead)
+                db.flush()
+                LeadService._insert_identities(db, [
+                    {"kind": kind, "value": value, "lead_id": lead.id}
+                    for kind, value in identities
+                ])
+                db.commit()
                 return lead
+            except (IntegrityError, LeadIdentityConflict):
+                db.rollback()
+                if attempt == LEAD_CREATE_ATTEMPTS - 1:
+                    raise
+    
+    @staticmethod
+    def find_or_create_lead_ids(
+        db: Session,
+        identifiers: List[Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]]
+    ) -> List[int]:
+        """
+        Bulk version of find_or_create_lead.
+        Takes (external_id, phone, email, name) tuples and returns a lead id for each,
+        resolving all of them with chunked identity queries and inserting new leads
+        with one executemany INSERT ... RETURNING. Doesn't commit, but must run
+        before other writes of the transaction: on a concurrent insert the session
+        is rolled back and resolution is retried.
+        """
+        item_identities = [
+            lead_identities(external_id, phone, email)
+            for external_id, phone, email, _ in identifiers
+        ]
         
-        # Create new lead
-        lead = models.Lead(
-            external_id=external_id,
-            phone=phone,
-            email=email,
-            name=name
-        )
-        db.add(lead)
-        db.commit()
-        db.refresh(lead)
-        return lead
+        for attempt in range(LEAD_CREATE_ATTEMPTS):
+            known = LeadService._find_lead_ids(
+                db, {identity for identities in item_identities for identity in identities}
+            )
+            
+            # Ids of existing leads; new leads are referenced as -(position in new_leads + 1)
+            lead_ids = []
+            new_leads = []
+            new_identities = []
+            for (external_id, phone, email, name), identities in zip(identifiers, item_identities):
+                # Same priority as find_or_create_lead: external_id, phone, email
+                lead_id = next((known[identity] for identity in identities if identity in known), None)
+                
+                if lead_id is None:
+                    new_leads.append({
+                        "external_id": normalize_external_id(external_id),
+                        "phone": phone,
+                        "normalized_phone": normalize_phone(phone),
+                        "email": email,
+                        "name": name,
+                        "normalized_name": normalize_name(name)
+                    })
+                    new_identities.append(identities)
+                    lead_id = -len(new_leads)
+                    # Following items of the batch must find this lead
+                    for identity in identities:
+                        known[identity] = lead_id
+                
+                lead_ids.append(lead_id)
+            
+            if not new_leads:
+                return lead_ids
+            
+            try:
+                inserted_ids = insert_returning_ids(db, models.Lead, new_leads)
+                LeadService._insert_identities(db, [
+                    {"kind": kind, "value": value, "lead_id": lead_id}
+                    for lead_id, identities in zip(inserted_ids, new_identities)
+                    for kind, value in identities
+                ])
+                return [lead_id if lead_id > 0 else inserted_ids[-lead_id - 1] for lead_id in lead_ids]
+            except (IntegrityError, LeadIdentityConflict):
+                db.rollback()
+                if attempt == LEAD_CREATE_ATTEMPTS - 1:
+                    raise
 
 
 class DistributionService:
     """Service for distributing contacts to operators"""
     
     @staticmethod
-    def get_available_operators(
+    def has_capacity(operator_id: int, load_limit: int) -> bool:
+        """Check that operator hasn't reached load limit (load is tracked in memory)"""
+        return load_tracker.get(operator_id) < load_limit
+    
+    @staticmethod
+    def reserve_operator(
+        db: Session,
+        operator_id: int,
+        amount: int = 1
+    ) -> bool:
+        """
+        Atomically add `amount` contacts to operator's active_load.
+        Succeeds only if the operator is active and stays within its load limit,
+        so concurrent transactions can't overshoot the limit.
+        """
+        result = db.execute(
+            update(models.Operator).where(
+                and_(
+                    models.Operator.id == operator_id,
+                    models.Operator.is_active == True,
+                    models.Operator.active_load + amount <= models.Operator.load_limit
+                )
+            ).values(
+                active_load=models.Operator.active_load + amount
+            ).execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+    
+    @staticmethod
+    def release_operator(
+        db: Session,
+        operator_id: int,
+        amount: int = 1
+    ) -> None:
+        """Atomically remove `amount` contacts from operator's active_load"""
+        db.execute(
+            update(models.Operator).where(
+                models.Operator.id == operator_id
+            ).values(
+                active_load=case(
+                    (models.Operator.active_load > amount, models.Operator.active_load - amount),
+                    else_=0
+                )
+            ).execution_options(synchronize_session=False)
+        )
+    
+    @staticmethod
+    def assign_operator(
         db: Session,
         source_id: int
-    ) -> List[models.Operator]:
+    ) -> Optional[models.Operator]:
         """
-        Get all available operators for a source:
-        - Operator is active
-        - Operator has weight configured for this source
-        - Operator hasn't exceeded load limit
+        Main method to assign an operator for a contact from a source.
+        Uses the compiled routing table and distribution strategy of the
+        source, so no per-operator queries are made.
+        The chosen operator's load is reserved in the current transaction
+        (the caller commits); if another transaction took the last slot,
+        the next candidate is tried.
+        Returns None if no suitable operator is available.
         """
-        # Get all operators with weights for this source
-        source_weights = db.query(models.SourceOperatorWeight).filter(
-            models.SourceOperatorWeight.source_id == source_id
-        ).all()
-        
-        if not source_weights:
-            return []
+        load_tracker.ensure_seeded(db)
+        table = routing_tables.get(db, source_id)
+        rejected = set()
         
-        available_operators = []
+        def is_candidate(operator_id: int, load_limit: int) -> bool:
+            return operator_id not in rejected and DistributionService.has_capacity(operator_id, load_limit)
         
-        for source_weight in source_weights:
-            operator = source_weight.operator
-            
-            # Check if operator is active
-            if not operator.is_active:
+        refreshed = False
+        while True:
+            operator_id = table.select(is_candidate, load_tracker.get)
+            if operator_id is None:
+                # Counters may be stale: another worker may have freed capacity
+                if refreshed or not load_tracker.refresh(db, table.operator_ids):
+                    return None
+                refreshed = True
                 continue
             
-            # Calculate current load (count of active contacts)
-            current_load = db.query(func.count(models.Contact.id)).filter(
-                and_(
-                    models.Contact.operator_id == operator.id,
-                    models.Contact.is_active == True
-                )
-            ).scalar()
+            if DistributionService.reserve_operator(db, operator_id):
+                return db.get(models.Operator, operator_id)
             
-            # Check if load limit is not exceeded
-            if current_load < operator.load_limit:
-                available_operators.append(operator)
-        
-        return available_operators
+            # Operator reached its limit in another transaction
+            rejected.add(operator_id)
     
     @staticmethod
-    def select_operator_by_weight(
+    def assign_operators_bulk(
         db: Session,
-        source_id: int,
-        available_operators: List[models.Operator]
-    ) -> Optional[models.Operator]:
+        source_ids: List[int]
+    ) -> List[Optional[int]]:
         """
-        Select an operator using weighted random distribution.
-        Uses probability = weight / sum_of_weights
+        Assign operators for a batch of contacts (one source id per contact).
+        Contacts of the batch count toward load limits; load is reserved in
+        the current transaction with one conditional UPDATE per operator
+        (the caller commits). Operators whose reservation fails are re-checked
+        in the database and the excess contacts are re-routed. If contacts are
+        left without operator, tracked loads of their sources' operators are
+        refreshed from the database once (another worker may have freed capacity).
+        Returns an operator id (or None) for each contact.
         """
-        if not available_operators:
-            return None
+        load_tracker.ensure_seeded(db)
+        assigned: List[Optional[int]] = [None] * len(source_ids)
+        batch_loads: Dict[int, int] = {}
+        reserved: Dict[int, int] = {}
+        rejected = set()
+        refreshed = False
         
-        # Get weights for available operators
-        operator_weights = []
-        for operator in available_operators:
-            weight = db.query(models.SourceOperatorWeight).filter(
-                and_(
-                    models.SourceOperatorWeight.source_id == source_id,
-                    models.SourceOperatorWeight.operator_id == operator.id
-                )
-            ).first()
-            
-            if weight:
-                operator_weights.append((operator, weight.weight))
+        def has_capacity(operator_id: int, load_limit: int) -> bool:
+            return (
+                operator_id not in rejected
+                and current_load(operator_id) < load_limit
+            )
         
-        if not operator_weights:
-            return None
+        def current_load(operator_id: int) -> int:
+            return load_tracker.get(operator_id) + batch_loads.get(operator_id, 0)
         
-        # Calculate total weight
-        total_weight = sum(weight for _, weight in operator_weights)
-        
-        if total_weight == 0:
-            # If all weights are 0, return random operator
-            return random.choice(available_operators)
-        
-        # Weighted random selection
-        rand = random.uniform(0, total_weight)
-        cumulative = 0
-        
-        for operator, weight in operator_weights:
-            cumulative += weight
-            if rand <= cumulative:
-                # Double-check load limit (in case of race condition)
-                current_load = db.query(func.count(models.Contact.id)).filter(
-                    and_(
-                        models.Contact.operator_id == operator.id,
-                        models.Contact.is_active == True
-                    )
-                ).scalar()
+        pending = list(range(len(source_ids)))
+        while pending:
+            for i in pending:
+                operator_id = routing_tables.get(db, source_ids[i]).select(has_capacity, current_load)
+                if operator_id is not None:
+                    assigned[i] = operator_id
+                    batch_loads[operator_id] = batch_loads.get(operator_id, 0) + 1
+            
+            pending = []
+            for operator_id, load in batch_loads.items():
+                amount = load - reserved.get(operator_id, 0)
+                if amount <= 0:
+                    continue
+                if DistributionService.reserve_operator(db, operator_id, amount):
+                    reserved[operator_id] = load
+                    continue
+                
+                # Tracked load is stale: take whatever capacity is actually left
+                operator = db.query(
+                    models.Operator.active_load,
+                    models.Operator.load_limit,
+                    models.Operator.is_active
+                ).filter(models.Operator.id == operator_id).first()
+                free = max(operator.load_limit - operator.active_load, 0) if operator and operator.is_active else 0
+                if free and DistributionService.reserve_operator(db, operator_id, min(free, amount)):
+                    reserved[operator_id] = reserved.get(operator_id, 0) + min(free, amount)
                 
-                if current_load < operator.load_limit:
-                    return operator
+                # Re-route contacts that didn't fit
+                excess = load - reserved.get(operator_id, 0)
+                for i in range(len(assigned) - 1, -1, -1):
+                    if excess == 0:
+                        break
+                    if assigned[i] == operator_id:
+                        assigned[i] = None
+                        pending.append(i)
+                        excess -= 1
+                batch_loads[operator_id] = reserved.get(operator_id, 0)
+                rejected.add(operator_id)
+            
+            if not pending and not refreshed and None in assigned:
+                refreshed = True
+                unassigned = [i for i, operator_id in enumerate(assigned) if operator_id is None]
+                operator_ids = {
+                    operator_id
+                    for source_id in {source_ids[i] for i in unassigned}
+                    for operator_id in routing_tables.get(db, source_id).operator_ids
+                }
+                if load_tracker.refresh(db, operator_ids, uncommitted=reserved):
+                    pending = unassigned
         
-        # Fallback to first available (shouldn't happen, but just in case)
-        return available_operators[0]
+        return assigned
+
+
+class BacklogService:
+    """
+    FIFO queue of active contacts that got no operator.
+    Contacts are queued per source when every operator is at its limit and
+    assigned when capacity frees up. Draining reads only as many queue
+    entries as the source's operators can take, never the contacts table.
+    """
     
     @staticmethod
-    def assign_operator(
-        db: Session,
-        source_id: int
-    ) -> Optional[models.Operator]:
+    def enqueue(db: Session, contacts: Iterable[Tuple[int, int]], enqueued_at: datetime) -> None:
+        """Queue (contact_id, source_id) pairs in the current transaction (the caller commits)"""
+        rows = [
+            {"contact_id": contact_id, "source_id": source_id, "enqueued_at": enqueued_at}
+            for contact_id, source_id in contacts
+        ]
+        if rows:
+            db.execute(insert(models.BacklogEntry), rows)
+    
+    @staticmethod
+    def enqueue_unassigned(db: Session) -> int:
+        """Queue active contacts without operator that aren't queued yet (e.g. created before the backlog)"""
+        pending = select(
+            models.Contact.id,
+            models.Contact.source_id,
+            models.Contact.created_at
+        ).where(
+            models.Contact.operator_id.is_(None),
+            models.Contact.is_active == True,
+            ~select(models.BacklogEntry.id).where(
+                models.BacklogEntry.contact_id == models.Contact.id
+            ).exists()
+        ).order_by(models.Contact.id)
+        result = db.execute(
+            insert(models.BacklogEntry).from_select(["contact_id", "source_id", "enqueued_at"], pending)
+        )
+        db.commit()
+        return result.rowcount
+    
+    @staticmethod
+    def free_capacity(db: Session, source_id: int) -> int:
+        """Number of contacts the active operators of a source can still take (tracked load)"""
+        load_tracker.ensure_seeded(db)
+        table = routing_tables.get(db, source_id)
+        return sum(
+            max(load_limit - load_tracker.get(operator_id), 0)
+            for operator_id, load_limit in zip(table.operator_ids, table.load_limits)
+        )
+    
+    @staticmethod
+    def drain_source(db: Session, source_id: int) -> int:
         """
-        Main method to assign an operator for a contact from a source.
-        Returns None if no suitable operator is available.
+        Assign queued contacts of a source, oldest first, while its operators
+        have capacity. Each batch is claimed (deleted from the queue), assigned
+        and committed in one transaction together with the stats rollups;
+        contacts that still found no operator are put back in their place.
+        Returns number of assigned contacts.
         """
-        available_operators = DistributionService.get_available_operators(db, source_id)
-        
-        if not available_operators:
-            return None
+        assigned_total = 0
+        while True:
+            capacity = BacklogService.free_capacity(db, source_id)
+            if capacity <= 0:
+                break
+            
+            limit = min(capacity, BACKLOG_DRAIN_BATCH_SIZE)
+            entry_ids = db.scalars(
+                select(models.BacklogEntry.id).where(
+                    models.BacklogEntry.source_id == source_id
+                ).order_by(models.BacklogEntry.id).limit(limit)
+            ).all()
+            if not entry_ids:
+                break
+            
+            # Claim entries; ones already claimed by a concurrent drain are not returned
+            claimed = sorted(db.execute(
+                delete(models.BacklogEntry).where(
+                    models.BacklogEntry.id.in_(entry_ids)
+                ).returning(
+                    models.BacklogEntry.id,
+                    models.BacklogEntry.contact_id,
+                    models.BacklogEntry.enqueued_at
+                )
+            ).all())
+            if not claimed:
+                db.rollback()
+                break
+            
+            operator_ids = DistributionService.assign_operators_bulk(db, [source_id] * len(claimed))
+            assignments = [
+                (entry, operator_id) for entry, operator_id in zip(claimed, operator_ids) if operator_id is not None
+            ]
+            waiting = [entry for entry, operator_id in zip(claimed, operator_ids) if operator_id is None]
+            
+            if assignments:
+                db.execute(update(models.Contact), [
+                    {"id": entry.contact_id, "operator_id": operator_id} for entry, operator_id in assignments
+                ])
+                # Contacts were counted as created without operator; count them under their operator now
+                created_at = dict(db.execute(
+                    select(models.Contact.id, models.Contact.created_at).where(
+                        models.Contact.id.in_([entry.contact_id for entry, _ in assignments])
+                    )
+                ).all())
+                record_assigned(db, [
+                    (created_at[entry.contact_id], source_id, operator_id) for entry, operator_id in assignments
+                ])
+            if waiting:
+                db.execute(insert(models.BacklogEntry), [
+                    {
+                        "id": entry.id,
+                        "contact_id": entry.contact_id,
+                        "source_id": source_id,
+                        "enqueued_at": entry.enqueued_at
+                    }
+                    for entry in waiting
+                ])
+            db.commit()
+            
+            now = datetime.utcnow()
+            for operator_id, amount in Counter(operator_id for _, operator_id in assignments).items():
+                load_tracker.increment(operator_id, amount)
+            for entry, _ in assignments:
+                metrics.backlog_wait.observe((now - entry.enqueued_at).total_seconds(), str(source_id))
+            
+            assigned_total += len(assignments)
+            if waiting or len(claimed) < limit:
+                break
         
-        return DistributionService.select_operator_by_weight(db, source_id, available_operators)
+        return assigned_total
+    
+    @staticmethod
+    def drain_sources(db: Session, source_ids: Iterable[int]) -> int:
+        """Drain queues of several sources, returns number of assigned contacts"""
+        return sum(BacklogService.drain_source(db, source_id) for source_id in sorted(set(source_ids)))
+    
+    @staticmethod
+    def drain_operator(db: Session, operator_id: int) -> int:
+        """Drain queues of all sources served by an operator that got free capacity"""
+        return BacklogService.drain_operators(db, [operator_id])
+    
+    @staticmethod
+    def drain_operators(db: Session, operator_ids: Iterable[int]) -> int:
+        """Drain queues of all sources served by any of the operators (one query for the sources)"""
+        operator_ids = list(operator_ids)
+        if not operator_ids:
+            return 0
+        source_ids = db.scalars(
+            select(models.SourceOperatorWeight.source_id).where(
+                models.SourceOperatorWeight.operator_id.in_(operator_ids)
+            )
+        ).all()
+        return BacklogService.drain_sources(db, source_ids)
+    
+    @staticmethod
+    def drain_all(db: Session) -> int:
+        """Drain queues of all sources that have queued contacts"""
+        source_ids = db.scalars(select(models.BacklogEntry.source_id).distinct()).all()
+        return BacklogService.drain_sources(db, source_ids)
+    
+    @staticmethod
+    def depth_by_source(db: Session) -> Dict[int, Tuple[int, Optional[datetime]]]:
+        """source_id -> (queued contacts, enqueued_at of the oldest one)"""
+        rows = db.query(
+            models.BacklogEntry.source_id,
+            func.count(models.BacklogEntry.id),
+            func.min(models.BacklogEntry.enqueued_at)
+        ).group_by(models.BacklogEntry.source_id).all()
+        return {source_id: (depth, oldest) for source_id, depth, oldest in rows}
 
 
 class ContactService:
     """Service for managing contacts"""
     
+    @staticmethod
+    def response_options(loader=selectinload) -> list:
+        """
+        Loader options for relations nested in ContactResponse.
+        selectinload keeps a page at a constant number of queries,
+        joinedload fetches a single contact in one query.
+        """
+        return [
+            loader(models.Contact.lead),
+            loader(models.Contact.source),
+            loader(models.Contact.operator)
+        ]
+    
     @staticmethod
     def create_contact(
         db: Session,
@@ -186,13 +559,14 @@ class ContactService:
         4. Create contact record
         """
         # 1. Find or create lead
-        lead = LeadService.find_or_create_lead(
-            db=db,
-            external_id=contact_data.lead_external_id,
-            phone=contact_data.lead_phone,
-            email=contact_data.lead_email,
-            name=contact_data.lead_name
-        )
+        with timer("lead_resolution"):
+            lead = LeadService.find_or_create_lead(
+                db=db,
+                external_id=contact_data.lead_external_id,
+                phone=contact_data.lead_phone,
+                email=contact_data.lead_email,
+                name=contact_data.lead_name
+            )
         
         # 2. Verify source exists
         source = db.query(models.Source).filter(models.Source.id == contact_data.source_id).first()
@@ -200,18 +574,250 @@ class ContactService:
             raise ValueError(f"Source with id {contact_data.source_id} not found")
         
         # 3. Assign operator
-        operator = DistributionService.assign_operator(db, contact_data.source_id)
+        with timer("operator_selection"):
+            operator = DistributionService.assign_operator(db, contact_data.source_id)
         
-        # 4. Create contact
+        # 4. Create contact (created_at set here to match its stats rollup bucket)
+        now = datetime.utcnow()
         contact = models.Contact(
             lead_id=lead.id,
             source_id=contact_data.source_id,
             operator_id=operator.id if operator else None,
             message=contact_data.message,
-            is_active=True
+            is_active=True,
+            created_at=now
         )
         db.add(contact)
+        with timer("commit"):
+            db.flush()
+            contact_id = contact.id
+            record_created(db, [(now, contact.source_id, contact.operator_id)])
+            if not operator:
+                BacklogService.enqueue(db, [(contact_id, contact.source_id)], now)
+            db.commit()
+        if operator:
+            load_tracker.increment(operator.id)
+        
+        # Reload the expired contact with its relations in one query for the response
+        return db.query(models.Contact).options(
+            *ContactService.response_options(joinedload)
+        ).filter(models.Contact.id == contact_id).one()
+    
+    @staticmethod
+    def _deactivate_where(db: Session, condition) -> Tuple[int, List[int]]:
+        """
+        Deactivate active contacts matching condition in one transaction:
+        released load is subtracted from operators.active_load with one
+        UPDATE per operator, unassigned contacts leave the backlog and the
+        stats rollups are updated before the commit.
+        Returns (deactivated contacts, operators whose load was released).
+        """
+        now = datetime.utcnow()
+        # Operators are read by the UPDATE itself: the backlog may have
+        # assigned one since the caller looked at the contacts
+        rows = db.execute(
+            update(models.Contact).where(
+                and_(
+                    models.Contact.is_active == True,
+                    condition
+                )
+            ).values(
+                is_active=False,
+                deactivated_at=now
+            ).returning(
+                models.Contact.id,
+                models.Contact.source_id,
+                models.Contact.operator_id
+            ).execution_options(synchronize_session=False)
+        ).all()
+        if not rows:
+            db.commit()
+            return 0, []
+        
+        released = Counter(operator_id for _, _, operator_id in rows if operator_id)
+        for operator_id, amount in released.items():
+            DistributionService.release_operator(db, operator_id, amount)
+        queued = [contact_id for contact_id, _, operator_id in rows if not operator_id]
+        for i in range(0, len(queued), IN_CHUNK_SIZE):
+            db.execute(delete(models.BacklogEntry).where(
+                models.BacklogEntry.contact_id.in_(queued[i:i + IN_CHUNK_SIZE])
+            ))
+        record_deactivated(db, [(now, source_id, operator_id) for _, source_id, operator_id in rows])
         db.commit()
-        db.refresh(contact)
+        
+        for operator_id, amount in released.items():
+            load_tracker.decrement(operator_id, amount)
+        return len(rows), list(released)
+    
+    @staticmethod
+    def deactivate_contact(
+        db: Session,
+        contact: models.Contact
+    ) -> models.Contact:
+        """
+        Deactivate a contact and release operator load.
+        Deactivating an already inactive contact is a no-op
+        (also when two requests deactivate it concurrently).
+        Freed operator capacity is offered to the backlog.
+        """
+        _, operator_ids = ContactService._deactivate_where(db, models.Contact.id == contact.id)
+        BacklogService.drain_operators(db, operator_ids)
         return contact
-
+    
+    @staticmethod
+    def deactivate_contacts(
+        db: Session,
+        contact_ids: Optional[List[int]] = None,
+        conditions: Iterable = (),
+        order_by=models.Contact.id,
+        batch_size: int = DEACTIVATE_BATCH_SIZE
+    ) -> int:
+        """
+        Bulk deactivation of active contacts that are listed in contact_ids
+        (if given) and match all conditions. Contacts are deactivated in
+        batches of batch_size, each one UPDATE ... RETURNING committed together
+        with the operator load it releases; freed capacity is offered to the
+        backlog once at the end. Returns number of deactivated contacts.
+        """
+        conditions = list(conditions)
+        operator_ids = set()
+        deactivated = 0
+        
+        if contact_ids is not None:
+            contact_ids = sorted(set(contact_ids))
+            for i in range(0, len(contact_ids), batch_size):
+                count, released = ContactService._deactivate_where(
+                    db, and_(models.Contact.id.in_(contact_ids[i:i + batch_size]), *conditions)
+                )
+                deactivated += count
+                operator_ids.update(released)
+        else:
+            while True:
+                # Select the batch with LIMIT (UPDATE ... LIMIT isn't portable)
+                batch = select(models.Contact.id).where(
+                    models.Contact.is_active == True, *conditions
+                ).order_by(order_by).limit(batch_size)
+                count, released = ContactService._deactivate_where(db, models.Contact.id.in_(batch))
+                deactivated += count
+                operator_ids.update(released)
+                # Not `count < batch_size`: rows of the batch deactivated concurrently
+                # make it short (PostgreSQL) while matching contacts remain
+                if count == 0:
+                    break
+        
+        BacklogService.drain_operators(db, operator_ids)
+        return deactivated
+    
+    @staticmethod
+    def expire_contacts(
+        db: Session,
+        now: Optional[datetime] = None,
+        batch_size: int = DEACTIVATE_BATCH_SIZE
+    ) -> Dict[int, int]:
+        """
+        Deactivate active contacts older than contact_ttl_seconds of their source.
+        Batches are read in creation order from the (is_active, created_at) index.
+        Returns source_id -> number of expired contacts.
+        """
+        now = now or datetime.utcnow()
+        policies = db.query(models.Source.id, models.Source.contact_ttl_seconds).filter(
+            models.Source.contact_ttl_seconds.isnot(None)
+        ).all()
+        
+        expired = {}
+        for source_id, ttl_seconds in policies:
+            count = ContactService.deactivate_contacts(
+                db,
+                conditions=[
+                    models.Contact.created_at < now - timedelta(seconds=ttl_seconds),
+                    models.Contact.source_id == source_id
+                ],
+                order_by=models.Contact.created_at,
+                batch_size=batch_size
+            )
+            if count:
+                expired[source_id] = count
+                metrics.contacts_expired.inc(str(source_id), amount=count)
+        return expired
+    
+    @staticmethod
+    def create_contacts_batch(
+        db: Session,
+        contacts_data: List[schemas.ContactCreate]
+    ) -> List[schemas.ContactBatchItemResult]:
+        """
+        Create a batch of contacts in one transaction:
+        1. Verify all sources with one query
+        2. Find or create leads in bulk
+        3. Assign operators, counting load limits within the batch
+        4. Insert all contacts and commit once
+        Returns a result for each item (in the same order).
+        """
+        results = [schemas.ContactBatchItemResult(index=i) for i in range(len(contacts_data))]
+        
+        # 1. Verify sources
+        source_ids = {contact_data.source_id for contact_data in contacts_data}
+        existing_source_ids = {
+            source_id for (source_id,) in db.query(models.Source.id).filter(
+                models.Source.id.in_(source_ids)
+            )
+        }
+        
+        valid_items = []
+        for i, contact_data in enumerate(contacts_data):
+            if contact_data.source_id in existing_source_ids:
+                valid_items.append((i, contact_data))
+            else:
+                results[i].error = f"Source with id {contact_data.source_id} not found"
+        
+        if not valid_items:
+            return results
+        
+        # 2. Find or create leads
+        lead_ids = LeadService.find_or_create_lead_ids(db, [
+            (
+                contact_data.lead_external_id,
+                contact_data.lead_phone,
+                contact_data.lead_email,
+                contact_data.lead_name
+            )
+            for _, contact_data in valid_items
+        ])
+        
+        # 3. Assign operators; contacts of this batch count toward the load
+        operator_ids = DistributionService.assign_operators_bulk(
+            db, [contact_data.source_id for _, contact_data in valid_items]
+        )
+        
+        now = datetime.utcnow()
+        contacts = [
+            {
+                "lead_id": lead_id,
+                "source_id": contact_data.source_id,
+                "operator_id": operator_id,
+                "message": contact_data.message,
+                "is_active": True,
+                "created_at": now
+            }
+            for (_, contact_data), lead_id, operator_id in zip(valid_items, lead_ids, operator_ids)
+        ]
+        
+        # 4. Insert contacts with one executemany and commit once
+        contact_ids = insert_returning_ids(db, models.Contact, contacts)
+        for (i, _), contact_id, contact in zip(valid_items, contact_ids, contacts):
+            results[i].contact_id = contact_id
+            results[i].lead_id = contact["lead_id"]
+            results[i].operator_id = contact["operator_id"]
+        record_created(db, [(now, contact["source_id"], contact["operator_id"]) for contact in contacts])
+        BacklogService.enqueue(db, [
+            (contact_id, contact["source_id"])
+            for contact_id, contact in zip(contact_ids, contacts)
+            if contact["operator_id"] is None
+        ], now)
+        db.commit()
+        
+        for operator_id, amount in Counter(operator_ids).items():
+            if operator_id is not None:
+                load_tracker.increment(operator_id, amount)
+        
+        return results
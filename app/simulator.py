@@ -0,0 +1,351 @@
+"""
+Offline distribution simulator for capacity planning.
+
+Replays a stream of contact arrivals with handling times against a
+distribution config - the live one (load_config) or an edited JSON snapshot -
+without touching the database. Operators are picked by weight among the
+active operators of the source that are under their load limit (the rules of
+DistributionService.assign_operator); contacts that find none wait in
+their source's backlog (FIFO) until capacity frees up. Load-aware strategies
+(least_loaded, power_of_two) are approximated by their weights.
+
+Time advances in ticks. Every tick releases contacts whose handling time is
+over, then assigns queued and new contacts with NumPy-batched weighted
+sampling: contacts drawn for an operator beyond its free capacity are drawn
+again among the others, so load limits hold exactly; capacity freed within a
+tick is available from the next one.
+"""
+import heapq
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, NamedTuple, Optional
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app import models, schemas
+
+# Rows fetched per round trip when reading recorded contacts
+RECORDED_FETCH_SIZE = 50_000
+
+
+class ArrivalStream(NamedTuple):
+    times: np.ndarray  # Seconds from the start of the stream, ascending
+    source_ids: np.ndarray
+    handle_times: np.ndarray  # Seconds from assignment to deactivation (inf: stays active)
+
+
+def load_config(db: Session) -> schemas.SimulationConfig:
+    """Snapshot of the live operators, sources and weights"""
+    weights: Dict[int, list] = {}
+    for source_id, operator_id, weight in db.query(
+        models.SourceOperatorWeight.source_id,
+        models.SourceOperatorWeight.operator_id,
+        models.SourceOperatorWeight.weight
+    ).order_by(models.SourceOperatorWeight.id):
+        weights.setdefault(source_id, []).append(
+            schemas.SimulationWeight(operator_id=operator_id, weight=weight)
+        )
+
+    return schemas.SimulationConfig(
+        operators=[
+            schemas.SimulationOperator(id=operator_id, load_limit=load_limit, is_active=is_active)
+            for operator_id, load_limit, is_active in db.query(
+                models.Operator.id, models.Operator.load_limit, models.Operator.is_active
+            ).order_by(models.Operator.id)
+        ],
+        sources=[
+            schemas.SimulationSource(
+                id=source_id,
+                distribution_strategy=strategy,
+                operators=weights.get(source_id, [])
+            )
+            for source_id, strategy in db.query(
+                models.Source.id, models.Source.distribution_strategy
+            ).order_by(models.Source.id)
+        ]
+    )
+
+
+def synthetic_stream(
+    config: schemas.SimulationConfig,
+    contacts: int,
+    arrival_rate: float,
+    mean_handle_time: float,
+    source_shares: Optional[Dict[int, float]] = None,
+    seed: Optional[int] = None
+) -> ArrivalStream:
+    """
+    Poisson arrivals at `arrival_rate` contacts per second with exponential
+    handling times. Sources are drawn by `source_shares` (all sources of the
+    config equally by default).
+    """
+    if source_shares:
+        source_ids = np.array(list(source_shares), dtype=np.int64)
+        shares = np.array(list(source_shares.values()), dtype=float)
+    else:
+        source_ids = np.array([source.id for source in config.sources], dtype=np.int64)
+        shares = np.ones(len(source_ids))
+    if not len(source_ids) or shares.sum() <= 0:
+        raise ValueError("No sources to send contacts from")
+
+    rng = np.random.default_rng(seed)
+    return ArrivalStream(
+        times=np.sort(rng.uniform(0, contacts / arrival_rate, contacts)),
+        source_ids=rng.choice(source_ids, size=contacts, p=shares / shares.sum()),
+        handle_times=rng.exponential(mean_handle_time, contacts)
+    )
+
+
+def recorded_stream(db: Session, start: datetime, end: datetime) -> ArrivalStream:
+    """
+    Contacts created in [start, end) (naive UTC) with their recorded handling
+    time (deactivated_at - created_at); contacts still active never finish.
+    The stream starts at the first of them.
+    """
+    times, source_ids, handle_times = [], [], []
+    rows = db.execute(
+        select(
+            models.Contact.created_at,
+            models.Contact.source_id,
+            models.Contact.deactivated_at
+        ).where(
+            models.Contact.created_at >= start,
+            models.Contact.created_at < end
+        ).order_by(models.Contact.created_at).execution_options(yield_per=RECORDED_FETCH_SIZE)
+    )
+    first_created_at = None
+    for created_at, source_id, deactivated_at in rows:
+        if first_created_at is None:
+            first_created_at = created_at
+        times.append((created_at - first_created_at).total_seconds())
+        source_ids.append(source_id)
+        handle_times.append(
+            max((deactivated_at - created_at).total_seconds(), 0.0) if deactivated_at is not None else np.inf
+        )
+    return ArrivalStream(
+        times=np.array(times, dtype=float),
+        source_ids=np.array(source_ids, dtype=np.int64),
+        handle_times=np.array(handle_times, dtype=float)
+    )
+
+
+def _take(chunks: Deque[np.ndarray], count: int) -> np.ndarray:
+    """Remove the first `count` contacts from a chunked queue"""
+    taken = []
+    while count:
+        chunk = chunks.popleft()
+        if len(chunk) > count:
+            chunks.appendleft(chunk[count:])
+            chunk = chunk[:count]
+        taken.append(chunk)
+        count -= len(chunk)
+    return np.concatenate(taken)
+
+
+def simulate(
+    config: schemas.SimulationConfig,
+    stream: ArrivalStream,
+    tick: float = 1.0,
+    seed: Optional[int] = None
+) -> schemas.SimulationResult:
+    """Replay the stream against the config; operators start without load"""
+    started = time.perf_counter()
+    # Independent of a stream generated with the same seed
+    rng = np.random.default_rng(None if seed is None else (seed, 1))
+
+    operator_ids = [operator.id for operator in config.operators]
+    operator_index = {operator_id: i for i, operator_id in enumerate(operator_ids)}
+    operator_count = len(operator_ids)
+    limits = np.array([operator.load_limit for operator in config.operators], dtype=np.int64)
+    active = np.array([operator.is_active for operator in config.operators], dtype=bool)
+
+    # Weights of active operators per source; the extra last row stands
+    # for sources missing from the config (no operators)
+    source_ids = [source.id for source in config.sources]
+    row_count = len(source_ids) + 1
+    weights = np.zeros((row_count, operator_count))
+    members = np.zeros((row_count, operator_count), dtype=bool)
+    for row, source in enumerate(config.sources):
+        for source_weight in source.operators:
+            i = operator_index.get(source_weight.operator_id)
+            if i is not None and active[i]:
+                weights[row, i] = source_weight.weight
+                members[row, i] = True
+
+    contact_count = len(stream.times)
+    contact_rows = np.full(contact_count, row_count - 1, dtype=np.int64)
+    if source_ids:
+        known_ids = np.array(source_ids, dtype=np.int64)
+        known_order = np.argsort(known_ids)
+        position = np.minimum(
+            np.searchsorted(known_ids[known_order], stream.source_ids), len(source_ids) - 1
+        )
+        known = known_ids[known_order][position] == stream.source_ids
+        contact_rows[known] = known_order[position][known]
+
+    tick_count = int(stream.times[-1] // tick) + 1 if contact_count else 0
+    arrival_ticks = (stream.times // tick).astype(np.int64)
+    # Ticks from assignment to release (at least one); tick_count means never
+    handle_ticks = np.full(contact_count, tick_count, dtype=np.int64)
+    finite = np.isfinite(stream.handle_times)
+    handle_ticks[finite] = np.minimum(
+        np.maximum(np.ceil(stream.handle_times[finite] / tick), 1), tick_count
+    ).astype(np.int64)
+
+    load = np.zeros(operator_count, dtype=np.int64)
+    peak_load = np.zeros(operator_count, dtype=np.int64)
+    saturated_ticks = np.zeros(operator_count, dtype=np.int64)
+    first_saturated = np.full(operator_count, -1, dtype=np.int64)
+    assigned_operators = np.full(contact_count, -1, dtype=np.int64)
+    assigned_ticks = np.full(contact_count, -1, dtype=np.int64)
+    row_offsets = np.arange(row_count)[:, None] * 2.0
+    member_counts = members.astype(np.int64)
+    # FIFO queues of contacts that found no operator, per source row, as chunks
+    queues: List[Deque[np.ndarray]] = [deque() for _ in range(row_count)]
+    queue_sizes = np.zeros(row_count, dtype=np.int64)
+    # Tick -> operators of the contacts released at it, with the ticks in a heap
+    releases: Dict[int, List[np.ndarray]] = {}
+    release_heap: List[int] = []
+    deactivations = 0
+
+    # Only ticks with arrivals or releases are processed; load doesn't change in between
+    t = 0
+    arrivals_end = 0
+    while t < tick_count:
+        arrivals_start, arrivals_end = arrivals_end, int(np.searchsorted(arrival_ticks, t + 1))
+        released = releases.pop(t, None)
+        if released:
+            released = np.concatenate(released)
+            load -= np.bincount(released, minlength=operator_count)
+            deactivations += len(released)
+        # Queued contacts first (they arrived earlier), then this tick's arrivals.
+        # A source gets no more queued contacts than its available operators can take.
+        capacity = member_counts @ np.where(active, np.maximum(limits - load, 0), 0)
+        from_queues = []
+        for row in np.flatnonzero((queue_sizes > 0) & (capacity > 0)).tolist():
+            count = int(min(capacity[row], queue_sizes[row]))
+            from_queues.append(_take(queues[row], count))
+            queue_sizes[row] -= count
+        pending = np.concatenate(from_queues + [np.arange(arrivals_start, arrivals_end)])
+        if len(from_queues) > 1:
+            pending.sort()
+        queued = []
+        while len(pending):
+            free = np.where(active, np.maximum(limits - load, 0), 0)
+            eligible = free > 0
+            tick_weights = weights * eligible
+            totals = tick_weights.sum(axis=1)
+            # Only zero weights left: uniform among available operators
+            uniform = totals == 0
+            tick_weights[uniform] = members[uniform] & eligible
+            totals = tick_weights.sum(axis=1)
+
+            rows = contact_rows[pending]
+            has_operator = totals[rows] > 0
+            queued.append(pending[~has_operator])
+            pending, rows = pending[has_operator], rows[has_operator]
+            if not len(pending):
+                break
+
+            # Weighted draw for all contacts at once: per-row normalized cumulative
+            # weights are laid out in one ascending array (row r in [2r, 2r + 1])
+            cumulative = np.cumsum(tick_weights, axis=1)
+            cumulative = cumulative / np.where(totals > 0, totals, 1)[:, None] + row_offsets
+            drawn = np.searchsorted(
+                cumulative.ravel(), rows * 2.0 + rng.random(len(pending)), side="right"
+            ) - rows * operator_count
+            drawn = np.minimum(drawn, operator_count - 1)
+            # Rounding at a row's end may land on an unavailable operator: draw again
+            valid = tick_weights[rows, drawn] > 0
+
+            # Each operator takes as many of its draws as it has free slots, earliest first
+            keys = np.where(valid, drawn, operator_count)
+            order = np.argsort(keys, kind="stable")
+            sorted_keys = keys[order]
+            ranks = np.empty(len(order), dtype=np.int64)
+            ranks[order] = np.arange(len(order)) - np.searchsorted(sorted_keys, sorted_keys)
+            accepted = valid & (ranks < free[drawn])
+
+            contacts, operators = pending[accepted], drawn[accepted]
+            load += np.bincount(operators, minlength=operator_count)
+            assigned_operators[contacts] = operators
+            assigned_ticks[contacts] = t
+            release_at = t + handle_ticks[contacts]
+            in_horizon = release_at < tick_count
+            release_at, operators = release_at[in_horizon], operators[in_horizon]
+            order = np.argsort(release_at, kind="stable")
+            release_ticks, starts = np.unique(release_at[order], return_index=True)
+            for release_tick, group in zip(release_ticks.tolist(), np.split(operators[order], starts[1:])):
+                if release_tick not in releases:
+                    releases[release_tick] = []
+                    heapq.heappush(release_heap, release_tick)
+                releases[release_tick].append(group)
+            pending = pending[~accepted]
+
+        # Contacts taken from a queue go back to its front, new arrivals to its end
+        queued = np.sort(np.concatenate(queued)) if queued else np.empty(0, dtype=np.int64)
+        queued_rows = contact_rows[queued]
+        for row in np.unique(queued_rows).tolist():
+            of_row = queued[queued_rows == row]
+            earlier = of_row < arrivals_start
+            if earlier.any():
+                queues[row].appendleft(of_row[earlier])
+            if not earlier.all():
+                queues[row].append(of_row[~earlier])
+            queue_sizes[row] += len(of_row)
+        np.maximum(peak_load, load, out=peak_load)
+        at_limit = active & (load >= limits)
+        first_saturated[at_limit & (first_saturated < 0)] = t
+
+        while release_heap and release_heap[0] <= t:
+            heapq.heappop(release_heap)
+        next_arrival = arrival_ticks[arrivals_end] if arrivals_end < contact_count else tick_count
+        next_t = min(next_arrival, release_heap[0] if release_heap else tick_count)
+        saturated_ticks += at_limit * (next_t - t)
+        t = next_t
+
+    assigned = assigned_operators >= 0
+    assigned_counts = np.bincount(assigned_operators[assigned], minlength=operator_count)
+    assigned_total = int(assigned.sum())
+    queued_on_arrival = ~assigned | (assigned_ticks > arrival_ticks)
+    waits = (assigned_ticks - arrival_ticks) * tick
+
+    stream_sources, source_positions = np.unique(stream.source_ids, return_inverse=True)
+    source_results = []
+    for i, source_id in enumerate(stream_sources):
+        of_source = source_positions == i
+        waited = of_source & assigned & queued_on_arrival
+        source_results.append(schemas.SimulationSourceResult(
+            source_id=int(source_id),
+            contacts=int(of_source.sum()),
+            queued=int((of_source & queued_on_arrival).sum()),
+            queued_at_end=int((of_source & ~assigned).sum()),
+            mean_queue_wait=float(waits[waited].mean()) if waited.any() else None
+        ))
+
+    return schemas.SimulationResult(
+        contacts=contact_count,
+        deactivations=deactivations,
+        duration=tick_count * tick,
+        tick=tick,
+        unassigned_rate=float(queued_on_arrival.mean()) if contact_count else 0.0,
+        queued_at_end=contact_count - assigned_total,
+        operators=[
+            schemas.SimulationOperatorResult(
+                operator_id=operator_id,
+                load_limit=int(limits[i]),
+                is_active=bool(active[i]),
+                assigned=int(assigned_counts[i]),
+                share=float(assigned_counts[i] / assigned_total) if assigned_total else 0.0,
+                peak_load=int(peak_load[i]),
+                final_load=int(load[i]),
+                saturated_seconds=float(saturated_ticks[i] * tick),
+                saturated_fraction=float(saturated_ticks[i] / tick_count) if tick_count else 0.0,
+                first_saturated_at=float(first_saturated[i] * tick) if first_saturated[i] >= 0 else None
+            )
+            for i, operator_id in enumerate(operator_ids)
+        ],
+        sources=source_results,
+        elapsed=time.perf_counter() - started
+    )
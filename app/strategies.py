@@ -0,0 +1,178 @@
+"""
+Operator selection strategies, chosen per source (sources.distribution_strategy).
+
+A strategy picks an operator from the compiled RoutingTable of its source.
+Callers pass `is_available(operator_id, load_limit)`, which rejects operators
+at their limit, and `load(operator_id)`, the operator's current load. Every
+routing table gets its own strategy instance, so stateful strategies keep
+per-source state that is reset whenever the table is rebuilt.
+"""
+import random
+import threading
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Type
+
+if TYPE_CHECKING:
+    from app.routing import RoutingTable
+
+# Random draws before falling back to a scan over available operators
+MAX_SELECTION_ATTEMPTS = 8
+
+DEFAULT_STRATEGY = "weighted_random"
+
+IsAvailable = Callable[[int, int], bool]
+Load = Callable[[int], int]
+
+
+def load_score(load: int, load_limit: int) -> float:
+    """Utilization (load / limit) after taking one more contact; lower is better"""
+    return (load + 1) / max(load_limit, 1)
+
+
+class DistributionStrategy(ABC):
+    """Base class of selection strategies"""
+    name = ""
+
+    def __init__(self, table: "RoutingTable"):
+        self.table = table
+
+    @abstractmethod
+    def select(self, is_available: IsAvailable, load: Load) -> Optional[int]:
+        """Id of the chosen operator, None if no operator is available"""
+
+    def _least_loaded(self, indexes: List[int], load: Load) -> Optional[int]:
+        """Operator id with the lowest load score among the given indexes; ties go to the higher weight"""
+        table = self.table
+        if not indexes:
+            return None
+        best = min(indexes, key=lambda i: (
+            load_score(load(table.operator_ids[i]), table.load_limits[i]),
+            -table.weights[i]
+        ))
+        return table.operator_ids[best]
+
+
+class WeightedRandomStrategy(DistributionStrategy):
+    """Probability of an operator = weight / sum of weights; loads are not read"""
+    name = "weighted_random"
+
+    def select(self, is_available: IsAvailable, load: Load) -> Optional[int]:
+        table = self.table
+        if not table.operator_ids:
+            return None
+
+        if table.total_weight > 0:
+            # O(log n) draws; only available operators are accepted
+            for _ in range(MAX_SELECTION_ATTEMPTS):
+                i = table.draw()
+                if is_available(table.operator_ids[i], table.load_limits[i]):
+                    return table.operator_ids[i]
+
+        # Most of the weight is at the limit: pick among available operators only
+        indexes = table.available_indexes(is_available)
+        if not indexes:
+            return None
+
+        total_weight = sum(table.weights[i] for i in indexes)
+        if total_weight == 0:
+            # If all weights are 0, return random operator
+            return table.operator_ids[random.choice(indexes)]
+
+        rand = random.uniform(0, total_weight)
+        cumulative = 0
+        for i in indexes:
+            cumulative += table.weights[i]
+            if rand <= cumulative:
+                return table.operator_ids[i]
+        return table.operator_ids[indexes[-1]]
+
+
+class SmoothWeightedRoundRobinStrategy(DistributionStrategy):
+    """
+    Deterministic weighted round-robin (nginx "smooth" variant): every pick adds
+    each available operator's weight to its counter, takes the highest counter
+    and subtracts the total weight from it. Shares match the weights exactly
+    over every window of sum(weights) picks, without bursts to one operator.
+    """
+    name = "smooth_round_robin"
+
+    def __init__(self, table: "RoutingTable"):
+        super().__init__(table)
+        self._lock = threading.Lock()
+        self._current = [0.0] * len(table)
+        # All-zero weights mean plain round-robin
+        self._weights = table.weights if table.total_weight > 0 else [1.0] * len(table)
+
+    def select(self, is_available: IsAvailable, load: Load) -> Optional[int]:
+        table = self.table
+        with self._lock:
+            best = None
+            total_weight = 0.0
+            for i, operator_id in enumerate(table.operator_ids):
+                if not is_available(operator_id, table.load_limits[i]):
+                    continue
+                self._current[i] += self._weights[i]
+                total_weight += self._weights[i]
+                if best is None or self._current[i] > self._current[best]:
+                    best = i
+            if best is None:
+                return None
+            self._current[best] -= total_weight
+            return table.operator_ids[best]
+
+
+class LeastLoadedStrategy(DistributionStrategy):
+    """
+    Operator with the lowest utilization (load / limit), the higher weight
+    winning ties. Keeps utilization even at the cost of weight shares and
+    reads every operator's load.
+    """
+    name = "least_loaded"
+
+    def select(self, is_available: IsAvailable, load: Load) -> Optional[int]:
+        return self._least_loaded(self.table.available_indexes(is_available), load)
+
+
+class PowerOfTwoChoicesStrategy(DistributionStrategy):
+    """
+    Draw two available operators by weight and take the one with the lower
+    utilization. Only the two candidates' loads are read, so a pick costs the
+    same for 5 or 5000 operators while still steering away from busy ones.
+    """
+    name = "power_of_two"
+
+    def select(self, is_available: IsAvailable, load: Load) -> Optional[int]:
+        table = self.table
+        if not table.operator_ids:
+            return None
+
+        candidates = []
+        for _ in range(MAX_SELECTION_ATTEMPTS):
+            i = table.draw()
+            if i not in candidates and is_available(table.operator_ids[i], table.load_limits[i]):
+                candidates.append(i)
+                if len(candidates) == 2:
+                    break
+
+        if not candidates:
+            # Most of the weight is at the limit
+            candidates = table.available_indexes(is_available)
+        return self._least_loaded(candidates, load)
+
+
+STRATEGIES: Dict[str, Type[DistributionStrategy]] = {
+    strategy.name: strategy
+    for strategy in (
+        WeightedRandomStrategy,
+        SmoothWeightedRoundRobinStrategy,
+        LeastLoadedStrategy,
+        PowerOfTwoChoicesStrategy
+    )
+}
+
+DISTRIBUTION_STRATEGY_PATTERN = "^(" + "|".join(STRATEGIES) + ")$"
+
+
+def create_strategy(name: Optional[str], table: "RoutingTable") -> DistributionStrategy:
+    """Strategy instance for a routing table; unknown names fall back to the default"""
+    return STRATEGIES.get(name or DEFAULT_STRATEGY, STRATEGIES[DEFAULT_STRATEGY])(table)
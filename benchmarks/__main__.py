@@ -0,0 +1,155 @@
+"""
+Benchmark suite for the Mini-CRM API.
+
+    python -m benchmarks run --contacts 100000 --requests 500 --output results.json
+    python -m benchmarks compare baseline.json results.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from benchmarks.common import git_commit
+
+
+def run(args) -> None:
+    directory = tempfile.mkdtemp(prefix="crm-benchmark-")
+    in_process_path = os.path.join(directory, "in_process.db")
+    uvicorn_path = os.path.join(directory, "uvicorn.db")
+
+    # The app builds its engine from settings on import
+    os.environ["CRM_DATABASE_URL"] = f"sqlite:///{in_process_path}"
+    from app.database import SessionLocal, engine, init_db
+    from benchmarks.seed import seed_database
+    from benchmarks.suite import build_scenario, check_distribution, run_in_process, run_uvicorn
+
+    try:
+        started = time.perf_counter()
+        init_db()
+        db = SessionLocal()
+        try:
+            config = seed_database(
+                db,
+                operators=args.operators,
+                sources=args.sources,
+                operators_per_source=args.operators_per_source,
+                leads=args.leads,
+                contacts=args.contacts,
+                active_ratio=args.active_ratio,
+                seed=args.seed
+            )
+        finally:
+            db.close()
+        engine.dispose()
+        shutil.copy(in_process_path, uvicorn_path)
+        print(f"Seeded {args.contacts} contacts in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+
+        scenario = build_scenario(
+            config, args.leads, args.requests, args.batch_size, args.stats_requests,
+            run_id=uuid.uuid4().hex[:8], seed=args.seed
+        )
+        results = {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "params": vars(args).copy(),
+            "distribution": check_distribution(config, args.distribution_samples, args.seed)
+        }
+        results["params"].pop("handler", None)
+
+        if args.mode in ("in-process", "both"):
+            results["in_process"] = run_in_process(scenario)
+            print_results("in-process", results["in_process"])
+        if args.mode in ("uvicorn", "both"):
+            results["uvicorn"] = run_uvicorn(scenario, f"sqlite:///{uvicorn_path}", args.port, args.workers)
+            print_results("uvicorn", results["uvicorn"])
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    worst = max(result["max_share_error"] for result in results["distribution"].values()) if config else 0
+    print(f"distribution: max share error {worst:.4f} over {args.distribution_samples} samples per source")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Results written to {args.output}")
+
+
+def print_results(mode: str, results: dict) -> None:
+    print(f"\n{mode}")
+    print(f"{'endpoint':<28}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'sql/req':>10}{'errors':>8}")
+    for name, result in results.items():
+        print(
+            f"{name:<28}{result['rps']:>10}{result['p50_ms']:>10}{result['p95_ms']:>10}"
+            f"{result['p99_ms']:>10}{result.get('sql_per_request', '-'):>10}{result['errors']:>8}"
+        )
+
+
+def compare(args) -> None:
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+
+    print(f"{baseline.get('commit')} -> {current.get('commit')}")
+    for mode in ("in_process", "uvicorn"):
+        if mode not in baseline or mode not in current:
+            continue
+        print(f"\n{mode}")
+        print(f"{'endpoint':<28}{'req/s':>20}{'p99 ms':>22}{'sql/req':>16}")
+        for name, result in current[mode].items():
+            old = baseline[mode].get(name)
+            if not old:
+                continue
+            print(
+                f"{name:<28}{_delta(old['rps'], result['rps']):>20}"
+                f"{_delta(old['p99_ms'], result['p99_ms']):>22}"
+                f"{_delta(old.get('sql_per_request'), result.get('sql_per_request')):>16}"
+            )
+
+
+def _delta(old, new) -> str:
+    if old is None or new is None:
+        return "-"
+    if not old:
+        return f"{old} -> {new}"
+    return f"{new} ({(new - old) / old * 100:+.1f}%)"
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Mini-CRM benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Seed a dataset and benchmark the endpoints")
+    run_parser.add_argument("--operators", type=int, default=50)
+    run_parser.add_argument("--sources", type=int, default=5)
+    run_parser.add_argument("--operators-per-source", type=int, default=20)
+    run_parser.add_argument("--leads", type=int, default=10000)
+    run_parser.add_argument("--contacts", type=int, default=50000)
+    run_parser.add_argument("--active-ratio", type=float, default=0.2)
+    run_parser.add_argument("--requests", type=int, default=300, help="Requests per endpoint")
+    run_parser.add_argument("--batch-size", type=int, default=100)
+    run_parser.add_argument("--stats-requests", type=int, default=20)
+    run_parser.add_argument("--distribution-samples", type=int, default=100000)
+    run_parser.add_argument("--mode", choices=("in-process", "uvicorn", "both"), default="both")
+    run_parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    run_parser.add_argument("--port", type=int, default=8765)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--output", help="Write results to a JSON file")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
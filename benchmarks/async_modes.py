@@ -0,0 +1,91 @@
+"""
+Compare POST /contacts/ throughput and latency in sync, async and group-commit modes.
+
+Starts uvicorn once per mode against a fresh SQLite file and fires
+concurrent requests:
+
+    python -m benchmarks.async_modes --requests 2000 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+import httpx
+from benchmarks.common import latency_summary, start_server, stop_server
+
+
+async def run_load(base_url: str, requests: int, concurrency: int, operators: int) -> dict:
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        source = (await client.post("/sources/", json={"name": "benchmark"})).json()
+        for i in range(operators):
+            operator = (await client.post(
+                "/operators/", json={"name": f"operator-{i}", "load_limit": requests}
+            )).json()
+            await client.post(
+                f"/sources/{source['id']}/operators",
+                json={"operator_id": operator["id"], "weight": i + 1}
+            )
+
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        errors = 0
+
+        async def send(i: int):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/contacts/", json={
+                    "source_id": source["id"],
+                    "lead_external_id": f"lead-{i}",
+                    "message": "benchmark"
+                })
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(send(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    return latency_summary(latencies, elapsed, errors)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--operators", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--group-window-ms", type=float, default=2, help="Group commit window")
+    parser.add_argument("--json", dest="json_path", help="Write results to a JSON file")
+    args = parser.parse_args(argv)
+
+    modes = {
+        "sync": {"CRM_DB_ASYNC": "false"},
+        "async": {"CRM_DB_ASYNC": "true"},
+        "group": {"CRM_CONTACT_GROUP_COMMIT": "true", "CRM_CONTACT_GROUP_COMMIT_WINDOW_MS": str(args.group_window_ms)}
+    }
+    results = {}
+    for mode, env in modes.items():
+        with tempfile.TemporaryDirectory() as directory:
+            server = start_server(args.port, {
+                **env,
+                "CRM_DATABASE_URL": f"sqlite:///{directory}/benchmark.db"
+            })
+            try:
+                results[mode] = asyncio.run(run_load(
+                    f"http://127.0.0.1:{args.port}", args.requests, args.concurrency, args.operators
+                ))
+            finally:
+                stop_server(server)
+        print(f"{mode:>5}: {results[mode]['rps']:>8} req/s  p50 {results[mode]['p50_ms']:>8} ms  "
+              f"p99 {results[mode]['p99_ms']:>8} ms  errors {results[mode]['errors']}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
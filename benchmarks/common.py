@@ -0,0 +1,72 @@
+import math
+import os
+import subprocess
+import sys
+import time
+from typing import List, Optional
+import httpx
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
+
+
+def latency_summary(
+    latencies: List[float],
+    elapsed: float,
+    errors: int = 0,
+    statements: Optional[List[int]] = None
+) -> dict:
+    """req/s, latency percentiles (ms) and SQL statements per request"""
+    summary = {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2)
+    }
+    if statements:
+        summary["sql_per_request"] = round(sum(statements) / len(statements), 2)
+        summary["sql_max"] = max(statements)
+    return summary
+
+
+def start_server(port: int, env: dict, workers: int = 1) -> subprocess.Popen:
+    """Start uvicorn in a subprocess and wait until it answers"""
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--port", str(port), "--workers", str(workers), "--log-level", "warning"
+        ],
+        cwd=PROJECT_ROOT,
+        env={**os.environ, **env}
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError("uvicorn didn't start")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    process.wait()
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,110 @@
+"""
+Seed a fresh database with a synthetic CRM dataset.
+
+Rows are written with bulk INSERTs, so large datasets (hundreds of
+operators, millions of contacts) take seconds rather than hours.
+"""
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app import models
+from app.identity import lead_identities
+from app.load_tracker import load_tracker
+from app.rollups import rebuild_rollups
+
+CHUNK_SIZE = 5000
+
+
+def _bulk_insert(db: Session, model, rows) -> None:
+    for i in range(0, len(rows), CHUNK_SIZE):
+        db.execute(insert(model), rows[i:i + CHUNK_SIZE])
+
+
+def seed_database(
+    db: Session,
+    operators: int = 50,
+    sources: int = 5,
+    operators_per_source: int = 20,
+    leads: int = 10000,
+    contacts: int = 50000,
+    active_ratio: float = 0.2,
+    load_limit: int = 0,
+    days: int = 30,
+    seed: int = 0
+) -> dict:
+    """
+    Fill an empty database and return the generated routing config:
+    {source_id: {operator_id: weight}}.
+    load_limit=0 picks a limit that leaves room for new contacts.
+    """
+    if db.query(models.Operator.id).first() is not None:
+        raise ValueError("Benchmark database must be empty")
+
+    rng = random.Random(seed)
+    if not load_limit:
+        load_limit = max(10, int(2 * contacts * active_ratio / max(operators, 1)) + 1000)
+
+    _bulk_insert(db, models.Operator, [
+        {"id": i, "name": f"operator-{i}", "is_active": True, "load_limit": load_limit, "active_load": 0}
+        for i in range(1, operators + 1)
+    ])
+    _bulk_insert(db, models.Source, [
+        {"id": i, "name": f"source-{i}", "description": "benchmark"}
+        for i in range(1, sources + 1)
+    ])
+
+    config = {}
+    weight_rows = []
+    for source_id in range(1, sources + 1):
+        operator_ids = rng.sample(range(1, operators + 1), min(operators_per_source, operators))
+        config[source_id] = {operator_id: float(rng.randint(1, 100)) for operator_id in operator_ids}
+        weight_rows.extend(
+            {"source_id": source_id, "operator_id": operator_id, "weight": weight}
+            for operator_id, weight in config[source_id].items()
+        )
+    _bulk_insert(db, models.SourceOperatorWeight, weight_rows)
+
+    lead_rows = []
+    identity_rows = []
+    for i in range(1, leads + 1):
+        lead = {
+            "id": i,
+            "external_id": f"seed-{i}",
+            "phone": f"+7900{i:07d}",
+            "email": f"lead{i}@example.com",
+            "name": f"Lead {i}"
+        }
+        lead_rows.append(lead)
+        identity_rows.extend(
+            {"kind": kind, "value": value, "lead_id": i}
+            for kind, value in lead_identities(lead["external_id"], lead["phone"], lead["email"])
+        )
+    _bulk_insert(db, models.Lead, lead_rows)
+    _bulk_insert(db, models.LeadIdentity, identity_rows)
+
+    now = datetime.utcnow()
+    routing = {
+        source_id: (list(weights), list(weights.values()))
+        for source_id, weights in config.items()
+    }
+    contact_rows = []
+    for i in range(1, contacts + 1):
+        source_id = rng.randint(1, sources)
+        operator_ids, weights = routing[source_id]
+        contact_rows.append({
+            "id": i,
+            "lead_id": rng.randint(1, leads),
+            "source_id": source_id,
+            "operator_id": rng.choices(operator_ids, weights)[0] if operator_ids else None,
+            "message": "seed",
+            "is_active": rng.random() < active_ratio,
+            "created_at": now - timedelta(seconds=rng.random() * days * 86400)
+        })
+    _bulk_insert(db, models.Contact, contact_rows)
+    db.commit()
+
+    # Fill operators.active_load and stats rollups from the seeded contacts
+    load_tracker.reconcile(db)
+    rebuild_rollups(db)
+    return config
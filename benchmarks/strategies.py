@@ -0,0 +1,124 @@
+"""
+Compare distribution strategies on balance quality and selection throughput.
+
+Replays the same in-memory workload against a routing table with every
+strategy: contacts arrive one by one and active contacts are closed at
+random, so the pool settles at the target utilization of total capacity.
+No database is needed:
+
+    python -m benchmarks.strategies --operators 200 --steps 200000
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from collections import Counter
+from typing import Dict, List
+from app.routing import RoutingTable
+from app.strategies import STRATEGIES
+
+
+def build_operators(operators: int, seed: int) -> List[tuple]:
+    """(operator_id, weight, load_limit, is_active) rows with uneven weights and limits"""
+    rng = random.Random(seed)
+    return [
+        (operator_id, float(rng.choice((1, 2, 5, 10))), rng.choice((5, 10, 20, 50)), True)
+        for operator_id in range(1, operators + 1)
+    ]
+
+
+def run_strategy(strategy: str, rows: List[tuple], steps: int, utilization: float, seed: int) -> dict:
+    """
+    Simulate `steps` arrivals. Every active contact is closed with the same
+    probability per step, chosen so that the number of active contacts
+    settles at `utilization` of total capacity. Utilization spread is
+    sampled every 100 steps.
+    """
+    random.seed(seed)
+    rng = random.Random(seed)
+    table = RoutingTable(1, 0, rows, strategy)
+    limits = {operator_id: load_limit for operator_id, _, load_limit, _ in rows}
+    close_probability = 1 / (utilization * sum(limits.values()))
+    loads: Dict[int, int] = {operator_id: 0 for operator_id in limits}
+    active: List[int] = []
+    assigned = Counter()
+    load_reads = 0
+    unassigned = 0
+    spreads = []
+
+    def is_available(operator_id: int, load_limit: int) -> bool:
+        return loads[operator_id] < load_limit
+
+    def load(operator_id: int) -> int:
+        nonlocal load_reads
+        load_reads += 1
+        return loads[operator_id]
+
+    selection_time = 0.0
+    for step in range(steps):
+        started = time.perf_counter()
+        operator_id = table.select(is_available, load)
+        selection_time += time.perf_counter() - started
+        if operator_id is None:
+            unassigned += 1
+        else:
+            loads[operator_id] += 1
+            assigned[operator_id] += 1
+            active.append(operator_id)
+
+        if active and rng.random() < len(active) * close_probability:
+            # Close a random active contact
+            i = rng.randrange(len(active))
+            active[i], active[-1] = active[-1], active[i]
+            loads[active.pop()] -= 1
+
+        if step % 100 == 0:
+            spreads.append(statistics.pstdev(loads[i] / limits[i] for i in limits))
+
+    total_weight = sum(weight for _, weight, _, _ in rows)
+    total_assigned = sum(assigned.values()) or 1
+    return {
+        "selections_per_second": round(steps / selection_time) if selection_time else 0,
+        "load_reads_per_selection": round(load_reads / steps, 2),
+        "unassigned": unassigned,
+        # Mean standard deviation of load / limit across operators (0 = evenly utilized)
+        "utilization_spread": round(statistics.fmean(spreads), 4),
+        "max_utilization": round(max(loads[i] / limits[i] for i in limits), 3),
+        # Largest deviation of an operator's share of contacts from its weight share
+        "max_share_error": round(max(
+            abs(assigned[operator_id] / total_assigned - weight / total_weight)
+            for operator_id, weight, _, _ in rows
+        ), 5)
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--operators", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=200000)
+    parser.add_argument(
+        "--utilization", type=float, default=0.8, help="Steady-state share of total capacity in use"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="Write results to a JSON file")
+    args = parser.parse_args(argv)
+
+    rows = build_operators(args.operators, args.seed)
+    results = {}
+    print(f"{'strategy':<20}{'sel/s':>12}{'loads/sel':>11}{'spread':>9}{'max util':>10}{'share err':>11}{'unassigned':>12}")
+    for name in STRATEGIES:
+        result = results[name] = run_strategy(name, rows, args.steps, args.utilization, args.seed)
+        print(
+            f"{name:<20}{result['selections_per_second']:>12}{result['load_reads_per_selection']:>11}"
+            f"{result['utilization_spread']:>9}{result['max_utilization']:>10}"
+            f"{result['max_share_error']:>11}{result['unassigned']:>12}"
+        )
+
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
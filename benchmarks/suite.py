@@ -0,0 +1,154 @@
+"""
+Ingestion and stats endpoint benchmarks.
+
+The same request scenario is replayed in-process (TestClient) and through
+a real uvicorn server, with SQL statements counted per request.
+"""
+import random
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+import httpx
+from benchmarks.common import latency_summary, start_server, stop_server
+
+# (method, url, json body)
+Call = Tuple[str, str, Optional[dict]]
+# send(method, url, body) -> (succeeded, SQL statements or None)
+Sender = Callable[[str, str, Optional[dict]], Tuple[bool, Optional[int]]]
+
+
+def build_scenario(
+    config: Dict[int, Dict[int, float]],
+    leads: int,
+    requests: int,
+    batch_size: int,
+    stats_requests: int,
+    run_id: str,
+    seed: int = 0
+) -> List[Tuple[str, List[Call]]]:
+    """Requests per endpoint; half of the contacts come from already known leads"""
+    rng = random.Random(seed)
+    source_ids = list(config)
+    operator_ids = sorted({operator_id for weights in config.values() for operator_id in weights})
+
+    def contact(i: int) -> dict:
+        if leads and i % 2:
+            external_id = f"seed-{rng.randint(1, leads)}"
+        else:
+            external_id = f"{run_id}-{i}"
+        return {"source_id": rng.choice(source_ids), "lead_external_id": external_id, "message": "benchmark"}
+
+    batches = max(requests // batch_size, 1)
+    return [
+        ("POST /contacts/", [
+            ("POST", "/contacts/", contact(i)) for i in range(requests)
+        ]),
+        ("POST /contacts/batch", [
+            ("POST", "/contacts/batch", {
+                "contacts": [contact(requests + b * batch_size + i) for i in range(batch_size)]
+            })
+            for b in range(batches)
+        ]),
+        ("GET /operators/{id}/load", [
+            ("GET", f"/operators/{rng.choice(operator_ids)}/load", None) for _ in range(requests)
+        ]),
+        ("GET /stats/distribution", [
+            ("GET", "/stats/distribution", None) for _ in range(stats_requests)
+        ]),
+        ("GET /stats/leads-summary", [
+            ("GET", "/stats/leads-summary", None) for _ in range(stats_requests)
+        ]),
+    ]
+
+
+def run_scenario(send: Sender, scenario: List[Tuple[str, List[Call]]]) -> dict:
+    results = {}
+    for name, calls in scenario:
+        latencies = []
+        statements = []
+        errors = 0
+        started = time.perf_counter()
+        for method, url, body in calls:
+            request_started = time.perf_counter()
+            succeeded, count = send(method, url, body)
+            latencies.append(time.perf_counter() - request_started)
+            if not succeeded:
+                errors += 1
+            if count is not None:
+                statements.append(count)
+        results[name] = latency_summary(latencies, time.perf_counter() - started, errors, statements)
+    return results
+
+
+def run_in_process(scenario: List[Tuple[str, List[Call]]]) -> dict:
+    """Drive the app with TestClient; the database is taken from CRM_DATABASE_URL"""
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from app.main import app
+    from app.database import engine
+
+    statements = [0]
+
+    def count_statement(*args):
+        statements[0] += 1
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        with TestClient(app) as client:
+            def send(method, url, body):
+                statements[0] = 0
+                response = client.request(method, url, json=body)
+                return response.status_code < 400, statements[0]
+
+            return run_scenario(send, scenario)
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+
+def run_uvicorn(scenario: List[Tuple[str, List[Call]]], database_url: str, port: int, workers: int = 1) -> dict:
+    """Drive a uvicorn server over HTTP; SQL statements come from the X-DB-Queries header"""
+    server = start_server(port, {"CRM_DATABASE_URL": database_url}, workers=workers)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+            def send(method, url, body):
+                response = client.request(method, url, json=body)
+                queries = response.headers.get("x-db-queries")
+                return response.status_code < 400, int(queries) if queries is not None else None
+
+            return run_scenario(send, scenario)
+    finally:
+        stop_server(server)
+
+
+def check_distribution(config: Dict[int, Dict[int, float]], samples: int, seed: int = 0) -> dict:
+    """
+    Compare shares produced by weighted selection with the configured weights.
+    Selection uses the module-level RNG, seeded here for reproducibility.
+    """
+    from app.routing import RoutingTable
+
+    random.seed(seed)
+    results = {}
+    for source_id, weights in config.items():
+        table = RoutingTable(
+            source_id, 0, [(operator_id, weight, samples, True) for operator_id, weight in weights.items()]
+        )
+        counts = Counter(table.select(lambda operator_id, load_limit: True) for _ in range(samples))
+        total_weight = sum(weights.values())
+
+        max_share_error = 0.0
+        chi_square = 0.0
+        for operator_id, weight in weights.items():
+            expected = samples * weight / total_weight
+            observed = counts.get(operator_id, 0)
+            max_share_error = max(max_share_error, abs(observed - expected) / samples)
+            if expected:
+                chi_square += (observed - expected) ** 2 / expected
+
+        results[source_id] = {
+            "samples": samples,
+            "max_share_error": round(max_share_error, 5),
+            "chi_square": round(chi_square, 2),
+            "degrees_of_freedom": max(len(weights) - 1, 0)
+        }
+    return results
@@ -0,0 +1,85 @@
+"""
+Shared fixtures. The app runs against a temporary SQLite file: CRM_ settings
+are set before app modules are imported. Every test starts with empty tables
+and fresh in-process caches.
+"""
+import os
+import tempfile
+
+_database_dir = tempfile.mkdtemp(prefix="crm-tests-")
+os.environ["CRM_DATABASE_URL"] = f"sqlite:///{_database_dir}/crm.db"
+os.environ["CRM_CONTACT_EXPIRY_INTERVAL"] = "0"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.database import Base, SessionLocal, engine, init_db
+from app.load_tracker import load_tracker
+from app.main import app
+from app.response_cache import response_cache
+from app.routing import routing_tables
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    init_db()
+    yield
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def clean_state(database):
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+    load_tracker.reset()
+    routing_tables.clear()
+    response_cache.clear()
+    yield
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def statements():
+    """SQL statements executed while the test runs (before_cursor_execute)"""
+    executed = []
+
+    def record(connection, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def create_operator(client, name="Operator", load_limit=10, is_active=True) -> dict:
+    response = client.post("/operators/", json={"name": name, "load_limit": load_limit, "is_active": is_active})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def create_source(client, name="Source", weights=()) -> dict:
+    """Source with (operator_id, weight) pairs"""
+    response = client.post("/sources/", json={"name": name})
+    assert response.status_code == 200, response.text
+    source = response.json()
+    for operator_id, weight in weights:
+        response = client.post(
+            f"/sources/{source['id']}/operators", json={"operator_id": operator_id, "weight": weight}
+        )
+        assert response.status_code == 200, response.text
+    return source
@@ -0,0 +1,148 @@
+"""
+Ingestion in async mode. CRM_DB_ASYNC is read when app modules are imported,
+so the app runs in a subprocess with its own database.
+"""
+import json
+import os
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+LOAD_LIMIT = 3
+
+SCRIPT = """
+import json
+from fastapi.testclient import TestClient
+from app.main import app
+
+with TestClient(app) as client:
+    operator = client.post("/operators/", json={"name": "Operator", "load_limit": 3}).json()
+    source = client.post("/sources/", json={"name": "Source"}).json()
+    client.post(f"/sources/{source['id']}/operators", json={"operator_id": operator["id"], "weight": 1})
+    single = client.post("/contacts/", json={"source_id": source["id"], "lead_phone": "+7 900 123-45-67"})
+    items = [{"source_id": source["id"], "lead_external_id": f"lead-{i}"} for i in range(3)]
+    items.append({"source_id": source["id"], "lead_phone": "8 (900) 123-45-67"})
+    items.append({"source_id": 999999, "lead_external_id": "unknown-source"})
+    batch = client.post("/contacts/batch", json={"contacts": items})
+    endpoints = {
+        route.path: route.endpoint.__module__ for route in app.routes
+        if route.path in ("/contacts/", "/contacts/batch") and "POST" in route.methods
+    }
+    load = client.get("/operators/load").json()
+
+print(json.dumps({
+    "operator_id": operator["id"],
+    "single": [single.status_code, single.json()],
+    "batch": [batch.status_code, batch.json()],
+    "endpoints": endpoints,
+    "load": load
+}))
+"""
+
+CONCURRENT_SCRIPT = """
+import json
+from concurrent.futures import ThreadPoolExecutor
+from fastapi.testclient import TestClient
+from app.main import app
+
+with TestClient(app) as client:
+    operators = [
+        client.post("/operators/", json={"name": f"Operator {i}", "load_limit": %(load_limit)d}).json()
+        for i in range(2)
+    ]
+    source = client.post("/sources/", json={"name": "Source"}).json()
+    for operator in operators:
+        client.post(f"/sources/{source['id']}/operators", json={"operator_id": operator["id"], "weight": 1})
+
+    def create(i):
+        # Every fourth request repeats the phone of a concurrent one
+        phone = f"+7 900 000-00-{i // 4:02d}"
+        response = client.post("/contacts/", json={"source_id": source["id"], "lead_phone": phone})
+        return [response.status_code, response.json()]
+
+    def create_batch(i):
+        items = [{"source_id": source["id"], "lead_external_id": f"batch-{i}-{j}"} for j in range(3)]
+        response = client.post("/contacts/batch", json={"contacts": items})
+        return [response.status_code, response.json()]
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        singles = pool.map(create, range(40))
+        batches = pool.map(create_batch, range(10))
+        singles, batches = list(singles), list(batches)
+    load = client.get("/operators/load").json()
+
+print(json.dumps({
+    "operator_ids": [operator["id"] for operator in operators],
+    "singles": singles,
+    "batches": batches,
+    "load": load
+}))
+""" % {"load_limit": LOAD_LIMIT}
+
+
+def _run_async_app(tmp_path, script: str) -> dict:
+    """Run the script with the app in async mode; returns the JSON it prints last"""
+    env = dict(
+        os.environ,
+        CRM_DATABASE_URL=f"sqlite:///{tmp_path}/crm.db",
+        CRM_DB_ASYNC="true",
+        CRM_CONTACT_EXPIRY_INTERVAL="0"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=Path(__file__).resolve().parent.parent,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60
+    )
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_async_ingestion(tmp_path):
+    result = _run_async_app(tmp_path, SCRIPT)
+    operator_id = result["operator_id"]
+
+    assert set(result["endpoints"].values()) == {"app.routers.contacts_async"}
+    status, contact = result["single"]
+    assert status == 200
+    assert contact["operator_id"] == operator_id
+    assert contact["lead"]["phone"] == "+7 900 123-45-67"
+
+    status, batch = result["batch"]
+    assert status == 200
+    assert (batch["created"], batch["failed"]) == (4, 1)
+    created = [item for item in batch["results"] if not item["error"]]
+    # Load limit 3: two more contacts get the operator, the rest wait in the backlog
+    assert [item["operator_id"] for item in created] == [operator_id, operator_id, None, None]
+    # The phone written differently resolves to the lead of the single contact
+    assert created[3]["lead_id"] == contact["lead_id"]
+    assert [operator["current_load"] for operator in result["load"]] == [3]
+
+
+def test_concurrent_async_ingestion(tmp_path):
+    result = _run_async_app(tmp_path, CONCURRENT_SCRIPT)
+    operator_ids = result["operator_ids"]
+
+    assigned = Counter()
+    leads = {}
+    for i, (status, contact) in enumerate(result["singles"]):
+        assert status == 200, contact
+        assigned[contact["operator_id"]] += 1
+        leads.setdefault(i // 4, set()).add(contact["lead_id"])
+    # Concurrent requests with the same phone resolve to one lead
+    assert all(len(lead_ids) == 1 for lead_ids in leads.values())
+    assert len({lead_id for lead_ids in leads.values() for lead_id in lead_ids}) == 10
+
+    for status, batch in result["batches"]:
+        assert status == 200, batch
+        assert (batch["created"], batch["failed"]) == (3, 0)
+        for item in batch["results"]:
+            assigned[item["operator_id"]] += 1
+
+    # Sessions of concurrent requests never take an operator beyond its limit
+    assert assigned.pop(None) == 40 + 30 - 2 * LOAD_LIMIT
+    assert assigned == {operator_id: LOAD_LIMIT for operator_id in operator_ids}
+    assert [operator["current_load"] for operator in result["load"]] == [LOAD_LIMIT, LOAD_LIMIT]
@@ -0,0 +1,70 @@
+import pytest
+from tests.conftest import create_operator, create_source
+
+
+def _add_contacts(client, count: int, lead_external_id=None) -> None:
+    """Contacts spread over new sources, operators and leads"""
+    for i in range(count):
+        operator = create_operator(client, name=f"Operator {count}-{i}")
+        source = create_source(client, name=f"Source {count}-{i}", weights=[(operator["id"], 1)])
+        response = client.post("/contacts/", json={
+            "source_id": source["id"],
+            "lead_external_id": lead_external_id or f"lead-{count}-{i}"
+        })
+        assert response.status_code == 200, response.text
+
+
+def _page_statements(client, statements, url: str, **params) -> int:
+    statements.clear()
+    response = client.get(url, params=params)
+    assert response.status_code == 200, response.text
+    return len(statements)
+
+
+@pytest.mark.parametrize("view", ["full", "slim"])
+def test_contact_page_query_count_is_constant(client, statements, view):
+    _add_contacts(client, 2)
+    small = _page_statements(client, statements, "/contacts/", view=view)
+
+    _add_contacts(client, 30)
+    large = _page_statements(client, statements, "/contacts/", view=view, limit=50)
+    filtered = _page_statements(client, statements, "/contacts/", view=view, is_active=True, limit=10)
+
+    assert small == large == filtered
+    assert large == (1 if view == "slim" else 4)
+
+
+@pytest.mark.parametrize("view", ["full", "slim"])
+def test_lead_contacts_query_count_is_constant(client, statements, view):
+    _add_contacts(client, 2, lead_external_id="lead")
+    lead_id = client.get("/contacts/").json()[0]["lead_id"]
+    small = _page_statements(client, statements, f"/leads/{lead_id}/contacts", view=view)
+
+    _add_contacts(client, 30, lead_external_id="lead")
+    large = _page_statements(client, statements, f"/leads/{lead_id}/contacts", view=view)
+
+    assert small == large
+    assert len(client.get(f"/leads/{lead_id}/contacts", params={"view": view}).json()) == 32
+
+
+def test_contact_views(client):
+    _add_contacts(client, 1)
+
+    full = client.get("/contacts/").json()[0]
+    slim = client.get("/contacts/", params={"view": "slim"}).json()[0]
+
+    assert full["lead"]["external_id"] == "lead-1-0"
+    assert full["source"]["name"] == "Source 1-0"
+    assert full["operator"]["name"] == "Operator 1-0"
+    assert slim == {key: full[key] for key in slim}
+    assert set(slim) == {"id", "lead_id", "source_id", "operator_id", "is_active", "created_at"}
+
+
+@pytest.mark.parametrize("path", ["/contacts/", "/leads/{lead_id}/contacts"])
+def test_openapi_documents_both_views(client, path):
+    schema = client.get("/openapi.json").json()["paths"][path]["get"]["responses"]["200"]
+    items = schema["content"]["application/json"]["schema"]["anyOf"]
+
+    assert {item["items"]["$ref"].rsplit("/", 1)[1] for item in items} == {
+        "ContactResponse", "ContactSlimResponse"
+    }
@@ -0,0 +1,50 @@
+from app import models
+from tests.conftest import create_operator, create_source
+
+
+def _inserts(statements, table: str) -> int:
+    return sum(statement.startswith(f"INSERT INTO {table} ") for statement in statements)
+
+
+def test_batch_inserts_leads_and_contacts_in_bulk(client, db, statements):
+    operators = [create_operator(client, name=f"Operator {i}", load_limit=100) for i in range(2)]
+    source = create_source(client, weights=[(operator["id"], 1) for operator in operators])
+    items = [
+        {"source_id": source["id"], "lead_external_id": f"lead-{i}", "lead_email": f"lead{i}@example.com"}
+        for i in range(100)
+    ]
+
+    statements.clear()
+    response = client.post("/contacts/batch", json={"contacts": items})
+    assert response.status_code == 200, response.text
+
+    assert _inserts(statements, "leads") == 1
+    assert _inserts(statements, "contacts") == 1
+    assert _inserts(statements, "lead_identities") == 1
+    assert len(statements) < 20
+
+    results = response.json()["results"]
+    assert [result["index"] for result in results] == list(range(100))
+    contacts = {contact.id: contact for contact in db.query(models.Contact)}
+    for item, result in zip(items, results):
+        contact = contacts[result["contact_id"]]
+        assert contact.lead_id == result["lead_id"]
+        assert contact.operator_id == result["operator_id"]
+        assert db.get(models.Lead, result["lead_id"]).external_id == item["lead_external_id"]
+
+
+def test_batch_reuses_leads_within_and_across_batches(client, db):
+    source = create_source(client)
+    items = [
+        {"source_id": source["id"], "lead_phone": "8 900 123-45-67"},
+        {"source_id": source["id"], "lead_phone": "+7 (900) 123-45-67"},
+        {"source_id": source["id"], "lead_email": "new@example.com"}
+    ]
+    first = client.post("/contacts/batch", json={"contacts": items}).json()["results"]
+    second = client.post("/contacts/batch", json={"contacts": items}).json()["results"]
+
+    assert first[0]["lead_id"] == first[1]["lead_id"] != first[2]["lead_id"]
+    assert [result["lead_id"] for result in first] == [result["lead_id"] for result in second]
+    assert db.query(models.Lead).count() == 2
+    # Unassigned contacts wait in the backlog
+    assert db.query(models.BacklogEntry).count() == 6
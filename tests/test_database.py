@@ -0,0 +1,44 @@
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import create_engine, event, text
+from app import database
+from app.config import Settings
+from app.database import engine
+
+
+def test_sqlite_settings_are_validated(monkeypatch):
+    monkeypatch.setenv("CRM_SQLITE_JOURNAL_MODE", "delete")
+    monkeypatch.setenv("CRM_SQLITE_SYNCHRONOUS", "full")
+    monkeypatch.setenv("CRM_SQLITE_BUSY_TIMEOUT", "1000")
+
+    settings = Settings()
+
+    assert (settings.sqlite_journal_mode, settings.sqlite_synchronous) == ("DELETE", "FULL")
+    assert settings.sqlite_busy_timeout == 1000
+    with pytest.raises(ValidationError):
+        Settings(sqlite_journal_mode="WAL; DROP TABLE leads")
+    with pytest.raises(ValidationError):
+        Settings(sqlite_synchronous="sometimes")
+    with pytest.raises(ValidationError):
+        Settings(sqlite_cache_size="64MB")
+
+
+def test_pragmas_apply_to_new_connections(tmp_path, monkeypatch):
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar_one() == "wal"
+
+    monkeypatch.setattr(database, "settings", Settings(
+        sqlite_journal_mode="TRUNCATE",
+        sqlite_synchronous="FULL",
+        sqlite_busy_timeout=1234
+    ))
+    other_engine = create_engine(f"sqlite:///{tmp_path}/crm.db")
+    event.listen(other_engine, "connect", database._set_sqlite_pragmas)
+    try:
+        with other_engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar_one() == "truncate"
+            # 2 = FULL
+            assert connection.execute(text("PRAGMA synchronous")).scalar_one() == 2
+            assert connection.execute(text("PRAGMA busy_timeout")).scalar_one() == 1234
+    finally:
+        other_engine.dispose()
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from app import models
+from app.database import SessionLocal
+from app.load_tracker import load_tracker
+from app.services import ContactService
+from tests.conftest import create_operator, create_source
+
+
+def _create_contacts(client, source, count, prefix="lead"):
+    return [
+        client.post("/contacts/", json={"source_id": source["id"], "lead_external_id": f"{prefix}-{i}"}).json()
+        for i in range(count)
+    ]
+
+
+def _active_load(db, operator_id):
+    db.expire_all()
+    return db.get(models.Operator, operator_id).active_load
+
+
+def test_deactivate_by_ids_releases_load_and_drains_backlog(client, db):
+    operator = create_operator(client, load_limit=2)
+    source = create_source(client, weights=[(operator["id"], 1)])
+    contacts = _create_contacts(client, source, 4)
+    assert [contact["operator_id"] for contact in contacts] == [operator["id"]] * 2 + [None] * 2
+
+    response = client.post("/contacts/deactivate", json={"contact_ids": [contacts[0]["id"], contacts[2]["id"]]})
+
+    assert response.json() == {"deactivated": 2}
+    # The freed place went to the oldest queued contact that is still active
+    assert db.get(models.Contact, contacts[3]["id"]).operator_id == operator["id"]
+    assert db.query(models.BacklogEntry).count() == 0
+    assert _active_load(db, operator["id"]) == load_tracker.get(operator["id"]) == 2
+
+
+def test_deactivate_by_filters(client, db):
+    operators = [create_operator(client, name=f"Operator {i}") for i in range(2)]
+    sources = [
+        create_source(client, name=f"Source {i}", weights=[(operator["id"], 1)])
+        for i, operator in enumerate(operators)
+    ]
+    for i, source in enumerate(sources):
+        _create_contacts(client, source, 3, prefix=f"source-{i}")
+
+    response = client.post("/contacts/deactivate", json={"source_id": sources[0]["id"]})
+
+    assert response.json() == {"deactivated": 3}
+    assert _active_load(db, operators[0]["id"]) == load_tracker.get(operators[0]["id"]) == 0
+    assert _active_load(db, operators[1]["id"]) == 3
+    # Criteria are combined; nothing is left to deactivate
+    response = client.post(
+        "/contacts/deactivate", json={"source_id": sources[0]["id"], "operator_id": operators[0]["id"]}
+    )
+    assert response.json() == {"deactivated": 0}
+    assert client.post("/contacts/deactivate", json={}).status_code == 400
+
+
+def test_short_batch_does_not_stop_deactivation(client, db, monkeypatch):
+    operator = create_operator(client)
+    source = create_source(client, weights=[(operator["id"], 1)])
+    contacts = _create_contacts(client, source, 7)
+    deactivate_where = ContactService._deactivate_where
+    calls = []
+
+    def concurrent_deactivation(session, condition):
+        if calls:
+            return deactivate_where(session, condition)
+        # PostgreSQL: another transaction deactivates the first contact of the
+        # batch after the batch was selected, so this UPDATE skips it
+        calls.append(condition)
+        result = deactivate_where(session, condition & (models.Contact.id != contacts[0]["id"]))
+        other = SessionLocal()
+        try:
+            other.execute(update(models.Contact).where(
+                models.Contact.id == contacts[0]["id"]
+            ).values(is_active=False))
+            other.commit()
+        finally:
+            other.close()
+        return result
+
+    monkeypatch.setattr(ContactService, "_deactivate_where", concurrent_deactivation)
+    deactivated = ContactService.deactivate_contacts(
+        db, conditions=[models.Contact.source_id == source["id"]], batch_size=3
+    )
+
+    assert deactivated == 6
+    assert db.query(models.Contact).filter(models.Contact.is_active == True).count() == 0
+
+
+def test_expire_contacts(client, db):
+    operator = create_operator(client, load_limit=2)
+    source = create_source(client, weights=[(operator["id"], 1)])
+    other_source = create_source(client, name="No TTL", weights=[(operator["id"], 1)])
+    client.patch(f"/sources/{source['id']}", json={"contact_ttl_seconds": 3600})
+    expired = _create_contacts(client, source, 2)
+    kept = _create_contacts(client, other_source, 1, prefix="kept")[0]
+    assert kept["operator_id"] is None
+    db.execute(update(models.Contact).where(
+        models.Contact.id.in_([contact["id"] for contact in expired])
+    ).values(created_at=datetime.utcnow() - timedelta(hours=2)))
+    db.execute(update(models.Contact).where(
+        models.Contact.id == kept["id"]
+    ).values(created_at=datetime.utcnow() - timedelta(days=30)))
+    db.commit()
+
+    assert ContactService.expire_contacts(db) == {source["id"]: 2}
+
+    assert db.query(models.Contact).filter(models.Contact.is_active == True).all() == [
+        db.get(models.Contact, kept["id"])
+    ]
+    # Released load went to the queued contact of the other source
+    assert db.get(models.Contact, kept["id"]).operator_id == operator["id"]
+    assert _active_load(db, operator["id"]) == load_tracker.get(operator["id"]) == 1
+    deactivated = db.query(models.ContactRollup.deactivated).filter(
+        models.ContactRollup.granularity == "day", models.ContactRollup.source_id == source["id"]
+    ).scalar()
+    assert deactivated == 2
+    assert ContactService.expire_contacts(db) == {}
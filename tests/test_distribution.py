@@ -0,0 +1,139 @@
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import func, update
+from app import models
+from app.database import SessionLocal
+from app.load_tracker import load_tracker
+from tests.conftest import create_operator, create_source
+
+LOAD_LIMIT = 3
+
+
+def _loads(db):
+    """operator_id -> (load_limit, active_load, active contacts)"""
+    active = dict(db.query(models.Contact.operator_id, func.count(models.Contact.id)).filter(
+        models.Contact.is_active == True,
+        models.Contact.operator_id.isnot(None)
+    ).group_by(models.Contact.operator_id).all())
+    return {
+        operator_id: (load_limit, active_load, active.get(operator_id, 0))
+        for operator_id, load_limit, active_load in db.query(
+            models.Operator.id, models.Operator.load_limit, models.Operator.active_load
+        )
+    }
+
+
+def _over_limit(loads):
+    return {
+        operator_id: load for operator_id, load in loads.items()
+        if load[1] > load[0] or load[2] > load[0]
+    }
+
+
+def test_parallel_contacts_never_exceed_load_limit(client, db):
+    operators = [create_operator(client, name=f"Operator {i}", load_limit=LOAD_LIMIT) for i in range(2)]
+    source = create_source(client, weights=[(operator["id"], 1) for operator in operators])
+
+    # Sample the limits from another connection while requests run
+    violations = []
+    done = threading.Event()
+
+    def watch():
+        session = SessionLocal()
+        try:
+            while not done.is_set():
+                violations.extend(_over_limit(_loads(session)).items())
+                session.rollback()
+        finally:
+            session.close()
+
+    def create(i: int):
+        response = client.post("/contacts/", json={"source_id": source["id"], "lead_external_id": f"lead-{i}"})
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    def create_batch(i: int):
+        items = [{"source_id": source["id"], "lead_external_id": f"batch-{i}-{j}"} for j in range(3)]
+        response = client.post("/contacts/batch", json={"contacts": items})
+        assert response.status_code == 200, response.text
+        return response.json()["results"]
+
+    watcher = threading.Thread(target=watch)
+    watcher.start()
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            contacts = list(pool.map(create, range(40)))
+            batch_items = [item for items in pool.map(create_batch, range(10)) for item in items]
+            assert [item["error"] for item in batch_items] == [None] * 30
+            # No contact was deactivated yet: every assignment so far still counts
+            assigned_so_far = Counter(
+                item["operator_id"] for item in contacts + batch_items if item["operator_id"]
+            )
+            assert set(assigned_so_far) <= {operator["id"] for operator in operators}
+            assert max(assigned_so_far.values()) <= LOAD_LIMIT
+            # Free the capacity while new contacts compete for it
+            assigned = [contact["id"] for contact in contacts if contact["operator_id"]]
+            deactivated = pool.map(lambda contact_id: client.patch(f"/contacts/{contact_id}/deactivate"), assigned)
+            contacts += list(pool.map(create, range(40, 80)))
+            assert all(response.status_code == 200 for response in deactivated)
+    finally:
+        done.set()
+        watcher.join()
+
+    assert violations == []
+    loads = _loads(db)
+    assert _over_limit(loads) == {}
+    for operator in operators:
+        load_limit, active_load, active_contacts = loads[operator["id"]]
+        assert active_load == active_contacts == LOAD_LIMIT
+    # Everything else waits in the backlog
+    unassigned = db.query(models.Contact).filter(
+        models.Contact.is_active == True,
+        models.Contact.operator_id.is_(None)
+    ).count()
+    assert unassigned == db.query(models.BacklogEntry).count() > 0
+
+
+def test_stale_counter_is_refreshed_before_queueing(client, db):
+    operator = create_operator(client, load_limit=1)
+    source = create_source(client, weights=[(operator["id"], 1)])
+    # Another worker deactivated a contact: this process still counts it
+    load_tracker.increment(operator["id"])
+
+    response = client.post("/contacts/", json={"source_id": source["id"], "lead_external_id": "lead"})
+
+    assert response.json()["operator_id"] == operator["id"]
+    assert load_tracker.get(operator["id"]) == 1
+    assert db.query(models.BacklogEntry).count() == 0
+
+
+def test_stale_counter_is_refreshed_in_batch(client, db):
+    operator = create_operator(client, load_limit=2)
+    source = create_source(client, weights=[(operator["id"], 1)])
+    load_tracker.increment(operator["id"])
+
+    items = [{"source_id": source["id"], "lead_external_id": f"lead-{i}"} for i in range(3)]
+    results = client.post("/contacts/batch", json={"contacts": items}).json()["results"]
+
+    assert [result["operator_id"] for result in results].count(operator["id"]) == 2
+    assert load_tracker.get(operator["id"]) == 2
+    assert _loads(db)[operator["id"]] == (2, 2, 2)
+
+
+def test_operator_load_endpoints_read_active_load(client):
+    operator = create_operator(client, load_limit=5)
+    source = create_source(client, weights=[(operator["id"], 1)])
+    for i in range(2):
+        client.post("/contacts/", json={"source_id": source["id"], "lead_external_id": f"lead-{i}"})
+    # Another worker assigned a contact: this process doesn't count it
+    with SessionLocal() as session:
+        session.execute(update(models.Operator).values(active_load=models.Operator.active_load + 1))
+        session.commit()
+
+    single = client.get(f"/operators/{operator['id']}/load").json()
+    all_loads = client.get("/operators/load").json()
+
+    assert load_tracker.get(operator["id"]) == 2
+    assert single["current_load"] == 3
+    assert all_loads == [single]
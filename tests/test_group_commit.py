@@ -0,0 +1,103 @@
+"""
+Ingestion with group commit. CRM_CONTACT_GROUP_COMMIT is read when app modules
+are imported, so the app runs in a subprocess with its own database.
+"""
+import json
+import os
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+LOAD_LIMIT = 3
+
+SCRIPT = """
+import json
+from concurrent.futures import ThreadPoolExecutor
+from fastapi.testclient import TestClient
+from app.main import app
+
+with TestClient(app) as client:
+    operators = [
+        client.post("/operators/", json={"name": f"Operator {i}", "load_limit": %(load_limit)d}).json()
+        for i in range(2)
+    ]
+    source = client.post("/sources/", json={"name": "Source"}).json()
+    for operator in operators:
+        client.post(f"/sources/{source['id']}/operators", json={"operator_id": operator["id"], "weight": 1})
+
+    def create(i):
+        response = client.post("/contacts/", json={"source_id": source["id"], "lead_external_id": f"lead-{i}"})
+        return [response.status_code, response.json()]
+
+    def create_batch(i):
+        items = [{"source_id": source["id"], "lead_external_id": f"batch-{i}-{j}"} for j in range(3)]
+        items.insert(1, {"source_id": 999999, "lead_external_id": f"unknown-{i}"})
+        response = client.post("/contacts/batch", json={"contacts": items})
+        return [response.status_code, response.json()]
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        singles = pool.map(create, range(20))
+        batches = pool.map(create_batch, range(10))
+        unknown = pool.submit(client.post, "/contacts/", json={"source_id": 999999})
+        singles, batches, unknown = list(singles), list(batches), unknown.result()
+    endpoints = {
+        route.path: route.endpoint.__module__ for route in app.routes
+        if route.path in ("/contacts/", "/contacts/batch") and "POST" in route.methods
+    }
+    load = client.get("/operators/load").json()
+
+print(json.dumps({
+    "operator_ids": [operator["id"] for operator in operators],
+    "singles": singles,
+    "batches": batches,
+    "unknown": unknown.status_code,
+    "endpoints": endpoints,
+    "load": load
+}))
+""" % {"load_limit": LOAD_LIMIT}
+
+
+def test_group_commit_ingestion(tmp_path):
+    env = dict(
+        os.environ,
+        CRM_DATABASE_URL=f"sqlite:///{tmp_path}/crm.db",
+        CRM_CONTACT_GROUP_COMMIT="true",
+        CRM_CONTACT_GROUP_COMMIT_WINDOW_MS="20",
+        CRM_CONTACT_EXPIRY_INTERVAL="0"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        cwd=Path(__file__).resolve().parent.parent,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60
+    )
+    assert completed.returncode == 0, completed.stderr
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    operator_ids = result["operator_ids"]
+
+    assert set(result["endpoints"].values()) == {"app.routers.contacts_group"}
+    assert result["unknown"] == 400
+
+    assigned = Counter()
+    for status, contact in result["singles"]:
+        assert status == 200
+        assigned[contact["operator_id"]] += 1
+
+    for status, batch in result["batches"]:
+        assert status == 200
+        assert (batch["created"], batch["failed"]) == (3, 1)
+        # Results keep the order of the request items, the unknown source fails alone
+        assert [item["index"] for item in batch["results"]] == [0, 1, 2, 3]
+        assert [item["error"] is not None for item in batch["results"]] == [False, True, False, False]
+        assert batch["results"][1]["contact_id"] is None
+        for item in batch["results"]:
+            if not item["error"]:
+                assigned[item["operator_id"]] += 1
+
+    # Groups never assign an operator beyond its limit; the rest wait in the backlog
+    assert assigned.pop(None) == 20 + 30 - 2 * LOAD_LIMIT
+    assert assigned == {operator_id: LOAD_LIMIT for operator_id in operator_ids}
+    assert [operator["current_load"] for operator in result["load"]] == [LOAD_LIMIT, LOAD_LIMIT]
@@ -0,0 +1,48 @@
+import io
+from app import models
+from app.importer import import_contacts, import_leads
+from tests.conftest import create_source
+
+
+def _inserts(statements, table: str) -> int:
+    return sum(statement.startswith(f"INSERT INTO {table} ") for statement in statements)
+
+
+def _csv(header: str, lines) -> io.BytesIO:
+    return io.BytesIO(("\n".join([header, *lines]) + "\n").encode())
+
+
+def test_import_leads_inserts_in_bulk(db, statements):
+    file = _csv("external_id,phone,email,name", (
+        f"lead-{i},+7900{i:07d},lead{i}@example.com,Lead {i}" for i in range(300)
+    ))
+
+    summary = import_leads(db, file, chunk_size=1000)
+
+    assert summary.imported == 300
+    assert _inserts(statements, "leads") == 1
+    assert _inserts(statements, "lead_identities") == 1
+    assert db.query(models.Lead).count() == 300
+    assert db.query(models.LeadIdentity).count() == 900
+
+
+def test_import_leads_merges_existing(db):
+    import_leads(db, _csv("external_id,phone,email,name", ["lead-1,,,First"]))
+    summary = import_leads(db, _csv("external_id,phone,email,name", ["lead-1,,,Again", ",8 900 000-00-01,,New"]))
+
+    assert summary.imported == 2
+    assert db.query(models.Lead).count() == 2
+
+
+def test_import_assigned_contacts_queue_unassigned(client, db, statements):
+    source = create_source(client)
+    file = _csv("lead_external_id,source_id", (f"lead-{i},{source['id']}" for i in range(200)))
+
+    statements.clear()
+    summary = import_contacts(db, file, assign_operators=True)
+
+    assert summary.imported == 200
+    assert _inserts(statements, "contacts") == 1
+    queued = db.query(models.BacklogEntry.contact_id).order_by(models.BacklogEntry.id).all()
+    contacts = db.query(models.Contact.id).order_by(models.Contact.id).all()
+    assert queued == contacts
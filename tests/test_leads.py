@@ -0,0 +1,119 @@
+import sqlite3
+from sqlalchemy import text
+from app import models, search
+from app.database import engine
+from app.migrations import m0003_lead_search, m0004_lead_search_phones
+from tests.conftest import create_source
+
+
+def test_whitespace_external_id_is_not_stored(client, db):
+    source = create_source(client)
+    for _ in range(2):
+        response = client.post("/contacts/", json={"source_id": source["id"], "lead_external_id": "  "})
+        assert response.status_code == 200, response.text
+
+    assert [lead.external_id for lead in db.query(models.Lead)] == [None, None]
+
+
+def test_external_id_is_stored_normalized(client, db):
+    source = create_source(client)
+    lead_ids = {
+        client.post("/contacts/", json={"source_id": source["id"], "lead_external_id": external_id}).json()["lead_id"]
+        for external_id in (" crm-1 ", "crm-1")
+    }
+
+    assert len(lead_ids) == 1
+    assert db.get(models.Lead, lead_ids.pop()).external_id == "crm-1"
+
+
+def test_batch_whitespace_external_id(client, db):
+    source = create_source(client)
+    items = [{"source_id": source["id"], "lead_external_id": " "}] * 2
+    for _ in range(2):
+        response = client.post("/contacts/batch", json={"contacts": items})
+        assert response.status_code == 200, response.text
+
+    assert {lead.external_id for lead in db.query(models.Lead)} == {None}
+
+
+def _fts_matches(term):
+    with engine.connect() as connection:
+        return connection.execute(
+            text("SELECT rowid FROM leads_fts WHERE leads_fts MATCH :term"), {"term": f'"{term}"'}
+        ).scalars().all()
+
+
+def test_search_finds_phone_with_any_separators(client, db):
+    source = create_source(client)
+    contact = client.post("/contacts/", json={"source_id": source["id"], "lead_phone": "8 900 123/45/67 доб."}).json()
+
+    response = client.get("/leads/search", params={"q": "+7 900 1234567"})
+
+    assert [lead["id"] for lead in response.json()] == [contact["lead_id"]]
+    assert db.get(models.Lead, contact["lead_id"]).normalized_phone == "79001234567"
+
+
+def test_phone_migration_reindexes_existing_leads(client, db):
+    source = create_source(client)
+    contact = client.post("/contacts/", json={"source_id": source["id"], "lead_phone": "8 900 123/45/67"}).json()
+    # A lead written before 0004, indexed the way 0003 did; then upgrade
+    with engine.begin() as connection:
+        connection.execute(text("UPDATE leads SET normalized_phone = NULL"))
+        connection.execute(text("DROP TRIGGER leads_fts_insert"))
+        connection.execute(text("DROP TRIGGER leads_fts_update"))
+        connection.execute(text("DROP TRIGGER leads_fts_delete"))
+        connection.execute(text("DROP TABLE leads_fts"))
+        m0003_lead_search.upgrade(connection)
+    assert _fts_matches("79001234567") == []
+    with engine.begin() as connection:
+        m0004_lead_search_phones.upgrade(connection)
+
+    assert _fts_matches("79001234567") == [contact["lead_id"]]
+    assert db.get(models.Lead, contact["lead_id"]).normalized_phone == "79001234567"
+
+
+def test_other_sqlite_clients_can_write_leads(client, db):
+    source = create_source(client)
+    client.post("/contacts/", json={"source_id": source["id"], "lead_phone": "8 900 123/45/67"})
+
+    # No application functions on a plain connection: triggers must be plain SQL
+    connection = sqlite3.connect(engine.url.database)
+    try:
+        connection.execute("INSERT INTO leads (name, phone) VALUES ('Manual', '+7 (900) 765-43-21')")
+        connection.execute("UPDATE leads SET name = 'Ivan'")
+        connection.execute("DELETE FROM leads WHERE name = 'Ivan' AND phone LIKE '8%'")
+        connection.commit()
+    finally:
+        connection.close()
+
+    assert len(_fts_matches("79007654321")) == 1
+    assert _fts_matches("79001234567") == []
+
+
+def _create_lead(client, source, **lead) -> int:
+    payload = {"source_id": source["id"], **{f"lead_{key}": value for key, value in lead.items()}}
+    return client.post("/contacts/", json=payload).json()["lead_id"]
+
+
+def test_search_ranks_old_exact_matches_beyond_candidate_cap(client, monkeypatch):
+    monkeypatch.setattr(search, "MAX_CANDIDATES", 2)
+    source = create_source(client)
+    ivan = _create_lead(client, source, name="Ivan", email="old@example.com")
+    _create_lead(client, source, name="Petr", email="ivan@example.com")
+    newer = [_create_lead(client, source, name=f"Ivanov {i}", external_id=f"ivan-{i}") for i in range(3)]
+
+    ids = [lead["id"] for lead in client.get("/leads/search", params={"q": "IVAN"}).json()]
+
+    assert ids == [ivan, newer[2], newer[1]]
+
+
+def test_search_exact_match_must_match_every_term(client, monkeypatch):
+    monkeypatch.setattr(search, "MAX_CANDIDATES", 1)
+    source = create_source(client)
+    ivan = _create_lead(client, source, name="Ivan", email="ivan@corp.com")
+    _create_lead(client, source, name="Ivan", email="ivan@mail.com")
+    _create_lead(client, source, name="Ivanov", email="ivanov@mail.com")
+
+    ids = [lead["id"] for lead in client.get("/leads/search", params={"q": "ivan corp"}).json()]
+
+    assert ids == [ivan]
@@ -0,0 +1,45 @@
+import asyncio
+import json
+from app.routers.operators import stream_operator_loads
+from tests.conftest import create_operator, create_source
+
+
+def _parse(message: str):
+    """(event, data) of one server-sent event"""
+    fields = dict(line.split(": ", 1) for line in message.strip().split("\n"))
+    return fields["event"], json.loads(fields["data"])
+
+
+def test_stream_sends_snapshot_and_load_events(client):
+    operator = create_operator(client, load_limit=2)
+    source = create_source(client, weights=[(operator["id"], 1)])
+
+    async def read_events():
+        loop = asyncio.get_running_loop()
+        events = (await stream_operator_loads()).body_iterator
+        try:
+            snapshot = await asyncio.wait_for(anext(events), 5)
+            # The stream is subscribed once the snapshot is sent: requests run in other threads
+            contact = await loop.run_in_executor(
+                None, lambda: client.post("/contacts/", json={"source_id": source["id"]}).json()
+            )
+            assigned = await asyncio.wait_for(anext(events), 5)
+            await loop.run_in_executor(
+                None, lambda: client.post("/contacts/deactivate", json={"contact_ids": [contact["id"]]})
+            )
+            deactivated = await asyncio.wait_for(anext(events), 5)
+        finally:
+            await events.aclose()
+        return snapshot, assigned, deactivated
+
+    snapshot, assigned, deactivated = (_parse(message) for message in asyncio.run(read_events()))
+
+    assert snapshot == ("snapshot", [{
+        "operator_id": operator["id"],
+        "operator_name": operator["name"],
+        "current_load": 0,
+        "load_limit": 2,
+        "is_active": True
+    }])
+    assert assigned == ("load", {"operator_id": operator["id"], "current_load": 1})
+    assert deactivated == ("load", {"operator_id": operator["id"], "current_load": 0})
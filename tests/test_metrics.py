@@ -0,0 +1,48 @@
+import re
+from tests.conftest import create_operator, create_source
+
+# Statements of POST /contacts/ once the routing table is compiled
+NEW_LEAD_QUERIES = 11
+KNOWN_LEAD_QUERIES = 8
+
+
+def _sample(text: str, name: str) -> float:
+    """Value of one sample of the Prometheus text output (0 if absent)"""
+    match = re.search(rf"^{re.escape(name)} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0
+
+
+def test_request_headers_and_metrics(client, statements):
+    operator = create_operator(client)
+    source = create_source(client, weights=[(operator["id"], 1)])
+    client.post("/contacts/", json={"source_id": source["id"], "lead_phone": "+7 900 000-00-00"})
+    before = client.get("/metrics").text
+
+    queries = []
+    for phone in ("+7 900 123-45-67", "8 900 123 45 67"):
+        statements.clear()
+        response = client.post("/contacts/", json={"source_id": source["id"], "lead_phone": phone})
+        assert response.status_code == 200, response.text
+        queries.append(int(response.headers["x-db-queries"]))
+        assert queries[-1] == len(statements)
+        assert re.fullmatch(r"db;dur=\d+\.\d{2}, app;dur=\d+\.\d{2}", response.headers["server-timing"])
+
+    assert queries == [NEW_LEAD_QUERIES, KNOWN_LEAD_QUERIES]
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    after = response.text
+
+    def delta(name: str) -> float:
+        return _sample(after, name) - _sample(before, name)
+
+    assert "# TYPE crm_http_request_db_queries histogram" in after
+    for operation in ("lead_resolution", "operator_selection", "commit"):
+        assert delta(f'crm_operation_duration_seconds_count{{operation="{operation}"}}') == 2
+    route = 'method="POST",route="/contacts/"'
+    assert delta(f"crm_http_request_db_queries_count{{{route}}}") == 2
+    assert delta(f"crm_http_request_db_queries_sum{{{route}}}") == NEW_LEAD_QUERIES + KNOWN_LEAD_QUERIES
+    # Buckets are cumulative: 11 queries fall into le="20", 8 into le="10" as well
+    assert delta(f'crm_http_request_db_queries_bucket{{{route},le="10"}}') == 1
+    assert delta(f'crm_http_request_db_queries_bucket{{{route},le="+Inf"}}') == 2
@@ -0,0 +1,122 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from app import migrations
+from app.database import Base
+from app.migrations import apply_migrations, load_migrations
+
+# Schema of crm.db created by the first version (create_all of its models)
+BASELINE_SCHEMA = """
+CREATE TABLE leads (
+    id INTEGER NOT NULL, external_id VARCHAR, phone VARCHAR, email VARCHAR, name VARCHAR,
+    created_at DATETIME DEFAULT (CURRENT_TIMESTAMP), PRIMARY KEY (id)
+);
+CREATE INDEX ix_leads_phone ON leads (phone);
+CREATE UNIQUE INDEX ix_leads_external_id ON leads (external_id);
+CREATE INDEX ix_leads_email ON leads (email);
+CREATE INDEX ix_leads_id ON leads (id);
+CREATE TABLE operators (
+    id INTEGER NOT NULL, name VARCHAR NOT NULL, is_active BOOLEAN NOT NULL, load_limit INTEGER NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE INDEX ix_operators_name ON operators (name);
+CREATE INDEX ix_operators_id ON operators (id);
+CREATE TABLE sources (id INTEGER NOT NULL, name VARCHAR NOT NULL, description VARCHAR, PRIMARY KEY (id));
+CREATE INDEX ix_sources_id ON sources (id);
+CREATE UNIQUE INDEX ix_sources_name ON sources (name);
+CREATE TABLE contacts (
+    id INTEGER NOT NULL, lead_id INTEGER NOT NULL, source_id INTEGER NOT NULL, operator_id INTEGER,
+    message VARCHAR, is_active BOOLEAN NOT NULL, created_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    PRIMARY KEY (id),
+    FOREIGN KEY(lead_id) REFERENCES leads (id),
+    FOREIGN KEY(source_id) REFERENCES sources (id),
+    FOREIGN KEY(operator_id) REFERENCES operators (id)
+);
+CREATE INDEX ix_contacts_id ON contacts (id);
+CREATE TABLE source_operator_weights (
+    id INTEGER NOT NULL, source_id INTEGER NOT NULL, operator_id INTEGER NOT NULL, weight FLOAT NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uq_source_operator UNIQUE (source_id, operator_id),
+    FOREIGN KEY(source_id) REFERENCES sources (id),
+    FOREIGN KEY(operator_id) REFERENCES operators (id)
+);
+CREATE INDEX ix_source_operator_weights_id ON source_operator_weights (id);
+INSERT INTO operators (id, name, is_active, load_limit) VALUES (1, 'Operator', 1, 10);
+INSERT INTO sources (id, name) VALUES (1, 'Source');
+INSERT INTO leads (id, name, phone) VALUES (1, 'Ivan Petrov', '8 900 123-45-67');
+INSERT INTO contacts (lead_id, source_id, operator_id, is_active) VALUES (1, 1, 1, 1), (1, 1, 1, 0);
+"""
+
+
+@pytest.fixture
+def database_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/crm.db")
+    yield engine
+    engine.dispose()
+
+
+def _schema(engine) -> dict:
+    """{table: (columns, indexes)} of the model tables"""
+    inspector = inspect(engine)
+    return {
+        table.name: (
+            {column["name"] for column in inspector.get_columns(table.name)},
+            {index["name"] for index in inspector.get_indexes(table.name)}
+        )
+        for table in Base.metadata.sorted_tables
+    }
+
+
+def _model_schema() -> dict:
+    return {
+        table.name: ({column.name for column in table.columns}, {index.name for index in table.indexes})
+        for table in Base.metadata.sorted_tables
+    }
+
+
+def test_fresh_database_matches_models(database_engine):
+    applied = apply_migrations(database_engine)
+
+    assert applied == load_migrations()
+    assert _schema(database_engine) == _model_schema()
+
+
+def test_baseline_database_is_upgraded(database_engine):
+    raw_connection = database_engine.raw_connection()
+    try:
+        raw_connection.executescript(BASELINE_SCHEMA)
+    finally:
+        raw_connection.close()
+
+    apply_migrations(database_engine)
+
+    assert _schema(database_engine) == _model_schema()
+    with database_engine.connect() as connection:
+        assert connection.execute(text("SELECT active_load FROM operators")).scalar_one() == 1
+        assert connection.execute(text(
+            "SELECT normalized_phone, normalized_name FROM leads"
+        )).one() == ("79001234567", "ivan petrov")
+        assert connection.execute(text(
+            "SELECT rowid FROM leads_fts WHERE leads_fts MATCH '\"petrov\"'"
+        )).scalars().all() == [1]
+    assert apply_migrations(database_engine) == []
+
+
+def test_lead_search_names_upgrade(database_engine, monkeypatch):
+    # A database created before 0005: leads without normalized_name
+    monkeypatch.setattr(
+        migrations, "load_migrations",
+        lambda: [migration for migration in load_migrations() if migration.version < 5]
+    )
+    apply_migrations(database_engine)
+    with database_engine.begin() as connection:
+        connection.execute(text("INSERT INTO leads (name) VALUES ('  Ivan   PETROV ')"))
+    monkeypatch.undo()
+
+    applied = apply_migrations(database_engine)
+
+    assert [migration.name for migration in applied] == ["lead_search_names"]
+    assert "ix_leads_normalized_name" in {
+        index["name"] for index in inspect(database_engine).get_indexes("leads")
+    }
+    with database_engine.connect() as connection:
+        assert connection.execute(text("SELECT normalized_name FROM leads")).scalar_one() == "ivan petrov"
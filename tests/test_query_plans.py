@@ -0,0 +1,35 @@
+from sqlalchemy import text
+from app import models
+from app.database import engine
+from app.query_plans import HOT_QUERIES, check_query_plans
+
+
+def test_hot_queries_use_indexes():
+    with engine.connect() as connection:
+        results = check_query_plans(connection)
+
+    assert [result.name for result in results] == [name for name, _ in HOT_QUERIES]
+    assert [result for result in results if not result.ok] == []
+
+
+def test_dropped_index_fails_the_check():
+    index = next(
+        index for index in models.Contact.__table__.indexes
+        if index.name == "ix_contacts_operator_id_is_active"
+    )
+    try:
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP INDEX {index.name}"))
+        # pysqlite caches prepared EXPLAIN statements per connection: plan on a new one
+        engine.dispose()
+        with engine.connect() as connection:
+            results = check_query_plans(connection)
+    finally:
+        index.create(bind=engine, checkfirst=True)
+        engine.dispose()
+
+    failed = {result.name: result.missing_index for result in results if not result.ok}
+    assert failed == {
+        "contacts by operator": index.name,
+        "unassigned contacts": index.name
+    }
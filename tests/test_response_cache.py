@@ -0,0 +1,50 @@
+from tests.conftest import create_operator, create_source
+
+
+def test_repeated_request_is_served_without_queries(client, statements):
+    source = create_source(client)
+    first = client.get(f"/sources/{source['id']}")
+    del statements[:]
+
+    second = client.get(f"/sources/{source['id']}")
+
+    assert statements == []
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+
+def test_matching_etag_returns_not_modified_without_queries(client, statements):
+    source = create_source(client)
+    etag = client.get(f"/sources/{source['id']}").headers["ETag"]
+    del statements[:]
+
+    response = client.get(f"/sources/{source['id']}", headers={"If-None-Match": etag})
+
+    assert statements == []
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    # A stale ETag gets the full response
+    assert client.get(f"/sources/{source['id']}", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_write_invalidates_cached_responses(client, statements):
+    operator = create_operator(client, name="Anna")
+    source = create_source(client, name="Site", weights=[(operator["id"], 1)])
+    etag = client.get(f"/sources/{source['id']}").headers["ETag"]
+    client.get(f"/sources/{source['id']}/operators")
+
+    assert client.patch(f"/sources/{source['id']}", json={"name": "Landing"}).status_code == 200
+    del statements[:]
+    response = client.get(f"/sources/{source['id']}", headers={"If-None-Match": etag})
+
+    assert statements != []
+    assert response.status_code == 200
+    assert response.json()["name"] == "Landing"
+    assert response.headers["ETag"] != etag
+
+    # Operator writes invalidate source responses that show operators
+    client.patch(f"/operators/{operator['id']}", json={"name": "Maria"})
+    weights = client.get(f"/sources/{source['id']}/operators").json()
+    assert [weight["operator_name"] for weight in weights] == ["Maria"]
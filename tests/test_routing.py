@@ -0,0 +1,51 @@
+import time
+from app import models
+from app.config import settings
+from app.routing import routing_tables
+from tests.conftest import create_operator, create_source
+
+TTL = 0.2
+
+
+def test_tables_expire_after_changes_of_other_workers(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "routing_table_ttl", TTL)
+    first = create_operator(client, name="First")
+    source = create_source(client, weights=[(first["id"], 1)])
+    table = routing_tables.get(db, source["id"])
+    assert table.operator_ids == [first["id"]]
+
+    # Another worker adds an operator: nothing invalidates this process's table
+    second = models.Operator(name="Second", load_limit=5, is_active=True)
+    db.add(second)
+    db.flush()
+    db.add(models.SourceOperatorWeight(source_id=source["id"], operator_id=second.id, weight=3))
+    db.commit()
+    assert routing_tables.get(db, source["id"]) is table
+
+    time.sleep(TTL)
+    refreshed = routing_tables.get(db, source["id"])
+    assert refreshed.operator_ids == [first["id"], second.id]
+    assert refreshed.weights == [1, 3]
+
+
+def test_unchanged_table_is_kept_after_expiry(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "routing_table_ttl", TTL)
+    operators = [create_operator(client, name=f"Operator {i}") for i in range(2)]
+    source = create_source(client, weights=[(operator["id"], 1) for operator in operators])
+    table = routing_tables.get(db, source["id"])
+
+    time.sleep(TTL)
+
+    # Same configuration: the table and its strategy state survive
+    assert routing_tables.get(db, source["id"]) is table
+    assert table.expires_at > time.monotonic()
+
+
+def test_local_writes_invalidate_immediately(client, db):
+    operator = create_operator(client, load_limit=5)
+    source = create_source(client, weights=[(operator["id"], 1)])
+    assert routing_tables.get(db, source["id"]).load_limits == [5]
+
+    client.patch(f"/operators/{operator['id']}", json={"load_limit": 7})
+
+    assert routing_tables.get(db, source["id"]).load_limits == [7]
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from sqlalchemy import update
+from app import models, schemas, simulator
+from tests.conftest import create_operator, create_source
+
+
+def _config(load_limits, weights) -> schemas.SimulationConfig:
+    """Operators 1..n with the given limits and one source (id 1) with the given weights"""
+    return schemas.SimulationConfig(
+        operators=[
+            schemas.SimulationOperator(id=i, load_limit=load_limit)
+            for i, load_limit in enumerate(load_limits, start=1)
+        ],
+        sources=[schemas.SimulationSource(id=1, operators=[
+            schemas.SimulationWeight(operator_id=i, weight=weight) for i, weight in enumerate(weights, start=1)
+        ])]
+    )
+
+
+def _stream(times, handle_times, source_id=1) -> simulator.ArrivalStream:
+    return simulator.ArrivalStream(
+        times=np.array(times, dtype=float),
+        source_ids=np.full(len(times), source_id, dtype=np.int64),
+        handle_times=np.array(handle_times, dtype=float)
+    )
+
+
+def test_shares_follow_weights(client):
+    operators = [create_operator(client, name=f"Operator {i}", load_limit=1000) for i in range(2)]
+    create_source(client, weights=[(operators[0]["id"], 1), (operators[1]["id"], 3)])
+
+    response = client.post("/stats/simulate", json={
+        "contacts": 20000, "arrival_rate": 100, "mean_handle_time": 5, "seed": 1
+    })
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["unassigned_rate"] == 0
+    assert [operator["operator_id"] for operator in result["operators"]] == [operator["id"] for operator in operators]
+    assert [operator["share"] for operator in result["operators"]] == pytest.approx([0.25, 0.75], abs=0.01)
+
+
+def test_load_limits_hold_under_overload():
+    config = _config([5, 10], [1, 1])
+    stream = simulator.synthetic_stream(config, 5000, arrival_rate=50, mean_handle_time=30, seed=7)
+
+    result = simulator.simulate(config, stream, seed=7)
+
+    for operator in result.operators:
+        assert operator.peak_load == operator.load_limit
+        assert operator.final_load <= operator.load_limit
+        assert operator.saturated_seconds > 0.5 * result.duration
+        assert operator.first_saturated_at is not None
+    # 15 slots of 30 s for 50 contacts a second: most contacts wait
+    assert result.unassigned_rate > 0.9
+    assert result.sources[0].queued_at_end > 0
+
+
+def test_queue_wait_and_saturation():
+    # One slot; contacts at 0, 0, 1 and 5 s handled for 2, 2, 1 and 1 s
+    result = simulator.simulate(_config([1], [1]), _stream([0, 0, 1, 5], [2, 2, 1, 1]))
+
+    # The second and third contact wait for the slot until 2 s and 4 s
+    assert (result.duration, result.deactivations, result.queued_at_end) == (6, 3, 0)
+    assert result.unassigned_rate == 0.5
+    source = result.sources[0]
+    assert (source.contacts, source.queued, source.mean_queue_wait) == (4, 2, 2.5)
+    operator = result.operators[0]
+    assert (operator.assigned, operator.peak_load, operator.final_load) == (4, 1, 1)
+    assert (operator.saturated_seconds, operator.saturated_fraction, operator.first_saturated_at) == (6, 1, 0)
+
+
+def test_contacts_of_unknown_sources_stay_queued():
+    result = simulator.simulate(_config([1], [1]), _stream([0, 1], [1, 1], source_id=2))
+
+    assert result.queued_at_end == 2
+    assert result.operators[0].assigned == 0
+    assert (result.sources[0].source_id, result.sources[0].queued) == (2, 2)
+
+
+def test_replay_of_recorded_contacts(client, db):
+    operator = create_operator(client, load_limit=10)
+    source = create_source(client, weights=[(operator["id"], 1)])
+    items = [{"source_id": source["id"], "lead_external_id": f"lead-{i}"} for i in range(4)]
+    results = client.post("/contacts/batch", json={"contacts": items}).json()["results"]
+    # Created 10 s apart; only the first one was deactivated (after 15 s)
+    start = datetime(2026, 1, 1)
+    for i, result in enumerate(results):
+        created_at = start + timedelta(seconds=10 * i)
+        deactivated_at = created_at + timedelta(seconds=15) if i == 0 else None
+        db.execute(update(models.Contact).where(models.Contact.id == result["contact_id"]).values(
+            created_at=created_at, deactivated_at=deactivated_at
+        ))
+    db.commit()
+    # Replayed against one slot instead of the live limit of 10
+    config = {
+        "operators": [{"id": operator["id"], "load_limit": 1}],
+        "sources": [{"id": source["id"], "operators": [{"operator_id": operator["id"], "weight": 1}]}]
+    }
+
+    response = client.post("/stats/simulate", json={
+        "config": config,
+        "replay_from": start.isoformat(),
+        "replay_to": (start + timedelta(seconds=30)).isoformat()
+    })
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    # [replay_from, replay_to) holds the first three contacts; the second one gets
+    # the slot when the first is deactivated, the third never does
+    assert (result["contacts"], result["deactivations"], result["queued_at_end"]) == (3, 1, 1)
+    assert result["sources"] == [{
+        "source_id": source["id"], "contacts": 3, "queued": 2, "queued_at_end": 1, "mean_queue_wait": 5.0
+    }]
+    assert result["operators"][0]["assigned"] == 2
@@ -0,0 +1,124 @@
+import json
+from tests.conftest import create_operator, create_source
+
+
+def _add_sources(client, count: int, operators_per_source: int, contacts_per_source: int):
+    for i in range(count):
+        operators = [
+            create_operator(client, name=f"Operator {i}-{j}", load_limit=100)
+            for j in range(operators_per_source)
+        ]
+        source = create_source(
+            client, name=f"Source {i}-{operators_per_source}", weights=[(operator["id"], 1) for operator in operators]
+        )
+        items = [
+            {"source_id": source["id"], "lead_external_id": f"lead-{source['id']}-{j}"}
+            for j in range(contacts_per_source)
+        ]
+        assert client.post("/contacts/batch", json={"contacts": items}).status_code == 200
+
+
+def _distribution_statements(client, statements, **params) -> int:
+    statements.clear()
+    response = client.get("/stats/distribution", params=params)
+    assert response.status_code == 200, response.text
+    return len(statements)
+
+
+def test_distribution_query_count_is_constant(client, statements):
+    _add_sources(client, 1, operators_per_source=1, contacts_per_source=2)
+    single = _distribution_statements(client, statements)
+
+    _add_sources(client, 10, operators_per_source=5, contacts_per_source=20)
+    many = _distribution_statements(client, statements)
+    filtered = _distribution_statements(client, statements, created_from="2000-01-01T00:00:00")
+
+    assert single == many == filtered == 1
+
+
+def test_distribution_counts(client):
+    _add_sources(client, 3, operators_per_source=2, contacts_per_source=10)
+    empty = create_source(client, name="Empty")
+
+    stats = {item["source_id"]: item for item in client.get("/stats/distribution").json()}
+
+    assert len(stats) == 4
+    assert stats[empty["id"]]["total_contacts"] == 0
+    for source_id, item in stats.items():
+        if source_id != empty["id"]:
+            assert item["total_contacts"] == 10
+            assert sum(operator["count"] for operator in item["contacts_by_operator"].values()) == 10
+
+
+def _leads_summary_pages(client, statements=None, limit=7):
+    """Pages of /stats/leads-summary following X-Next-Cursor; (pages, statements per page)"""
+    pages, queries = [], []
+    params = {"limit": limit}
+    while True:
+        if statements is not None:
+            statements.clear()
+        response = client.get("/stats/leads-summary", params=params)
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        if statements is not None:
+            queries.append(len(statements))
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages, queries
+        assert int(cursor) == pages[-1][-1]["lead_id"]
+        params["cursor"] = cursor
+
+
+def _add_repeat_contacts(client, lead_external_ids):
+    """Second contact of every lead through a new source"""
+    operator = create_operator(client, name="Repeat operator", load_limit=1000)
+    source = create_source(client, name="Repeat", weights=[(operator["id"], 1)])
+    items = [{"source_id": source["id"], "lead_external_id": external_id} for external_id in lead_external_ids]
+    assert client.post("/contacts/batch", json={"contacts": items}).status_code == 200
+
+
+def test_leads_summary_pages_cover_all_leads(client):
+    _add_sources(client, 2, operators_per_source=2, contacts_per_source=10)
+    leads = {lead["lead_id"]: lead for lead in _leads_summary_pages(client, limit=100)[0][0]}
+    _add_repeat_contacts(client, [lead["lead_external_id"] for lead in leads.values()][:5])
+
+    pages, _ = _leads_summary_pages(client)
+
+    assert [len(page) for page in pages] == [7, 7, 6]
+    ids = [lead["lead_id"] for page in pages for lead in page]
+    assert ids == sorted(leads) and len(set(ids)) == 20
+    totals = [lead["total_contacts"] for page in pages for lead in page]
+    assert totals == [2] * 5 + [1] * 15
+    repeat = pages[0][0]["contacts"][1]
+    assert (repeat["source_name"], repeat["operator_name"]) == ("Repeat", "Repeat operator")
+
+
+def test_leads_summary_query_count_is_constant(client, statements):
+    _add_sources(client, 1, operators_per_source=1, contacts_per_source=14)
+    _, few = _leads_summary_pages(client, statements)
+
+    _add_sources(client, 2, operators_per_source=3, contacts_per_source=7)
+    lead_external_ids = [
+        lead["lead_external_id"] for page in _leads_summary_pages(client)[0] for lead in page
+    ]
+    _add_repeat_contacts(client, lead_external_ids)
+    _, many = _leads_summary_pages(client, statements)
+
+    # Leads, contacts, sources, operators (contacts of a page share sources and operators)
+    assert set(few) == set(many) == {4}
+    assert len(many) == 4
+
+
+def test_leads_summary_ndjson_matches_pages(client):
+    _add_sources(client, 3, operators_per_source=1, contacts_per_source=5)
+    pages, _ = _leads_summary_pages(client)
+
+    response = client.get("/stats/leads-summary", params={"format": "ndjson", "limit": 4})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == [lead for page in pages for lead in page]
+
+    cursor = pages[0][-1]["lead_id"]
+    response = client.get("/stats/leads-summary", params={"format": "ndjson", "cursor": cursor})
+    assert [json.loads(line) for line in response.text.splitlines()] == rows[len(pages[0]):]
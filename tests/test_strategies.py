@@ -0,0 +1,126 @@
+import random
+from collections import Counter
+import pytest
+from sqlalchemy import update
+from app import models
+from app.routing import RoutingTable
+from app.strategies import STRATEGIES, DistributionStrategy
+from tests.conftest import create_operator, create_source
+
+
+def _table(strategy, weights, load_limits=None):
+    load_limits = load_limits or [100] * len(weights)
+    rows = [
+        (operator_id, weight, load_limit, True)
+        for operator_id, (weight, load_limit) in enumerate(zip(weights, load_limits), start=1)
+    ]
+    return RoutingTable(1, 0, rows, strategy)
+
+
+def _always_available(operator_id, load_limit):
+    return True
+
+
+@pytest.mark.parametrize("strategy", sorted(STRATEGIES))
+def test_strategy_respects_load_limit(client, db, strategy):
+    operators = [create_operator(client, name=f"Operator {i}", load_limit=limit) for i, limit in enumerate((2, 3))]
+    source = create_source(client, weights=[(operators[0]["id"], 5), (operators[1]["id"], 1)])
+    assert client.patch(f"/sources/{source['id']}", json={"distribution_strategy": strategy}).status_code == 200
+
+    single = [
+        client.post("/contacts/", json={"source_id": source["id"], "lead_external_id": f"single-{i}"}).json()
+        for i in range(3)
+    ]
+    items = [{"source_id": source["id"], "lead_external_id": f"batch-{i}"} for i in range(5)]
+    batch = client.post("/contacts/batch", json={"contacts": items}).json()["results"]
+
+    assigned = Counter(item["operator_id"] for item in single + batch)
+    assert assigned == {operators[0]["id"]: 2, operators[1]["id"]: 3, None: 3}
+    assert db.query(models.BacklogEntry).count() == 3
+
+
+@pytest.mark.parametrize("strategy", sorted(STRATEGIES))
+def test_strategy_handles_rejected_reservation_in_batch(client, db, strategy):
+    operators = [create_operator(client, name=f"Operator {i}", load_limit=2) for i in range(2)]
+    source = create_source(client, weights=[(operator["id"], 1) for operator in operators])
+    client.patch(f"/sources/{source['id']}", json={"distribution_strategy": strategy})
+    # Another worker took a place: this process still sees it free, so a reservation is rejected
+    db.execute(update(models.Operator).where(
+        models.Operator.id == operators[0]["id"]
+    ).values(active_load=1))
+    db.commit()
+
+    items = [{"source_id": source["id"], "lead_external_id": f"batch-{i}"} for i in range(5)]
+    response = client.post("/contacts/batch", json={"contacts": items})
+
+    assert response.status_code == 200, response.text
+    assigned = Counter(item["operator_id"] for item in response.json()["results"])
+    assert assigned == {operators[0]["id"]: 1, operators[1]["id"]: 2, None: 2}
+
+
+def test_smooth_round_robin_follows_weights_exactly():
+    table = _table("smooth_round_robin", [3, 1, 2])
+
+    picks = [table.select(_always_available) for _ in range(60)]
+
+    assert Counter(picks) == {1: 30, 2: 10, 3: 20}
+    # Every window of sum(weights) picks has the exact shares
+    assert all(Counter(picks[i:i + 6]) == {1: 3, 2: 1, 3: 2} for i in range(0, 60, 6))
+
+
+def test_weighted_random_follows_weights():
+    random.seed(20)
+    table = _table("weighted_random", [3, 1])
+
+    picks = Counter(table.select(_always_available) for _ in range(4000))
+
+    assert 2850 <= picks[1] <= 3150
+    assert picks[1] + picks[2] == 4000
+
+
+def test_weighted_random_skips_operators_at_limit():
+    random.seed(20)
+    table = _table("weighted_random", [100, 1])
+
+    picks = {table.select(lambda operator_id, load_limit: operator_id == 2) for _ in range(100)}
+
+    assert picks == {2}
+
+
+@pytest.mark.parametrize("strategy", ["least_loaded", "power_of_two"])
+def test_load_aware_strategies_pick_lower_load(strategy):
+    random.seed(20)
+    table = _table(strategy, [1, 1], load_limits=[10, 10])
+    loads = {1: 7, 2: 2}
+
+    picks = Counter(table.select(_always_available, loads.get) for _ in range(200))
+
+    if strategy == "least_loaded":
+        assert picks == {2: 200}
+    else:
+        # Both candidates are drawn unless one is drawn MAX_SELECTION_ATTEMPTS times in a row
+        assert picks[2] >= 195
+
+
+def test_least_loaded_compares_utilization():
+    table = _table("least_loaded", [1, 1], load_limits=[100, 10])
+
+    # 50 of 100 is less busy than 6 of 10
+    assert table.select(_always_available, {1: 50, 2: 6}.get) == 1
+
+
+def test_unknown_strategy_is_rejected(client):
+    response = client.post("/sources/", json={"name": "Source", "distribution_strategy": "fastest"})
+    assert response.status_code == 422
+
+    source = create_source(client)
+    response = client.patch(f"/sources/{source['id']}", json={"distribution_strategy": "fastest"})
+    assert response.status_code == 422
+
+
+def test_strategy_without_select_cannot_be_created():
+    class Incomplete(DistributionStrategy):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete(_table("weighted_random", [1]))